@@ -0,0 +1,403 @@
+import gc
+import random
+import resource
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+from typing import List, Set, Tuple
+
+from IOHandler import read_bus_network, read_requests
+from main.plan.EventModel import EventModel
+from main.plan.ALNSPlanner import ALNSPlanner
+from main.plan.MILPBackend import find_backend
+from main.plan.EventBasedMILP import EventBasedMILP
+from main.scope.Context import Static
+from main.scope.Executor import Executor
+from utils import Global
+from utils.demand.AbstractRequest import Request, SplitRequest
+from utils.helper import Helper, Timer
+from utils.helper.EventArrays import to_event_arrays, remove_unconnected
+from utils.helper.EventWindow import EventWindowState
+from utils.helper.LineGraph import LineGraph
+from utils.helper.PriorityQueue import PriorityQueue, IndexedPriorityQueue
+from utils.network.Bus import Bus
+
+NETWORK_PATH = "../input/bus_networks/real_networks/"
+REQUEST_PATH = "../input/requests/random_requests/"
+NETWORKS = ["markt-karl", "markt-karl-lohr", "sw-geo_2", "sw-geo_full", "sw-schlee_2", "sw-schlee_3",
+            "sw-schlee_full"]
+TEST_NETWORK_PATH = "../input/bus_networks/test_examples/"
+TEST_REQUEST_PATH = "../input/requests/test_requests/"
+TEST_NETWORKS = ["single", "transfer", "circle"]
+
+
+def set_globals(network_name: str):
+    # same settings as used in TestLoop for the networks
+    if "sw-geo" in network_name:
+        Global.AVERAGE_KMH = 70.0
+        Global.KM_PER_UNIT = 3.0
+    elif "sw-schlee" in network_name:
+        Global.AVERAGE_KMH = 65.0
+        Global.KM_PER_UNIT = 1.5
+    else:
+        Global.AVERAGE_KMH = 65.0
+        Global.KM_PER_UNIT = 2.0
+    Global.CAPACITY_PER_LINE = 6
+    Global.NUMBER_OF_EXTRA_TRANSFERS = 1
+    Global.MAX_DELAY_EQUATION = "1.2 * math.log(x) / math.log(1.2)"
+    Global.TRANSFER_SECONDS = 2 * 60
+    Global.TIME_WINDOW_SECONDS = 15 * 60
+
+
+def bench_priority_queue(repetitions: int = 20):
+    # all-pairs dijkstra on each network, once with the old and once with the indexed priority queue
+    print("network; old queue [ms]; indexed queue [ms]; speedup")
+    for network_name in NETWORKS:
+        set_globals(network_name)
+        network: List[Bus] = read_bus_network(NETWORK_PATH + network_name + ".json")
+        network_graph = LineGraph(network)
+        stops = sorted(network_graph.all_stops, key=lambda x: x.id)
+
+        def all_pairs(queue_class):
+            # only the dijkstra itself is timed, attaching the request stops is the same for both
+            duration = 0
+            for pick_up in stops:
+                for drop_off in stops:
+                    if pick_up is not drop_off:
+                        request_graph = network_graph.attach_request(pick_up, drop_off)
+                        start = time.perf_counter()
+                        Helper.dijkstra(pick_up, request_graph, 1, drop_off, queue_class)
+                        duration += time.perf_counter() - start
+            return duration
+
+        old_time = sum(all_pairs(PriorityQueue) for _ in range(repetitions)) / repetitions
+        new_time = sum(all_pairs(IndexedPriorityQueue) for _ in range(repetitions)) / repetitions
+        print(f"{network_name}; {round(old_time * 1000, 2)}; {round(new_time * 1000, 2)}; {round(old_time / new_time, 2)}")
+
+    # real networks only have a few transfer points, so also show how both queues scale with the number of nodes
+    print("nodes; old queue [ms]; indexed queue [ms]; speedup")
+    for number_nodes in [100, 1000, 5000]:
+        rand = random.Random(number_nodes)
+        operations = [(rand.randrange(number_nodes), rand.randrange(1, 3600)) for _ in range(4 * number_nodes)]
+
+        def queue_workload(queue_class):
+            # dijkstra-like usage: every pop is followed by a few decrease-key calls
+            start = time.perf_counter()
+            queue = queue_class(list(range(number_nodes)))
+            queue.replace(0, 0)
+            op_iter = iter(operations)
+            while not queue.is_empty():
+                _, dist = queue.pop()
+                for _ in range(4):
+                    node, weight = next(op_iter, (0, 0))
+                    curr = queue.get_priority(node)
+                    if curr is not None and dist + weight < curr:
+                        queue.replace(node, dist + weight)
+            return time.perf_counter() - start
+
+        old_time = queue_workload(PriorityQueue)
+        new_time = queue_workload(IndexedPriorityQueue)
+        print(f"{number_nodes}; {round(old_time * 1000, 2)}; {round(new_time * 1000, 2)}; {round(old_time / new_time, 2)}")
+
+
+def run_stages(network_name: str, request_file: str):
+    # runs reading, event graph and model building once, returns the duration of each stage
+    durations: List[float] = []
+    start = time.perf_counter()
+    network: List[Bus] = read_bus_network(NETWORK_PATH + network_name + ".json")
+    network_graph = LineGraph(network)
+    requests: Set[Request] = read_requests(request_file, network_graph)
+    durations.append(time.perf_counter() - start)
+
+    all_splits: Set[SplitRequest] = set()
+    for req in requests:
+        for option in req.split_requests.values():
+            all_splits |= set(option)
+
+    start = time.perf_counter()
+    planner = EventBasedMILP(network, network_graph)
+    planner.build_event_graph(all_splits)
+    durations.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    EventModel(to_event_arrays(planner.event_graph), requests, network)
+    durations.append(time.perf_counter() - start)
+
+    return durations
+
+
+def bench_distance_matrix(request_name: str = "medium_window/L6-{}-100.csv"):
+    # compare matrix look-ups against computing euclidean distance and rounding for every call
+    matrix_functions = (Helper.get_distance, Helper.get_travel_time)
+    computed_functions = (Helper.calc_distance, lambda a, b: Timer.calc_time(Helper.calc_distance(a, b)))
+    stage_names = ["reading", "event graph", "model building"]
+
+    print("network; stage; computed [s]; matrix [s]; saved [s]")
+    for network_name in NETWORKS:
+        set_globals(network_name)
+        request_dir = Path(REQUEST_PATH + network_name)
+        request_file = str(next(request_dir.glob(request_name.format("*"))))
+
+        Helper.get_distance, Helper.get_travel_time = computed_functions
+        computed = run_stages(network_name, request_file)
+        Helper.get_distance, Helper.get_travel_time = matrix_functions
+        matrix = run_stages(network_name, request_file)
+
+        for i in range(len(stage_names)):
+            print(f"{network_name}; {stage_names[i]}; {round(computed[i], 3)}; {round(matrix[i], 3)}; "
+                  f"{round(computed[i] - matrix[i], 3)}")
+
+
+def bench_reading_workers(worker_counts: Tuple[int, ...] = (1, 2, 4, 8)):
+    # reading time of the biggest request file of every network for different numbers of worker processes
+    print("network; request file; " + "; ".join(f"{x} workers [s]" for x in worker_counts))
+    for network_name in NETWORKS:
+        set_globals(network_name)
+        network: List[Bus] = read_bus_network(NETWORK_PATH + network_name + ".json")
+        request_file = max(Path(REQUEST_PATH + network_name).glob("*/*.csv"), key=lambda x: x.stat().st_size)
+
+        durations: List[float] = []
+        for workers in worker_counts:
+            # fresh graph every time, so that no route options are cached from the previous run
+            network_graph = LineGraph(network)
+            start = time.perf_counter()
+            read_requests(str(request_file), network_graph, workers)
+            durations.append(time.perf_counter() - start)
+        print(f"{network_name}; {request_file.name}; " + "; ".join(str(round(x, 3)) for x in durations))
+
+
+def bench_event_graph(request_name: str = "medium_window/L6-{}-100.csv", repetitions: int = 5):
+    # event graph build time for the same request file of every network, best of a few runs
+    print("network; splits; event graph [s]")
+    for network_name in NETWORKS:
+        set_globals(network_name)
+        network: List[Bus] = read_bus_network(NETWORK_PATH + network_name + ".json")
+        network_graph = LineGraph(network)
+        request_file = str(next(Path(REQUEST_PATH + network_name).glob(request_name.format("*"))))
+        requests: Set[Request] = read_requests(request_file, network_graph)
+
+        all_splits: Set[SplitRequest] = set()
+        for req in requests:
+            for option in req.split_requests.values():
+                all_splits |= set(option)
+
+        durations: List[float] = []
+        for _ in range(repetitions):
+            planner = EventBasedMILP(network, network_graph)
+            start = time.perf_counter()
+            planner.build_event_graph(all_splits)
+            durations.append(time.perf_counter() - start)
+        print(f"{network_name}; {len(all_splits)}; {round(min(durations), 3)}")
+
+
+def bench_model(request_name: str = "medium_window/L6-{}-100.csv", repetitions: int = 3):
+    # MILP model build time for the same request file of every network, with and without variable names
+    print("network; variables; constraints; with names [s]; without names [s]")
+    for network_name in NETWORKS:
+        set_globals(network_name)
+        network: List[Bus] = read_bus_network(NETWORK_PATH + network_name + ".json")
+        network_graph = LineGraph(network)
+        request_file = str(next(Path(REQUEST_PATH + network_name).glob(request_name.format("*"))))
+        requests: Set[Request] = read_requests(request_file, network_graph)
+
+        all_splits: Set[SplitRequest] = set()
+        for req in requests:
+            for option in req.split_requests.values():
+                all_splits |= set(option)
+        planner = EventBasedMILP(network, network_graph)
+        planner.build_event_graph(all_splits)
+        event_arrays = to_event_arrays(planner.event_graph)
+
+        durations: List[float] = []
+        for names in (True, False):
+            Global.MODEL_NAMES = names
+            best = None
+            for _ in range(repetitions):
+                start = time.perf_counter()
+                event_model = EventModel(event_arrays, requests, network)
+                duration = time.perf_counter() - start
+                best = duration if best is None else min(best, duration)
+            durations.append(best)
+        Global.MODEL_NAMES = True
+        print(f"{network_name}; {event_model.model.number_of_variables()}; {event_model.model.number_of_rows()}; "
+              f"{round(durations[0], 3)}; {round(durations[1], 3)}")
+
+
+def bench_milp_backends(backends: Tuple[str, ...] = ("cplex", "highs", "cbc"), time_limit: int = 300):
+    # solve time (including passing the model) and objective of every MILP backend for the test examples, backends
+    # whose solver is not installed are skipped
+    print("network; variables; constraints; " + "; ".join(f"{x} [s]; {x} objective" for x in backends))
+    for network_name in TEST_NETWORKS:
+        set_globals(network_name)
+        network: List[Bus] = read_bus_network(TEST_NETWORK_PATH + network_name + ".json")
+        network_graph = LineGraph(network)
+        requests: Set[Request] = read_requests(TEST_REQUEST_PATH + network_name + ".csv", network_graph)
+
+        all_splits: Set[SplitRequest] = set()
+        for req in requests:
+            for option in req.split_requests.values():
+                all_splits |= set(option)
+        planner = EventBasedMILP(network, network_graph)
+        planner.build_event_graph(all_splits)
+        planner.event_graph.reduce_graph()
+        event_model = EventModel(remove_unconnected(to_event_arrays(planner.event_graph)), requests, network)
+
+        results: List[str] = []
+        for backend_str in backends:
+            try:
+                start = time.perf_counter()
+                solution = find_backend(backend_str).solve(event_model.model, time_limit, 0.0)
+                results.append(f"{round(time.perf_counter() - start, 3)}; {round(solution.get_objective_value(), 2)}")
+            except ImportError:
+                results.append("not installed; -")
+        print(f"{network_name}; {event_model.model.number_of_variables()}; {event_model.model.number_of_rows()}; "
+              + "; ".join(results))
+
+
+def bench_alns(time_limit: float = 10, backend: str = "highs"):
+    # requests served, km and planning time of the ALNS planner (time_limit seconds) and the event based MILP solved by
+    # backend for the test examples, both plans are checked by the Executor, the MILP is skipped if the solver is not
+    # installed
+    Global.ALNS_TIME_LIMIT = time_limit
+    Global.MILP_SOLVER = backend
+    print("network; requests; " + "; ".join(f"{x} served; {x} km; {x} [s]" for x in ("alns", f"milp {backend}")))
+    for network_name in TEST_NETWORKS:
+        set_globals(network_name)
+        results: List[str] = []
+        for planner_class in (ALNSPlanner, EventBasedMILP):
+            network: List[Bus] = read_bus_network(TEST_NETWORK_PATH + network_name + ".json")
+            network_graph = LineGraph(network)
+            requests: Set[Request] = read_requests(TEST_REQUEST_PATH + network_name + ".csv", network_graph)
+            executor = Executor(network, requests)
+            start = Global.COMPUTATION_START_TIME = time.time()
+            try:
+                Static(requests, executor, planner_class(network, network_graph)).start_context()
+            except ImportError:
+                results.append("not installed; -; -")
+                continue
+            duration = time.time() - start
+            served = sum(1 for x in requests if x.act_end_time is not None)
+            km = sum(Helper.get_distance(x.stop, y.stop) for route in executor.routes
+                     for x, y in zip(route.stop_list, route.stop_list[1:]))
+            results.append(f"{served}; {round(km, 2)}; {round(duration, 3)}")
+        print(f"{network_name}; {len(requests)}; " + "; ".join(results))
+
+
+def bench_event_graph_workers(worker_counts: Tuple[int, ...] = (1, 2, 4, 8),
+                              request_name: str = "medium_window/L6-{}-100.csv"):
+    # event graph build time for different numbers of worker processes (one line per task)
+    print("network; lines; " + "; ".join(f"{x} workers [s]" for x in worker_counts))
+    for network_name in NETWORKS:
+        set_globals(network_name)
+        network: List[Bus] = read_bus_network(NETWORK_PATH + network_name + ".json")
+        network_graph = LineGraph(network)
+        request_file = str(next(Path(REQUEST_PATH + network_name).glob(request_name.format("*"))))
+        requests: Set[Request] = read_requests(request_file, network_graph)
+
+        all_splits: Set[SplitRequest] = set()
+        for req in requests:
+            for option in req.split_requests.values():
+                all_splits |= set(option)
+
+        durations: List[float] = []
+        for workers in worker_counts:
+            planner = EventBasedMILP(network, network_graph)
+            start = time.perf_counter()
+            planner.build_event_graph(all_splits, workers)
+            durations.append(time.perf_counter() - start)
+        print(f"{network_name}; {len(network_graph.all_lines)}; " + "; ".join(str(round(x, 3)) for x in durations))
+
+
+def bench_memory(network_name: str = "sw-schlee_full", request_name: str = "medium_window/L6-{}-100.csv"):
+    # memory of the event graph of one reference instance, allocations are traced only while building it
+    set_globals(network_name)
+    network: List[Bus] = read_bus_network(NETWORK_PATH + network_name + ".json")
+    network_graph = LineGraph(network)
+    request_file = str(next(Path(REQUEST_PATH + network_name).glob(request_name.format("*"))))
+    requests: Set[Request] = read_requests(request_file, network_graph)
+
+    all_splits: Set[SplitRequest] = set()
+    for req in requests:
+        for option in req.split_requests.values():
+            all_splits |= set(option)
+
+    gc.collect()
+    tracemalloc.start()
+    planner = EventBasedMILP(network, network_graph)
+    planner.build_event_graph(all_splits)
+    gc.collect()
+    graph_bytes, peak_bytes = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    # ru_maxrss is given in kilobytes on linux
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    number_events = len(planner.event_graph.edge_dict)
+    print("instance; events; edges; event graph [MB]; peak while building [MB]; bytes per event; peak RSS [MB]")
+    print(f"{network_name}/{Path(request_file).name}; {number_events}; {planner.event_graph.get_number_of_edges()}; "
+          f"{round(graph_bytes / 2 ** 20, 2)}; {round(peak_bytes / 2 ** 20, 2)}; {round(graph_bytes / number_events)}; "
+          f"{round(peak_rss, 1)}")
+
+
+def bench_event_window(network_name: str = "sw-schlee_full", request_name: str = "medium_window/L6-{}-100.csv"):
+    # incremental event windows against computing every window with Helper.get_event_window from scratch
+    set_globals(network_name)
+    network: List[Bus] = read_bus_network(NETWORK_PATH + network_name + ".json")
+    network_graph = LineGraph(network)
+    request_file = str(next(Path(REQUEST_PATH + network_name).glob(request_name.format("*"))))
+    requests: Set[Request] = read_requests(request_file, network_graph)
+
+    all_splits: Set[SplitRequest] = set()
+    for req in requests:
+        for option in req.split_requests.values():
+            all_splits |= set(option)
+
+    planner = EventBasedMILP(network, network_graph)
+    planner.keep_window_cache = True
+    start = time.perf_counter()
+    planner.build_event_graph(all_splits)
+    first_build = time.perf_counter() - start
+    extensions = planner.window_extensions
+    # second build of the same splits, all windows are found in the cache
+    start = time.perf_counter()
+    planner.build_event_graph(all_splits)
+    second_build = time.perf_counter() - start
+
+    # every checked permutation once more: extending the state of its parent permutation vs. from scratch
+    replay: List[Tuple[EventWindowState, SplitRequest, SplitRequest, Set[SplitRequest], bool]] = []
+    for (event_user, other_users, event_type), state in planner.window_cache.items():
+        last_user = next(x for x in other_users if len(other_users) == 1 or
+                         (event_user, other_users - {x}, event_type) in planner.window_cache)
+        if len(other_users) == 1:
+            parent = EventWindowState(event_user, event_type)
+        else:
+            parent = planner.window_cache[(event_user, other_users - {last_user}, event_type)]
+        assert parent.extend(last_user).window == Helper.get_event_window(event_user, other_users, event_type)
+        replay.append((parent, last_user, event_user, set(other_users), event_type))
+
+    start = time.perf_counter()
+    for parent, last_user, _, _, _ in replay:
+        parent.extend(last_user)
+    incremental = time.perf_counter() - start
+    start = time.perf_counter()
+    for _, _, event_user, other_users, event_type in replay:
+        Helper.get_event_window(event_user, other_users, event_type)
+    from_scratch = time.perf_counter() - start
+
+    print("instance; windows; cache hits (rebuild); build [s]; rebuild [s]; windows incremental [s]; "
+          "windows from scratch [s]")
+    print(f"{network_name}/{Path(request_file).name}; {extensions}; {planner.window_cache_hits}; "
+          f"{round(first_build, 3)}; {round(second_build, 3)}; {round(incremental, 3)}; {round(from_scratch, 3)}")
+
+
+BENCHMARKS = {"priorityQueue": bench_priority_queue, "distanceMatrix": bench_distance_matrix,
+              "readingWorkers": bench_reading_workers, "eventGraph": bench_event_graph, "memory": bench_memory,
+              "eventWindow": bench_event_window, "eventGraphWorkers": bench_event_graph_workers,
+              "model": bench_model, "milpBackends": bench_milp_backends, "alns": bench_alns}
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        BENCHMARKS[sys.argv[1]]()
+    else:
+        for bench in BENCHMARKS.values():
+            bench()
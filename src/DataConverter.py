@@ -6,7 +6,7 @@ from typing import List
 from IOHandler import read_bus_network, read_requests
 from utils import Global
 from utils.demand.AbstractRequest import Request
-from utils.helper import Helper
+from utils.helper import Helper, DelayEquation
 from utils.helper.LineGraph import LineGraph
 from utils.network.Bus import Bus
 from utils.network.Stop import Stop
@@ -22,7 +22,7 @@ def createDistanceFile(requests: List[Request], depot: Stop, output_path: str, n
     for i in range(len(all_stops)):
         output_line = []
         for j in range(len(all_stops)):
-            output_line.append(round(Helper.calc_distance(all_stops[i], all_stops[j]), 2))
+            output_line.append(round(Helper.get_distance(all_stops[i], all_stops[j]), 2))
         output_list.append(output_line)
 
     #write file to output
@@ -45,9 +45,9 @@ def createRequestFile(requests: List[Request], network: List[Bus], output_path:
     for i in range(len(requests)):
         # make output for pick up stops
         # convert time windows
-        earliest = (requests[i].earl_start_time.get_in_seconds() - (conversion_value * 60)) / 60
-        latest = (requests[i].latest_start_time.get_in_seconds() - (conversion_value * 60)) / 60
-        max_ride_time = (requests[i].latest_arr_time - requests[i].latest_start_time).get_in_seconds() / 60
+        earliest = (requests[i].earl_start_time - (conversion_value * 60)) / 60
+        latest = (requests[i].latest_start_time - (conversion_value * 60)) / 60
+        max_ride_time = (requests[i].latest_arr_time - requests[i].latest_start_time) / 60
 
         pick_out.append([i + 1, Global.TRANSFER_SECONDS / 60, requests[i].number_of_passengers, round(earliest, 2), round(latest, 2), round(max_ride_time, 2)])
 
@@ -55,9 +55,9 @@ def createRequestFile(requests: List[Request], network: List[Bus], output_path:
     for i in range(len(requests)):
         # make output for pick up stops
         # convert time windows
-        earliest = (requests[i].earl_arr_time.get_in_seconds() - (conversion_value * 60)) / 60
-        latest = (requests[i].latest_arr_time.get_in_seconds() - (conversion_value * 60)) / 60
-        max_ride_time = (requests[i].latest_arr_time - requests[i].latest_start_time).get_in_seconds() / 60
+        earliest = (requests[i].earl_arr_time - (conversion_value * 60)) / 60
+        latest = (requests[i].latest_arr_time - (conversion_value * 60)) / 60
+        max_ride_time = (requests[i].latest_arr_time - requests[i].latest_start_time) / 60
 
         drop_out.append(
             [i + 1 + len(requests), Global.TRANSFER_SECONDS / 60, -requests[i].number_of_passengers, round(earliest, 2), round(latest, 2), round(max_ride_time, 2)])
@@ -85,6 +85,7 @@ def convert(path_to_config):
     Global.CAPACITY_PER_LINE = config.get('capacityPerLine')
     Global.NUMBER_OF_EXTRA_TRANSFERS = config.get('numberOfExtraTransfers')
     Global.MAX_DELAY_EQUATION = config.get('maxDelayEquation')
+    DelayEquation.compile_delay_equation(Global.MAX_DELAY_EQUATION)
     Global.TRANSFER_SECONDS = config.get('transferMinutes') * 60
     Global.TIME_WINDOW_SECONDS = config.get('timeWindowMinutes') * 60
     Global.CPLEX_PATH = config.get('pathCPLEX')
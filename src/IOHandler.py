@@ -1,21 +1,23 @@
 import csv
 import json
+import math
 import sys
 import os
 import time
+from concurrent.futures import ProcessPoolExecutor
 
 #import matplotlib.pyplot as plt
 from typing import List, Dict, Tuple, Set
 
 from utils import Global
+from main.plan.ALNSPlanner import ALNSPlanner
 from main.plan.EventBasedMILP import EventBasedMILP
 from main.plan.Planner import Planner
 from main.scope.Context import Context, Static
 from main.scope.Executor import Executor
 from utils.demand.AbstractRequest import Request, SplitRequest
-from utils.helper import Helper, Timer
+from utils.helper import Helper, Timer, DelayEquation, EventGraphCache
 from utils.helper.LineGraph import LineGraph
-from utils.helper.Timer import TimeImpl
 from utils.network.Bus import Bus
 from utils.network.Line import Line
 from utils.network.Stop import Stop
@@ -25,6 +27,8 @@ from utils.plan.Route import Route
 def find_planner(solver_str: str, network: List[Bus], network_graph: LineGraph):
     if solver_str == 'eventMILP':
         return EventBasedMILP(network, network_graph)
+    elif solver_str == 'alns':
+        return ALNSPlanner(network, network_graph)
     else:
         raise ValueError("the given solver string is not registered in the system")
 
@@ -36,38 +40,102 @@ def find_context(context_str, requests: Set[Request], executor: Executor, planne
         raise ValueError("the given context string is not registered in the system")
 
 
-def read_requests(request_path, network_graph: LineGraph):
+# graph of a worker process for reading in requests (set once per process by init_reading_worker)
+worker_graph: LineGraph | None = None
+
+
+def init_reading_worker(global_values: dict, network_graph: LineGraph):
+    global worker_graph
+    for name, value in global_values.items():
+        setattr(Global, name, value)
+    worker_graph = network_graph
+
+
+def complete_rows(rows: List[Tuple[int, int, int]], network_graph: LineGraph = None):
+    # fastest time, delay and route options for rows of (pick-up id, drop-off id, passengers)
+    # route options only contain ids, so they can be sent back from worker processes
+    if network_graph is None:
+        network_graph = worker_graph
+    stops: Dict[int, Stop] = {x.id: x for x in network_graph.all_stops}
+    hits_before, lookups_before = Global.ROUTE_CACHE_HITS, Global.ROUTE_CACHE_LOOKUPS
+
+    fastest_list: List[Tuple[int, int]] = []
+    for pick_up_id, drop_off_id, number_of_passengers in rows:
+        fastest_time, numb_transfers = network_graph.get_fastest(stops[pick_up_id], stops[drop_off_id],
+                                                                 number_of_passengers)
+        assert fastest_time is not Global.INFINITE_INT
+        fastest_list.append((fastest_time, numb_transfers))
+    # max delay equation evaluated for all rows at once
+    long_delays: List[int] = DelayEquation.calc_delays([x[0] for x in fastest_list])
+
+    results = []
+    for (pick_up_id, drop_off_id, number_of_passengers), (fastest_time, numb_transfers), long_delay in \
+            zip(rows, fastest_list, long_delays):
+        delay_time = long_delay + fastest_time
+        # max ride time of request is exactly the delay time
+        route_options = Helper.find_route_options(stops[pick_up_id], stops[drop_off_id], number_of_passengers,
+                                                  delay_time, numb_transfers + Global.NUMBER_OF_EXTRA_TRANSFERS,
+                                                  network_graph)
+        results.append((delay_time, numb_transfers, fastest_time,
+                        [[(x.v1.id, x.v2.id, x.line.id) for x in edge_list] for _, edge_list in route_options]))
+
+    return results, Global.ROUTE_CACHE_HITS - hits_before, Global.ROUTE_CACHE_LOOKUPS - lookups_before
+
+
+def read_requests(request_path, network_graph: LineGraph, workers: int = None):
+    if workers is None:
+        workers = Global.READING_WORKERS
     request_set: Set[Request] = set()
 
     stops: Dict[int, Stop] = {}
     for stop in network_graph.all_stops:
         stops[stop.id] = stop
+    lines: Dict[int, Line] = {x.id: x for x in network_graph.all_lines}
 
     with open(request_path, 'r') as request_file:
         csv_requests = csv.reader(request_file)
-
         next(csv_requests)
-        for row in csv_requests:
-            earl_time = Timer.conv_string_2_time(row[2])
-            pick_up: Stop = stops[int(row[3])]
-            drop_off: Stop = stops[int(row[4])]
-
-            network_graph.add_request(pick_up, drop_off)
-
-            delay_time, numb_transfers, fastest_time = Helper.complete_request(pick_up, drop_off, network_graph,
-                                                                             int(row[5]))
-            request = Request(int(row[0]), int(row[5]), pick_up, drop_off,
-                              earl_time, earl_time.add_seconds(delay_time + Global.TIME_WINDOW_SECONDS),
-                              Timer.conv_string_2_time(row[1]), numb_transfers, fastest_time)
-
-            split_lists: List[List[SplitRequest]] = Helper.find_split_requests(request, network_graph)
-            for variation_numb in range(len(split_lists)):
-                request.split_requests[variation_numb] = split_lists[variation_numb]
-                fill_time_windows(request, split_lists[variation_numb])
-
-            network_graph.delete_request(pick_up, drop_off)
-
-            request_set.add(request)
+        csv_rows = [row for row in csv_requests]
+
+    rows: List[Tuple[int, int, int]] = [(int(row[3]), int(row[4]), int(row[5])) for row in csv_rows]
+    row_results = []
+    if workers > 1 and len(rows) > 1:
+        # workers compute in chunks, results come back in order of rows
+        chunk_size = max(1, math.ceil(len(rows) / (workers * 4)))
+        chunks = [rows[i:i + chunk_size] for i in range(0, len(rows), chunk_size)]
+        global_values = {x: y for x, y in vars(Global).items() if x.isupper()}
+        with ProcessPoolExecutor(max_workers=workers, initializer=init_reading_worker,
+                                 initargs=(global_values, network_graph)) as executor:
+            for chunk_results, hits, lookups in executor.map(complete_rows, chunks):
+                row_results += chunk_results
+                Global.ROUTE_CACHE_HITS += hits
+                Global.ROUTE_CACHE_LOOKUPS += lookups
+    else:
+        row_results, _, _ = complete_rows(rows, network_graph)
+
+    # objects are only created here in order of rows -> same ids independent of number of workers
+    for row, (delay_time, numb_transfers, fastest_time, route_options) in zip(csv_rows, row_results):
+        earl_time = Timer.conv_string_2_seconds(row[2])
+        pick_up: Stop = stops[int(row[3])]
+        drop_off: Stop = stops[int(row[4])]
+
+        request = Request(int(row[0]), int(row[5]), pick_up, drop_off,
+                          earl_time, earl_time + delay_time + Global.TIME_WINDOW_SECONDS,
+                          Timer.conv_string_2_seconds(row[1]), numb_transfers, fastest_time)
+
+        # same subroute in different options -> same SplitRequest
+        split_dict: Dict[Tuple[int, int, int], SplitRequest] = {}
+        for variation_numb in range(len(route_options)):
+            split_list: List[SplitRequest] = []
+            for edge_ids in route_options[variation_numb]:
+                if edge_ids not in split_dict:
+                    split_dict[edge_ids] = SplitRequest(request, stops[edge_ids[0]], stops[edge_ids[1]],
+                                                        lines[edge_ids[2]], request.number_of_passengers)
+                split_list.append(split_dict[edge_ids])
+            request.split_requests[variation_numb] = split_list
+            fill_time_windows(request, split_list)
+
+        request_set.add(request)
 
     return request_set
 
@@ -104,14 +172,17 @@ def read_bus_network(network_path: str):
         if Global.CAPACITY_PER_LINE is None:
             if "capacity" in line:
                 lines[line["id"]] = Line(line["id"], stops_of_line, depot_stop, int(line["capacity"]),
-                                         Timer.conv_string_2_time(line["startTime"]),
-                                         Timer.conv_string_2_time(line["endTime"]))
+                                         Timer.conv_string_2_seconds(line["startTime"]),
+                                         Timer.conv_string_2_seconds(line["endTime"]))
             else:
                 raise ValueError("No Global Capacity or individual given")
         else:
             lines[line["id"]] = Line(line["id"], stops_of_line, depot_stop, Global.CAPACITY_PER_LINE,
-                                     Timer.conv_string_2_time(line["startTime"]),
-                                     Timer.conv_string_2_time(line["endTime"]))
+                                     Timer.conv_string_2_seconds(line["startTime"]),
+                                     Timer.conv_string_2_seconds(line["endTime"]))
+
+    # distances and travel times between all stops (and depots) are only computed once per network
+    Helper.build_distance_matrix(set(stops.values()) | set(depot_dict.values()))
 
     busses: List[Bus] = []
     bus_list = network_dict.get('busses')
@@ -125,44 +196,42 @@ def read_bus_network(network_path: str):
 def fill_time_windows(request: Request, split_req_list: List[SplitRequest]):
     # go through split_req_list and fill time windows (as big as possible)
 
-    total_distance: float = sum(Helper.calc_distance(x.pick_up_location, x.drop_off_location) for x in split_req_list)
+    total_distance: float = sum(Helper.get_distance(x.pick_up_location, x.drop_off_location) for x in split_req_list)
 
     shortest_time: int = Timer.calc_time(total_distance) + (len(split_req_list) * Global.TRANSFER_SECONDS)
     curr_earl_time: int = 0
 
     # special case for first split, because of fixed time window for pick-up
     start_split = split_req_list[0]
-    start_split.earl_start_time = request.earl_start_time.add_seconds(0)
-    start_split.latest_start_time = request.earl_start_time.add_seconds(Global.TIME_WINDOW_SECONDS)
+    start_split.earl_start_time = request.earl_start_time
+    start_split.latest_start_time = request.earl_start_time + Global.TIME_WINDOW_SECONDS
 
-    curr_earl_time += Global.TRANSFER_SECONDS + Timer.calc_time(
-        Helper.calc_distance(start_split.pick_up_location, start_split.drop_off_location))
+    curr_earl_time += Global.TRANSFER_SECONDS + Helper.get_travel_time(start_split.pick_up_location, start_split.drop_off_location)
 
-    start_split.earl_arr_time = start_split.earl_start_time.add_seconds(curr_earl_time)
-    prop_lat_arr: TimeImpl = request.latest_arr_time.sub_seconds(shortest_time - curr_earl_time)
+    start_split.earl_arr_time = start_split.earl_start_time + curr_earl_time
+    prop_lat_arr: int = request.latest_arr_time - (shortest_time - curr_earl_time)
     if start_split.latest_arr_time is None or start_split.latest_arr_time < prop_lat_arr:
         start_split.latest_arr_time = prop_lat_arr
 
     assert start_split.earl_arr_time < start_split.latest_arr_time
 
     for split_req in split_req_list[1:]:
-        prop_time_earl_start: TimeImpl = request.earl_start_time.add_seconds(curr_earl_time)
+        prop_time_earl_start: int = request.earl_start_time + curr_earl_time
         if split_req.earl_start_time is None or split_req.earl_start_time > prop_time_earl_start:
             split_req.earl_start_time = prop_time_earl_start
 
-        intermediate_time = Global.TRANSFER_SECONDS + Timer.calc_time(
-            Helper.calc_distance(split_req.pick_up_location, split_req.drop_off_location))
+        intermediate_time = Global.TRANSFER_SECONDS + Helper.get_travel_time(split_req.pick_up_location, split_req.drop_off_location)
 
-        prop_time_earl_arr = prop_time_earl_start.add_seconds(intermediate_time)
+        prop_time_earl_arr = prop_time_earl_start + intermediate_time
         if split_req.earl_arr_time is None or split_req.earl_arr_time > prop_time_earl_arr:
             split_req.earl_arr_time = prop_time_earl_arr
 
         curr_earl_time += intermediate_time
-        prop_time_lat_arr: TimeImpl = request.latest_arr_time.sub_seconds(shortest_time - curr_earl_time)
+        prop_time_lat_arr: int = request.latest_arr_time - (shortest_time - curr_earl_time)
         if split_req.latest_arr_time is None or split_req.latest_arr_time < prop_time_lat_arr:
             split_req.latest_arr_time = prop_time_lat_arr
 
-        prop_time_lat_start = prop_time_lat_arr.sub_seconds(intermediate_time)
+        prop_time_lat_start = prop_time_lat_arr - intermediate_time
         if split_req.latest_start_time is None or split_req.latest_start_time < prop_time_lat_start:
             split_req.latest_start_time = prop_time_lat_start
 
@@ -180,9 +249,23 @@ def main(path_2_config: str, path_to_req, speed: float, unitDist: float, output_
     Global.CAPACITY_PER_LINE = config.get('capacityPerLine')
     Global.NUMBER_OF_EXTRA_TRANSFERS = config.get('numberOfExtraTransfers')
     Global.MAX_DELAY_EQUATION = config.get('maxDelayEquation')
+    DelayEquation.compile_delay_equation(Global.MAX_DELAY_EQUATION)  # fail at start if equation is not allowed
     Global.TRANSFER_SECONDS = config.get('transferMinutes') * 60
     Global.TIME_WINDOW_SECONDS = config.get('timeWindowMinutes') * 60
     Global.CPLEX_PATH = config.get('pathCPLEX')
+    Global.READING_WORKERS = config.get('readingWorkers', 1)
+    Global.EVENT_GRAPH_WORKERS = config.get('eventGraphWorkers', 1)
+    Global.MAX_ONBOARD_SET = config.get('maxOnboardSet', 0)
+    Global.MAX_EVENTS_PER_SPLIT = config.get('maxEventsPerSplit', 0)
+    Global.EVENT_GRAPH_CACHE_DIR = config.get('eventGraphCache', '')
+    Global.CHECK_EVENT_GRAPH = config.get('checkEventGraph', False)
+    Global.MILP_SOLVER = config.get('milpSolver', 'cplex')
+    Global.MODEL_NAMES = config.get('modelNames', True)
+    Global.MODEL_EXPORT_PATH = config.get('modelExport', '')
+    Global.WARM_START = config.get('warmStart', True)
+    Global.ALNS_TIME_LIMIT = config.get('alnsTimeLimit', 60)
+    Global.ALNS_ITERATIONS = config.get('alnsIterations', 0)
+    Global.ALNS_SEED = config.get('alnsSeed', 0)
 
     request_path: str = path_to_req
     network_path: str = config.get('pathNetworkFile')
@@ -192,6 +275,8 @@ def main(path_2_config: str, path_to_req, speed: float, unitDist: float, output_
     network_file_path = "../input/bus_networks/real_networks"
     network_path: str = network_file_path + "/" + network_name + ".json"
     output_path: str = output_path_full
+    if Global.EVENT_GRAPH_CACHE_DIR:
+        Global.EVENT_GRAPH_CACHE_KEY = EventGraphCache.instance_key(network_path, request_path)
 
     context_str: str = config.get('context')
     solver_str: str = config.get('solver')
@@ -306,7 +391,7 @@ def create_output(requests: Set[Request], plans: List[Route], base_output_path:
     bus_overall_km_dict: Dict[Bus, float] = dict.fromkeys(buses, 0)
     bus_empty_km_dict: Dict[Bus, float] = dict.fromkeys(buses, 0)
     req_km_dict: Dict[Request, float] = dict.fromkeys(requests, 0)
-    request_stop_dict: Dict[Request, List[Tuple[TimeImpl, int, int]]] = {}
+    request_stop_dict: Dict[Request, List[Tuple[int, int, int]]] = {}
 
     csv_out_bus: Dict[Bus, List[List[str]]] = {
         x: [["number", "stop ID", "arrival time", "departure time", "pick up users", "drop of users"]] for x in
@@ -331,7 +416,7 @@ def create_output(requests: Set[Request], plans: List[Route], base_output_path:
 
             for curr_stop in plan.stop_list[1:]:
                 csv_out_bus[plan.bus].append([counter] + curr_stop.to_output())
-                km_between = Helper.calc_distance(prev_stop.stop, curr_stop.stop)
+                km_between = Helper.get_distance(prev_stop.stop, curr_stop.stop)
                 bus_overall_km_dict[plan.bus] += km_between
                 if len(passengers) == 0:
                     bus_empty_km_dict[plan.bus] += km_between
@@ -354,7 +439,7 @@ def create_output(requests: Set[Request], plans: List[Route], base_output_path:
         km_req = Timer.conv_time_to_dist(req.fastest_time - (Global.TRANSFER_SECONDS * req.numb_transfer))
         if req.act_start_time is not None:
             count_accepted += 1
-            wait_time = req.act_end_time.get_in_seconds() - req.act_start_time.get_in_seconds() - Timer.calc_time(req_km_dict[req])
+            wait_time = req.act_end_time - req.act_start_time - Timer.calc_time(req_km_dict[req])
             request_stop_dict[req].sort(key=lambda x: x[0])
             csv_out_req.append(
                 [str(req), str([x[2] for x in request_stop_dict[req][1:]]), str([x[1] for x in request_stop_dict[req]]),
@@ -383,9 +468,14 @@ def create_output(requests: Set[Request], plans: List[Route], base_output_path:
         pass
     overall_numbers.append([f"Relative MIP Gap Number Requests: {Global.INTEGRALITY_GAP_FIRST}"])
     overall_numbers.append([f"Relative MIP Gap KM travelled: {Global.INTEGRALITY_GAP_SECOND}"])
+    overall_numbers.append([f"Time to first incumbent: {Global.FIRST_INCUMBENT_TIME}"])
+    overall_numbers.append([f"Requests served by warm start: {Global.WARM_START_REQUESTS}"])
     overall_numbers.append([f"Number of Split Requests: {Global.NUMBER_OF_SPLITS}"])
+    overall_numbers.append([f"Route option cache hits: {Global.ROUTE_CACHE_HITS} of {Global.ROUTE_CACHE_LOOKUPS}"])
     overall_numbers.append([f"Event Graph Nodes: {Global.EVENT_GRAPH_NODES}"])
     overall_numbers.append([f"Event Graph Edges: {Global.EVENT_GRAPH_EDGES}"])
+    overall_numbers.append([f"Event Graph Nodes before reduction: {Global.EVENT_GRAPH_NODES_UNREDUCED}"])
+    overall_numbers.append([f"Event Graph Edges before reduction: {Global.EVENT_GRAPH_EDGES_UNREDUCED}"])
     overall_numbers.append(
         [f"computation time for reading in: {time.strftime('%H:%M:%S', time.gmtime(Global.COMPUTATION_TIME_READING))}"])
     overall_numbers.append([
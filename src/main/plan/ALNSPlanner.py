@@ -0,0 +1,538 @@
+import heapq
+import math
+import random
+import time
+from bisect import bisect_left, bisect_right
+from typing import List, Set, Dict, Tuple, Callable
+
+from utils import Global
+from main.plan.Planner import Planner
+from utils.demand.AbstractRequest import Request, SplitRequest
+from utils.helper import Helper
+from utils.helper.LineGraph import LineGraph
+from utils.network.Bus import Bus
+from utils.network.Line import Line
+from utils.network.Stop import Stop
+from utils.plan.Route import Route
+from utils.plan.RouteStop import RouteStop
+
+# scores of the operators of an iteration: new best solution, better than current, worse but accepted
+SCORES: Tuple[int, int, int] = (33, 9, 13)
+SEGMENT_LENGTH: int = 100  # iterations between updates of the operator weights
+REACTION: float = 0.1  # share of the scores of the last segment in the new weights
+COOLING: float = 0.9995
+# a solution with START_WORSE (relative) more km than the first one is accepted with probability 1/2 at the start,
+# a request less is (nearly) never accepted
+START_WORSE: float = 0.05
+# at most this share of the served requests is removed per iteration, but at least MIN_REMOVE and not more than MAX_REMOVE
+REMOVE_SHARE: float = 0.3
+MIN_REMOVE: int = 4
+MAX_REMOVE: int = 30
+POSITION_CHECKS: int = 30  # cheapest insertion positions of a split that are checked for feasibility
+NOISE: float = 0.2  # insertion costs of the random repair are changed by up to this share, to try other split options
+
+MISSING = object()
+
+
+def visit_location(visit: Tuple[SplitRequest, bool]) -> Stop:
+    return visit[0].pick_up_location if visit[1] else visit[0].drop_off_location
+
+
+def group_start(visits: List[Tuple[SplitRequest, bool]], position: int) -> int:
+    # first visit at the same stop as the visit before position (the bus stops once for them)
+    position = max(0, position - 1)
+    while 0 < position < len(visits) and visit_location(visits[position - 1]) is visit_location(visits[position]):
+        position -= 1
+    return position
+
+
+def route_distance(depot: Stop, visits: List[Tuple[SplitRequest, bool]]) -> float:
+    locations = [depot] + [visit_location(x) for x in visits] + [depot]
+    return sum(Helper.get_distance(x, y) for x, y in zip(locations, locations[1:]))
+
+
+# visits (split, pick-up) of every bus in driving order with the earliest schedule that keeps all time windows, the
+# capacity and the transfers (a split is picked up after the previous split of its option is dropped off)
+# changes are logged, so that an insertion that does not fit can be undone, dicts are replaced and not changed
+# within, so copies share all lists
+class RoutePlan:
+    def __init__(self, buses: List[Bus], penalty: float):
+        self.visits: Dict[Bus, List[Tuple[SplitRequest, bool]]] = {x: [] for x in buses}
+        self.arrivals: Dict[Bus, List[int]] = {x: [] for x in buses}
+        self.departs: Dict[Bus, List[int]] = {x: [] for x in buses}
+        self.distances: Dict[Bus, float] = {x: 0 for x in buses}
+        self.line_buses: Dict[Line, List[Bus]] = {}
+        for bus in buses:
+            self.line_buses.setdefault(bus.line, []).append(bus)
+        self.options: Dict[Request, int] = {}  # key of the split option of every served request
+        self.bus_of: Dict[SplitRequest, Bus] = {}
+        self.pick_times: Dict[SplitRequest, int] = {}  # departure after the pick-up
+        self.drop_times: Dict[SplitRequest, int] = {}  # arrival at the drop-off
+        # objective: km travelled and penalty for every request that is not served (as in EventModel)
+        self.penalty: float = penalty
+        self.log: List[Tuple[dict, object, object]] = []
+
+    def copy(self):
+        plan = RoutePlan([], self.penalty)
+        for name in ("visits", "arrivals", "departs", "distances", "options", "bus_of", "pick_times", "drop_times"):
+            setattr(plan, name, getattr(self, name).copy())
+        plan.line_buses = self.line_buses
+        return plan
+
+    def objective(self, number_requests: int) -> float:
+        return sum(self.distances.values()) + self.penalty * (number_requests - len(self.options))
+
+    def served(self) -> List[Request]:
+        return sorted(self.options, key=lambda x: x.id)
+
+    def option_splits(self, req: Request) -> List[SplitRequest]:
+        return req.split_requests[self.options[req]]
+
+    def set(self, values: dict, key, value):
+        self.log.append((values, key, values.get(key, MISSING)))
+        values[key] = value
+
+    def delete(self, values: dict, key):
+        self.log.append((values, key, values.pop(key, MISSING)))
+
+    def checkpoint(self) -> int:
+        return len(self.log)
+
+    def rollback(self, mark: int):
+        while len(self.log) > mark:
+            values, key, old = self.log.pop()
+            if old is MISSING:
+                values.pop(key, None)
+            else:
+                values[key] = old
+
+    def schedule(self, bus: Bus, visits: List[Tuple[SplitRequest, bool]], first: int = 0, last: int = None):
+        # earliest arrival and departure of every visit, visits at the same stop one after another are one stop of the
+        # bus (drop-offs at arrival, pick-ups at departure), None if a time window, the capacity or the line end is
+        # not kept
+        # the visits before first and from last on are the same as in the current schedule of bus, times before first
+        # are kept, after last as soon as the bus leaves a stop at the same time as before and no later visit is checked
+        # against a changed time
+        old_arrivals, old_departs = self.arrivals[bus], self.departs[bus]
+        shift = len(visits) - len(old_departs)
+        line = bus.line
+        transfer = Global.TRANSFER_SECONDS
+        first = group_start(visits, first)
+        arrivals: List[int] = old_arrivals[:first]
+        departs: List[int] = old_departs[:first]
+        picks: Dict[SplitRequest, int] = {}
+        drops: Dict[SplitRequest, int] = {}
+        # later visits of this bus whose checks use a time that changed (drop-off for max ride, pick-up for transfer)
+        pending: Set[Tuple[SplitRequest, bool]] = set()
+        load = 0
+        for split_req, pick_up in visits[:first]:
+            if pick_up:
+                picks[split_req] = self.pick_times[split_req]
+                load += split_req.number_of_passengers
+            else:
+                drops[split_req] = self.drop_times[split_req]
+                load -= split_req.number_of_passengers
+        location, depart = (visit_location(visits[first - 1]), departs[-1]) if first > 0 else \
+            (line.depot, line.start_time)
+        i = first
+        while i < len(visits):
+            if last is not None and i > last and not pending and depart == old_departs[i - shift - 1]:
+                return arrivals + old_arrivals[i - shift:], departs + old_departs[i - shift:]
+            stop = visit_location(visits[i])
+            j = i
+            while j < len(visits) and visit_location(visits[j]) is stop:
+                j += 1
+
+            # wait before arriving if a passenger would arrive too early
+            arrive = depart + Helper.get_travel_time(location, stop)
+            for split_req, pick_up in visits[i:j]:
+                if not pick_up and self.option_splits(split_req.parent)[-1] is split_req:
+                    arrive = max(arrive, split_req.parent.earl_arr_time)
+            leave = arrive + transfer
+            for split_req, pick_up in visits[i:j]:
+                if pick_up:
+                    splits = self.option_splits(split_req.parent)
+                    k = splits.index(split_req)
+                    if k == 0:
+                        req = split_req.parent
+                        leave = max(leave, req.earl_start_time + transfer)
+                        # wait so that the ride up to the drop-off of the last split on another bus is not too long
+                        final_drop = self.drop_times.get(splits[-1])
+                        if final_drop is not None and self.bus_of.get(splits[-1]) is not bus:
+                            leave = max(leave, final_drop - (req.latest_arr_time - req.latest_start_time) + transfer)
+                    else:
+                        # transfer: after the passenger arrived with the previous split
+                        previous = drops.get(splits[k - 1], self.drop_times.get(splits[k - 1]))
+                        # on the same bus the previous split has to be dropped off before
+                        if previous is None or self.bus_of.get(splits[k - 1]) is bus and splits[k - 1] not in drops:
+                            return None
+                        leave = max(leave, previous + transfer)
+
+            for split_req, pick_up in visits[i:j]:
+                if pick_up:
+                    continue
+                load -= split_req.number_of_passengers
+                drops[split_req] = arrive
+                pending.discard((split_req, False))
+                req = split_req.parent
+                splits = self.option_splits(req)
+                if splits[-1] is not split_req:
+                    following = splits[splits.index(split_req) + 1]
+                    if self.bus_of.get(following) is bus and self.drop_times.get(split_req) != arrive:
+                        pending.add((following, True))
+                else:
+                    if arrive > req.latest_arr_time:
+                        return None
+                    # max ride time, if the first split is on another bus, that bus waits long enough (or fails)
+                    if self.bus_of.get(splits[0]) is bus and (splits[0] not in picks or arrive - (
+                            picks[splits[0]] - transfer) > req.latest_arr_time - req.latest_start_time):
+                        return None
+            for split_req, pick_up in visits[i:j]:
+                if not pick_up:
+                    continue
+                load += split_req.number_of_passengers
+                picks[split_req] = leave
+                pending.discard((split_req, True))
+                splits = self.option_splits(split_req.parent)
+                if splits[0] is split_req:
+                    if leave > split_req.parent.latest_start_time + transfer:
+                        return None
+                    if self.bus_of.get(splits[-1]) is bus and self.pick_times.get(split_req) != leave:
+                        pending.add((splits[-1], False))
+            if load > line.capacity:
+                return None
+
+            arrivals += [arrive] * (j - i)
+            departs += [leave] * (j - i)
+            location, depart = stop, leave
+            i = j
+
+        if depart + Helper.get_travel_time(location, line.depot) > line.end_time:
+            return None
+        return arrivals, departs
+
+    def reschedule(self, queue: Dict[Bus, Tuple[int, int | None]]) -> bool:
+        # schedules the buses (with the first changed visit and the one from which the visits are the same as before)
+        # and the buses waiting for them at a transfer, False if one of them does not fit
+        updates = 0
+        while queue:
+            current, (first, last) = queue.popitem()
+            updates += 1
+            # transfers in both directions between buses can push each other forever
+            if updates > 2 * len(self.visits):
+                return False
+            schedule = self.schedule(current, self.visits[current], first, last)
+            if schedule is None:
+                return False
+            self.set(self.arrivals, current, schedule[0])
+            self.set(self.departs, current, schedule[1])
+
+            first = group_start(self.visits[current], first)
+            for (split_req, pick_up), arrive, leave in zip(self.visits[current][first:], schedule[0][first:],
+                                                           schedule[1][first:]):
+                if pick_up:
+                    if self.pick_times.get(split_req) != leave:
+                        self.set(self.pick_times, split_req, leave)
+                    continue
+                if self.drop_times.get(split_req) == arrive:
+                    continue
+                self.set(self.drop_times, split_req, arrive)
+                # the next split is picked up after a transfer, the drop-off of the last one can delay the first pick-up
+                splits = self.option_splits(split_req.parent)
+                k = splits.index(split_req)
+                waiting = splits[k + 1] if k < len(splits) - 1 else splits[0]
+                dependent = self.bus_of.get(waiting)
+                if dependent is not None and dependent is not current:
+                    position = self.visits[dependent].index((waiting, True))
+                    if dependent in queue:
+                        queue[dependent] = (min(position, queue[dependent][0]), max(position, queue[dependent][1]))
+                    else:
+                        queue[dependent] = (position, position)
+        return True
+
+    def insert_split(self, split_req: SplitRequest) -> float | None:
+        # pick-up and drop-off of the split at the cheapest (km) position of a bus of its line that fits, returns the
+        # added km, only positions close to the time windows are looked at
+        transfer = Global.TRANSFER_SECONDS
+        pick_location, drop_location = split_req.pick_up_location, split_req.drop_off_location
+        req = split_req.parent
+        # pick-up after the start of the request (first split) or the drop-off of the previous split
+        splits = self.option_splits(req)
+        k = splits.index(split_req)
+        earliest_pick = req.earl_start_time if k == 0 else self.drop_times[splits[k - 1]]
+        latest_pick = req.latest_start_time + transfer if k == 0 else req.latest_arr_time
+        candidates: List[Tuple[float, int, Bus, int, int]] = []
+        for number, bus in enumerate(self.line_buses[split_req.line]):
+            visits, departs = self.visits[bus], self.departs[bus]
+            locations = [bus.line.depot] + [visit_location(x) for x in visits] + [bus.line.depot]
+            distances = [Global.DISTANCE_MATRIX[x.idx] for x in locations]
+            first = max(0, bisect_left(departs, earliest_pick) - 1)
+            last_pick = min(len(visits), bisect_right(departs, latest_pick))
+            last_drop = min(len(visits), bisect_right(departs, req.latest_arr_time) + 1)
+            # times only get later by inserting, positions the bus can not reach in time are left out
+            leaves = [bus.line.start_time] + departs
+            for p in range(first, last_pick + 1):
+                # pick-up between visit p - 1 and p (locations p and p + 1)
+                after = locations[p + 1]
+                leave_pick = max(leaves[p] + Helper.get_travel_time(locations[p], pick_location), earliest_pick) + \
+                    transfer
+                if leave_pick > latest_pick:
+                    break
+                if leave_pick + Helper.get_travel_time(pick_location, drop_location) > req.latest_arr_time:
+                    continue
+                candidates.append((distances[p][pick_location.idx] + Helper.get_distance(pick_location, drop_location)
+                                   + Global.DISTANCE_MATRIX[drop_location.idx][after.idx] - distances[p][after.idx],
+                                   number, bus, p, p))
+                pick_cost = distances[p][pick_location.idx] + Global.DISTANCE_MATRIX[pick_location.idx][after.idx] \
+                    - distances[p][after.idx]
+                for q in range(p + 1, last_drop + 1):
+                    if leaves[q] + Helper.get_travel_time(locations[q], drop_location) > req.latest_arr_time:
+                        break
+                    candidates.append((pick_cost + distances[q][drop_location.idx] + Global.DISTANCE_MATRIX[
+                        drop_location.idx][locations[q + 1].idx] - distances[q][locations[q + 1].idx], number, bus, p,
+                                       q))
+
+        for cost, _, bus, p, q in heapq.nsmallest(POSITION_CHECKS, candidates, key=lambda x: x[:2]):
+            visits = self.visits[bus]
+            mark = self.checkpoint()
+            self.set(self.bus_of, split_req, bus)
+            self.set(self.visits, bus, visits[:p] + [(split_req, True)] + visits[p:q] + [(split_req, False)] + visits[q:])
+            self.set(self.distances, bus, self.distances[bus] + cost)
+            # the visits up to p and from q on (now q + 2) are the same
+            if self.reschedule({bus: (p, q + 2)}):
+                return cost
+            self.rollback(mark)
+        return None
+
+    def insert_option(self, req: Request, key: int) -> float | None:
+        # splits of the option one after another, returns the added km or None (then partly inserted)
+        self.set(self.options, req, key)
+        cost = 0
+        for split_req in req.split_requests[key]:
+            added = self.insert_split(split_req)
+            if added is None:
+                return None
+            cost += added
+        return cost
+
+    def insert_request(self, req: Request, rng: random.Random = None) -> bool:
+        # cheapest split option that fits (costs with noise if rng is given), False (and nothing changed) if none fits
+        best: Tuple[float, int] | None = None
+        keys = [x for x in sorted(req.split_requests) if req.split_requests[x]]
+        for key in keys:
+            mark = self.checkpoint()
+            cost = self.insert_option(req, key)
+            if cost is not None and rng is not None:
+                cost *= 1 + NOISE * (2 * rng.random() - 1)
+            if cost is not None and (best is None or cost < best[0]):
+                best = (cost, key)
+            if cost is None or len(keys) > 1:
+                self.rollback(mark)
+        if best is not None and len(keys) > 1:
+            self.insert_option(req, best[1])
+        self.log.clear()
+        return best is not None
+
+    def remove_request(self, req: Request) -> bool:
+        # False (and nothing changed) if the routes without it do not fit, e.g. a ride gets longer without waiting
+        mark = self.checkpoint()
+        splits = self.option_splits(req)
+        buses = sorted({self.bus_of[x] for x in splits}, key=lambda x: x.id)
+        for split_req in splits:
+            for values in (self.bus_of, self.pick_times, self.drop_times):
+                self.delete(values, split_req)
+        self.delete(self.options, req)
+        # all buses of the request at once, a transfer can reschedule another one of them
+        queue: Dict[Bus, Tuple[int, int | None]] = {}
+        for bus in buses:
+            positions = [i for i, x in enumerate(self.visits[bus]) if x[0].parent is req]
+            self.set(self.visits, bus, [x for x in self.visits[bus] if x[0].parent is not req])
+            self.set(self.distances, bus, route_distance(bus.line.depot, self.visits[bus]))
+            queue[bus] = (positions[0], positions[-1] + 1 - len(positions))
+        if not self.reschedule(queue):
+            self.rollback(mark)
+            return False
+        self.log.clear()
+        return True
+
+    def removal_gains(self) -> Dict[Request, float]:
+        # km saved by leaving out the visits of every served request (one at a time)
+        gains: Dict[Request, float] = {}
+        for bus, visits in self.visits.items():
+            locations = [bus.line.depot] + [visit_location(x) for x in visits] + [bus.line.depot]
+            for k, (split_req, _) in enumerate(visits):
+                gains[split_req.parent] = gains.get(split_req.parent, 0) + Helper.get_distance(
+                    locations[k], locations[k + 1]) + Helper.get_distance(locations[k + 1], locations[k + 2]) - \
+                    Helper.get_distance(locations[k], locations[k + 2])
+        return gains
+
+    def to_routes(self, buses: List[Bus]) -> List[Route]:
+        # visits at the same stop are one RouteStop, buses start and end at the depot
+        routes: List[Route] = []
+        for bus in buses:
+            line = bus.line
+            route = Route(bus)
+            routes.append(route)
+            visits = self.visits[bus]
+            if not visits:
+                route.stop_list.append(RouteStop(line.depot, line.start_time, line.end_time, bus))
+                continue
+
+            route_stop = RouteStop(line.depot, line.start_time, self.arrivals[bus][0] - Helper.get_travel_time(
+                line.depot, visit_location(visits[0])), bus)
+            route.stop_list.append(route_stop)
+            for visit, arrive, leave in zip(visits, self.arrivals[bus], self.departs[bus]):
+                if visit_location(visit) is not route_stop.stop:
+                    route_stop = RouteStop(visit_location(visit), arrive, leave, bus)
+                    route.stop_list.append(route_stop)
+                route_stop.depart_time = leave
+                if visit[1]:
+                    route_stop.pick_up.add(visit[0].parent)
+                else:
+                    route_stop.drop_off.add(visit[0].parent)
+
+            if route_stop.stop is line.depot:
+                route_stop.depart_time = line.end_time
+            else:
+                route.stop_list.append(RouteStop(line.depot, route_stop.depart_time + Helper.get_travel_time(
+                    route_stop.stop, line.depot), line.end_time, bus))
+        return routes
+
+
+# destroy operators: remove up to number served requests, return the removed ones
+def random_removal(plan: RoutePlan, number: int, rng: random.Random) -> List[Request]:
+    return [x for x in rng.sample(plan.served(), number) if plan.remove_request(x)]
+
+
+def worst_removal(plan: RoutePlan, number: int, rng: random.Random) -> List[Request]:
+    # requests with the most km saved when removed, randomised towards the top of the list
+    gains = plan.removal_gains()
+    candidates = sorted(plan.served(), key=lambda x: -gains[x])
+    removed: List[Request] = []
+    while candidates and len(removed) < number:
+        req = candidates.pop(int(len(candidates) * rng.random() ** 3))
+        if plan.remove_request(req):
+            removed.append(req)
+    return removed
+
+
+def related_removal(plan: RoutePlan, number: int, rng: random.Random) -> List[Request]:
+    # requests close in time and location to a random one (their routes can be exchanged)
+    served = plan.served()
+    seed = rng.choice(served)
+    related = sorted(served, key=lambda x: abs(x.earl_start_time - seed.earl_start_time) + Helper.get_travel_time(
+        x.pick_up_location, seed.pick_up_location) + Helper.get_travel_time(x.drop_off_location, seed.drop_off_location))
+    return [x for x in related[:number] if plan.remove_request(x)]
+
+
+# repair operators: insert the requests in some order, each at its cheapest position that fits
+def insert_by_start(plan: RoutePlan, requests: List[Request], rng: random.Random):
+    for req in sorted(requests, key=lambda x: (x.earl_start_time, x.id)):
+        plan.insert_request(req)
+
+
+def insert_random(plan: RoutePlan, requests: List[Request], rng: random.Random):
+    requests = requests.copy()
+    rng.shuffle(requests)
+    for req in requests:
+        plan.insert_request(req, rng)
+
+
+def insert_by_window(plan: RoutePlan, requests: List[Request], rng: random.Random):
+    # least time to spare first
+    for req in sorted(requests, key=lambda x: (x.latest_arr_time - x.earl_arr_time, x.id)):
+        plan.insert_request(req)
+
+
+DESTROY_OPERATORS: List[Callable[[RoutePlan, int, random.Random], List[Request]]] = \
+    [random_removal, worst_removal, related_removal]
+REPAIR_OPERATORS: List[Callable[[RoutePlan, List[Request], random.Random], None]] = \
+    [insert_by_start, insert_random, insert_by_window]
+
+
+# adaptive large neighbourhood search on the routes of the buses: remove requests and insert them again, operators are
+# chosen by weights adapted to their success, worse solutions are accepted by simulated annealing
+# only plans from empty buses (static context), runs Global.ALNS_TIME_LIMIT seconds
+class ALNSPlanner(Planner):
+    def __init__(self, bus_list: List[Bus], network_graph: LineGraph):
+        super().__init__(bus_list, network_graph)
+        self.rng = random.Random(Global.ALNS_SEED)
+        self.iterations: int = 0
+
+    def make_plan(self, new_requests: Set[Request], next_bus_locations: Dict[Bus, Stop],
+                  bus_user_dict: Dict[Bus, Set[Request]], wait_user_locations: Dict[Request, Stop],
+                  bus_delay: Dict[Bus, float]):
+        if any(bus_user_dict.values()):
+            raise ValueError("the ALNS planner can not plan for buses with passengers")
+        requests: List[Request] = sorted(new_requests | wait_user_locations.keys(), key=lambda x: x.id)
+        lines: Set[Line] = {x.line for x in self.bus_list}
+        penalty = int(3 * Helper.calc_total_network_size(lines)) * len(requests)
+
+        current = RoutePlan(self.bus_list, penalty)
+        insert_by_start(current, requests, self.rng)
+        Global.FIRST_INCUMBENT_TIME = round(time.time() - Global.COMPUTATION_START_TIME, 4)
+        Global.COMPUTATION_TIME_BUILDING = Global.FIRST_INCUMBENT_TIME
+        print(f"Initial routes serve {len(current.options)} of {len(requests)} requests after "
+              f"{Global.COMPUTATION_TIME_BUILDING} seconds")
+        Global.COMPUTATION_START_TIME = time.time()
+
+        best = current
+        current_value = best_value = current.objective(len(requests))
+        temperature = max(START_WORSE * sum(current.distances.values()) / math.log(2), 1e-9)
+        weights = ([1.0] * len(DESTROY_OPERATORS), [1.0] * len(REPAIR_OPERATORS))
+        scores = ([0.0] * len(DESTROY_OPERATORS), [0.0] * len(REPAIR_OPERATORS))
+        uses = ([0] * len(DESTROY_OPERATORS), [0] * len(REPAIR_OPERATORS))
+        end_time = time.time() + Global.ALNS_TIME_LIMIT
+        self.iterations = 0
+        while current.options and time.time() < end_time and \
+                (Global.ALNS_ITERATIONS <= 0 or self.iterations < Global.ALNS_ITERATIONS):
+            self.iterations += 1
+            chosen = [self.rng.choices(range(len(x)), x)[0] for x in weights]
+            candidate = current.copy()
+            served = len(candidate.options)
+            number = self.rng.randint(1, min(served, max(MIN_REMOVE, min(MAX_REMOVE, int(REMOVE_SHARE * served)))))
+            DESTROY_OPERATORS[chosen[0]](candidate, number, self.rng)
+            REPAIR_OPERATORS[chosen[1]](candidate, [x for x in requests if x not in candidate.options], self.rng)
+
+            value = candidate.objective(len(requests))
+            score = None
+            if value < best_value - 1e-6:
+                best, best_value, score = candidate, value, SCORES[0]
+            elif value < current_value - 1e-6:
+                score = SCORES[1]
+            elif value > current_value + 1e-6 and self.rng.random() < math.exp((current_value - value) / temperature):
+                score = SCORES[2]
+            if score is not None or value <= current_value + 1e-6:
+                current, current_value = candidate, value
+            for i in range(2):
+                scores[i][chosen[i]] += score or 0
+                uses[i][chosen[i]] += 1
+            temperature *= COOLING
+
+            if self.iterations % SEGMENT_LENGTH == 0:
+                for i in range(2):
+                    for j in range(len(weights[i])):
+                        if uses[i][j] > 0:
+                            weights[i][j] = (1 - REACTION) * weights[i][j] + REACTION * scores[i][j] / uses[i][j]
+                        # every operator keeps a chance
+                        weights[i][j] = max(weights[i][j], 0.1)
+                        scores[i][j], uses[i][j] = 0, 0
+
+        Global.COMPUTATION_TIME_SOLVING_FIRST = round(time.time() - Global.COMPUTATION_START_TIME, 4)
+        print(f"ALNS: {self.iterations} iterations, {len(best.options)} of {len(requests)} requests served, "
+              f"{round(sum(best.distances.values()), 3)} km after {Global.COMPUTATION_TIME_SOLVING_FIRST} seconds")
+        Global.COMPUTATION_START_TIME = time.time()
+
+        # values of the MILP planner that have no meaning here
+        Global.COMPUTATION_TIME_BUILDING_CPLEX = 0
+        Global.COMPUTATION_TIME_SOLVING_SECOND = 0
+        Global.INTEGRALITY_GAP_FIRST = None
+        Global.INTEGRALITY_GAP_SECOND = None
+        Global.WARM_START_REQUESTS = None
+        Global.EVENT_GRAPH_NODES = 0
+        Global.EVENT_GRAPH_EDGES = 0
+        Global.NUMBER_OF_SPLITS = len({y for x in requests for z in x.split_requests.values() for y in z})
+
+        for req in requests:
+            req.route_int = best.options.get(req)
+        self.curr_routes = best.to_routes(self.bus_list)
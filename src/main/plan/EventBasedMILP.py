@@ -1,14 +1,17 @@
 import time
-from typing import List, Set, Dict, Tuple
+from concurrent.futures import ProcessPoolExecutor
+from itertools import chain
+from typing import List, Set, Dict, Tuple, FrozenSet, Iterator
 
 from utils import Global
-from main.plan.CplexModel import CplexSolver
+from main.plan.EventModel import EventModel
 from main.plan.Planner import Planner
 from utils.demand.AbstractRequest import SplitRequest, Request
-from utils.helper import Helper
+from utils.helper import Helper, EventGraphCache
+from utils.helper.EventArrays import EventArrays, to_event_arrays, remove_unconnected
 from utils.helper.EventGraph import EventGraph, Event, PickUpEvent, DropOffEvent, IdleEvent
+from utils.helper.EventWindow import EventWindowState
 from utils.helper.LineGraph import LineGraph
-from utils.helper.Timer import TimeImpl
 from utils.network.Bus import Bus
 from utils.network.Line import Line
 from utils.network.Stop import Stop
@@ -30,107 +33,113 @@ def check_on_route(split: SplitRequest, search_loc: Stop):
     return False
 
 
-def sweep_line_local(splits_in_dir: Set[SplitRequest], line: Line, direction: int):
-    # extract event points(make queue with insert and delete objects) -> go trough queue
-    # -> update status_dict -> build output from keys
-    queue: Dict[Stop, Tuple[Set[SplitRequest], Set[SplitRequest]]] = {x: (set(), set()) for x in line.stops}
-
-    for split_req in splits_in_dir:
-        queue[split_req.pick_up_location][0].add(split_req)
-        queue[split_req.drop_off_location][1].add(split_req)
+# splits of one line and direction numbered densely (by split id), sets of them are stored as bitmasks (int)
+class SplitIndex:
+    __slots__ = ("splits", "position", "id_masks", "fit_masks")
+
+    def __init__(self, splits_in_dir: Set[SplitRequest], capacity: int):
+        self.splits: List[SplitRequest] = sorted(splits_in_dir, key=lambda x: x.split_id)
+        self.position: Dict[SplitRequest, int] = {x: i for i, x in enumerate(self.splits)}
+        # all splits of a request id (only one of them can be part of an event)
+        self.id_masks: Dict[int, int] = {}
+        for i, split_req in enumerate(self.splits):
+            self.id_masks[split_req.id] = self.id_masks.get(split_req.id, 0) | (1 << i)
+        # fit_masks[n]: all splits with at most n passengers
+        self.fit_masks: List[int] = [0] * (capacity + 1)
+        for i, split_req in enumerate(self.splits):
+            for n in range(split_req.number_of_passengers, capacity + 1):
+                self.fit_masks[n] |= 1 << i
+
+    def other_ids(self, split_req: SplitRequest) -> int:
+        return ~self.id_masks[split_req.id]
+
+
+# interval index over [earl_start, latest_arr] of the splits of a SplitIndex, prefix masks at every time point:
+# open_until[t]: splits with earliest start <= t, closed_before[t]: splits with latest arrival < t
+class IntervalIndex:
+    __slots__ = ("open_until", "open_before", "closed_before")
+
+    def __init__(self, split_index: SplitIndex):
+        splits = split_index.splits
+        event_points: List[int] = sorted({x for y in splits for x in (y.earl_start_time, y.latest_start_time,
+                                                                       y.earl_arr_time, y.latest_arr_time)})
+        started: Dict[int, int] = dict.fromkeys(event_points, 0)
+        finished: Dict[int, int] = dict.fromkeys(event_points, 0)
+        for i, req in enumerate(splits):
+            started[req.earl_start_time] |= 1 << i
+            finished[req.latest_arr_time] |= 1 << i
+
+        self.open_until: Dict[int, int] = {}
+        self.open_before: Dict[int, int] = {}
+        self.closed_before: Dict[int, int] = {}
+        curr_open, curr_closed = 0, 0
+        for time_obj in event_points:
+            self.open_before[time_obj] = curr_open
+            self.closed_before[time_obj] = curr_closed
+            curr_open |= started[time_obj]
+            curr_closed |= finished[time_obj]
+            self.open_until[time_obj] = curr_open
+
+    def time_overlaps(self, splits: List[SplitRequest]) -> List[Tuple[int, int]]:
+        # (pick-up, drop-off) overlaps of every split, pick-up: open when own pick-up window starts or starting while
+        # it is open, drop-off: open when own drop-off window starts or starting while it (and the interval) is open
+        open_until, open_before, closed_before = self.open_until, self.open_before, self.closed_before
+        output: List[Tuple[int, int]] = []
+        for req in splits:
+            earl_start, earl_arr, lat_arr = req.earl_start_time, req.earl_arr_time, req.latest_arr_time
+            pick_up = open_until[earl_start] & ~closed_before[earl_start] | \
+                open_until[req.latest_start_time] & ~open_before[earl_start]
+            drop_off = open_until[earl_arr] & ~closed_before[earl_arr]
+            if max(earl_start, earl_arr) <= lat_arr:
+                drop_off |= open_until[lat_arr] & ~open_before[max(earl_start, earl_arr)]
+            output.append((pick_up, drop_off))
+        return output
+
+
+def sweep_candidates(split_index: SplitIndex, line: Line, direction: int):
+    # go through stops in driving direction, status = all splits in the bus (picked up before, not dropped off yet),
+    # candidates of a split have to be in the bus and overlap in time -> (pick-up candidates, drop-off candidates)
+    splits = split_index.splits
+    overlaps: List[Tuple[int, int]] = IntervalIndex(split_index).time_overlaps(splits)
+    queue: Dict[Stop, Tuple[List[int], List[int]]] = {x: ([], []) for x in line.stops}
+    for i, split_req in enumerate(split_index.splits):
+        queue[split_req.pick_up_location][0].append(i)
+        queue[split_req.drop_off_location][1].append(i)
 
     event_points: List[Stop] = line.stops.copy()
     if direction == 1:
         event_points.reverse()
 
-    status_set: Set[SplitRequest] = set()
-    output_dict: Dict[SplitRequest, Tuple[Set[SplitRequest], Set[SplitRequest]]] = {x: (set(), set()) for x in
-                                                                                    splits_in_dir}
+    status: int = 0
+    output: List[Tuple[int, int]] = [(0, 0)] * len(splits)
 
     for stop in event_points:
-
-        status_set -= queue[stop][1]
-        for req_del in queue[stop][1]:
+        pick_ups, drop_offs = queue[stop]
+        if len(pick_ups) == 0 and len(drop_offs) == 0:
+            continue
+
+        for i in drop_offs:
+            status &= ~(1 << i)
+        for i in drop_offs:
+            req = splits[i]
+            # add so that candidates have shorter latest time
+            same_stop = sum(1 << j for j in drop_offs if req.latest_arr_time <= splits[j].latest_arr_time)
             # when deleting a request -> all remaining as candidate for drop-off
-            for other_del in queue[stop][1]:
-                # add so that candidates have shorter latest time
-                if req_del.id != other_del.id and req_del.latest_arr_time <= other_del.latest_arr_time:
-                    output_dict[req_del][1].add(other_del)
-            for other in status_set:
-                if other.id != req_del.id:
-                    output_dict[req_del][1].add(other)
+            drop_off_cands = (same_stop | status) & overlaps[i][1] & split_index.other_ids(req)
+            output[i] = (output[i][0], drop_off_cands)
 
         # when adding a request -> all remainining actives are candidate for pick-up
-        for req_in in queue[stop][0]:
-            for other_new in queue[stop][0]:
-                if req_in.id != other_new.id and req_in.latest_start_time <= other_new.latest_start_time:
-                    output_dict[req_in][0].add(other_new)
-
-            for other in status_set:
-                if other.id != req_in.id:
-                    output_dict[req_in][0].add(other)
-
-        status_set |= queue[stop][0]
-
-    return output_dict
-
-
-def sweep_line_time(splits_in_dir: Set[SplitRequest]):
-    queue: Dict[TimeImpl, List[Set[SplitRequest]]] = {}
-    # fill the queue, (yes this looks horrible, i know...)
-    for req in splits_in_dir:
-        if req.earl_start_time in queue:
-            queue[req.earl_start_time][0].add(req)
-        else:
-            queue[req.earl_start_time] = [{req}, set(), set(), set()]
+        for i in pick_ups:
+            req = splits[i]
+            same_stop = sum(1 << j for j in pick_ups if req.latest_start_time <= splits[j].latest_start_time)
+            pick_up_cands = (same_stop | status) & overlaps[i][0] & split_index.other_ids(req)
+            output[i] = (pick_up_cands, output[i][1])
 
-        if req.latest_start_time in queue:
-            queue[req.latest_start_time][1].add(req)
-        else:
-            queue[req.latest_start_time] = [set(), {req}, set(), set()]
+        for i in pick_ups:
+            status |= 1 << i
 
-        if req.earl_arr_time in queue:
-            queue[req.earl_arr_time][2].add(req)
-        else:
-            queue[req.earl_arr_time] = [set(), set(), {req}, set()]
+    return output
 
-        if req.latest_arr_time in queue:
-            queue[req.latest_arr_time][3].add(req)
-        else:
-            queue[req.latest_arr_time] = [set(), set(), set(), {req}]
-
-    event_points = sorted(queue.keys())
-    status_tuple: Tuple[Set[SplitRequest], Set[SplitRequest]] = (
-    set(), set())  # tuple of sets of split_requests for both interval types
-    total_status: Set[SplitRequest] = set()  # all open intervals [earliest_start, latest_finish]
-    output_dict: Dict[SplitRequest, Tuple[Set[SplitRequest], Set[SplitRequest]]] = {x: (set(), set()) for x in
-                                                                                    splits_in_dir}
-
-    for time_obj in event_points:
-        status_tuple[1].update(queue[time_obj][2])
-        status_tuple[0].update(queue[time_obj][0])
-        total_status |= queue[time_obj][0]
-
-        for drop_open in queue[time_obj][2]:
-            for other in total_status:
-                if other.id != drop_open.id:
-                    output_dict[drop_open][1].add(other)
-
-        for pick_open in queue[time_obj][0]:
-            for other in total_status:
-                if other.id != pick_open.id:
-                    output_dict[pick_open][0].add(other)
-                    # check also if candidate in other direction
-                    if other in status_tuple[0]:
-                        output_dict[other][0].add(pick_open)
-                    if other in status_tuple[1]:
-                        output_dict[other][1].add(pick_open)
-
-        status_tuple[0].difference_update(queue[time_obj][1])
-        status_tuple[1].difference_update(queue[time_obj][3])
-        total_status -= queue[time_obj][3]
-
-    return output_dict
 
 def check_if_in_next(next_permut, r_id, line, pick_up, drop_off):
     rs = [x for x in next_permut if x.id == r_id]
@@ -140,40 +149,61 @@ def check_if_in_next(next_permut, r_id, line, pick_up, drop_off):
             return True
     return False
 
+
 class EventBasedMILP(Planner):
     def __init__(self, bus_list: List[Bus], network_graph: LineGraph):
         super().__init__(bus_list, network_graph)
         self.event_graph = None
+        # window states of feasible permutations: (event user, other users, event type) -> state
+        self.window_cache: Dict[Tuple[SplitRequest, FrozenSet[SplitRequest], bool], EventWindowState] = {}
+        # only a context that plans again (dynamic) reads the states in the next build, otherwise they are released
+        self.keep_window_cache: bool = False
+        self.window_extensions: int = 0
+        self.window_cache_hits: int = 0
+        # permutations not extended because of Global.MAX_ONBOARD_SET, splits cut off by Global.MAX_EVENTS_PER_SPLIT
+        self.truncated_permutations: int = 0
+        self.truncated_splits: int = 0
 
     # checks all permutations recursively, only one request per id, always check if feasible, if not stop
-    def get_permutations(self, event_user: SplitRequest, cand_list: List[SplitRequest], curr_permut: Set[SplitRequest],
-                         index: int, event_type: bool) -> Set[Event]:
-        return_set: Set[Event] = set()
-        # check for next candidate to be distinct from previous ones
-        id_set: Set[int] = {x.id for x in curr_permut}
+    # candidates are a bitmask of split_index, only candidates after the last added one are left in it
+    def get_permutations(self, event_user: SplitRequest, cand_mask: int, split_index: SplitIndex,
+                         curr_permut: FrozenSet[SplitRequest], event_type: bool,
+                         curr_state: EventWindowState) -> Iterator[Event]:
+        # if max length exceeded stop -> only candidates that still fit in the bus
+        cand_mask &= split_index.fit_masks[max(0, event_user.line.capacity - curr_state.load)]
+        if cand_mask and 0 < Global.MAX_ONBOARD_SET <= len(curr_permut):
+            self.truncated_permutations += 1
+            return
 
         # check if candidates left
-        while len(cand_list) > index:
-            # if no one left stop
-            if not cand_list[index].id in id_set:
-
-                # add candidate to current_permutation, check for feasibility
-                next_permut = curr_permut | {cand_list[index]}
-                # if max length exceeded stop
-                if (sum(x.number_of_passengers for x in
-                        next_permut) + event_user.number_of_passengers) <= event_user.line.capacity:
-                    earl_time, lat_time = Helper.get_event_window(event_user, next_permut, event_type)
-                    if earl_time is not None and lat_time is not None:
-                        #print("Did Work")
-                        event: Event
-                        if event_type:
-                            event = PickUpEvent(event_user, next_permut, earl_time, lat_time)
-                        else:
-                            event = DropOffEvent(event_user, next_permut, earl_time, lat_time)
-                        return_set |= {event} | self.get_permutations(event_user, cand_list, next_permut, index + 1,
-                                                                      event_type)
-            index += 1
-        return return_set
+        while cand_mask:
+            low_bit = cand_mask & -cand_mask
+            cand_mask ^= low_bit
+            candidate = split_index.splits[low_bit.bit_length() - 1]
+
+            # add candidate to current_permutation, check for feasibility
+            next_permut = curr_permut | {candidate}
+            # extend window of the current permutation by the new candidate instead of walking all stops again
+            # (only feasible ones are cached, infeasible windows are cheap to find again)
+            next_state = self.window_cache.get((event_user, next_permut, event_type))
+            if next_state is None:
+                next_state = curr_state.extend(candidate)
+                self.window_extensions += 1
+                if next_state.window[0] is not None:
+                    self.window_cache[(event_user, next_permut, event_type)] = next_state
+            else:
+                self.window_cache_hits += 1
+            earl_time, lat_time = next_state.window
+            if earl_time is not None and lat_time is not None:
+                event: Event
+                if event_type:
+                    event = PickUpEvent(event_user, next_permut, earl_time, lat_time)
+                else:
+                    event = DropOffEvent(event_user, next_permut, earl_time, lat_time)
+                yield event
+                # next candidates have to be distinct in id from the added one
+                yield from self.get_permutations(event_user, cand_mask & split_index.other_ids(candidate), split_index,
+                                                 next_permut, event_type, next_state)
 
     def walk_route(self, req: Request, bus_user_dict: Dict[Bus, Set[Request]], next_bus_locations: Dict[Bus, Stop]):
         # find current position -> walk among selected route to position -> return all future splits
@@ -197,13 +227,98 @@ class EventBasedMILP(Planner):
 
         return result
 
+    # generates events for all lines and directions and connects them in a new event graph
+    def build_event_graph(self, all_follow_splits: Set[SplitRequest], workers: int = None):
+        self.event_graph = EventGraph()
+        # time windows of splits do not change -> only states of splits that are still planned are kept
+        self.window_cache = {x: y for x, y in self.window_cache.items() if x[0] in all_follow_splits}
+
+        # build candidate sets for lines and directions
+        line_dir_dict: Dict[Line, Tuple[Set[SplitRequest], Set[SplitRequest]]] = \
+            {x: (set(), set()) for x in self.network_graph.all_lines}
+        for split_req in all_follow_splits:
+            direction = Helper.check_dir(split_req)
+            line_dir_dict[split_req.line][direction].add(split_req)
+
+        sort_lines = sorted(line_dir_dict.keys(), key=lambda l: l.id)
+
+        if workers is None:
+            workers = Global.EVENT_GRAPH_WORKERS
+        if workers > 1 and len(sort_lines) > 1:
+            # lines share nothing -> every line in a worker, events are created again here in order of lines, so
+            # ids are unique and in the same order as without workers (window states stay in the workers)
+            splits: Dict[int, SplitRequest] = {x.split_id: x for x in all_follow_splits}
+            global_values = {x: y for x, y in vars(Global).items() if x.isupper()}
+            with ProcessPoolExecutor(max_workers=workers, initializer=init_graph_worker,
+                                     initargs=(global_values, self.bus_list, self.network_graph)) as executor:
+                tasks = [(x, line_dir_dict[x]) for x in sort_lines]
+                for line, ((records, edges), truncated) in zip(sort_lines, executor.map(build_line_graph, tasks)):
+                    self.event_graph.import_line_events(line, records, edges, splits)
+                    self.truncated_permutations += truncated[0]
+                    self.truncated_splits += truncated[1]
+        else:
+            for line in sort_lines:
+                truncated_before = self.truncated_splits
+                self.event_graph.add_events(self.build_line_events(line, line_dir_dict[line]))
+                # all events are connected by construction (unless events of a split are cut off, the unconnected
+                # ones are removed in make_plan then)
+                if Global.CHECK_EVENT_GRAPH and self.truncated_splits == truncated_before:
+                    self.event_graph.check_connectivity(self.event_graph.get_idle_event(line))
+
+        if not self.keep_window_cache:
+            self.window_cache = {}
+
+        self.warn_truncated()
+
+    # events left out because of Global.MAX_ONBOARD_SET or Global.MAX_EVENTS_PER_SPLIT make the plan worse
+    def warn_truncated(self):
+        if self.truncated_permutations > 0 or self.truncated_splits > 0:
+            print(f"Warning: event graph is truncated, {self.truncated_permutations} permutations stopped at "
+                  f"{Global.MAX_ONBOARD_SET} other passengers, {self.truncated_splits} times stopped at "
+                  f"{Global.MAX_EVENTS_PER_SPLIT} events of a split")
+
+    # all events of one line for its split requests of both directions, idle event first
+    def build_line_events(self, line: Line, dir_splits: Tuple[Set[SplitRequest], Set[SplitRequest]]) \
+            -> Iterator[Event]:
+        yield IdleEvent(line)
+
+        for direction in range(2):
+            # direction 0 is normal, 1 is reverse
+            # generate pick_up candidates and drop off candidates (close in location and time)
+            split_index = SplitIndex(dir_splits[direction], line.capacity)
+            candidates: List[Tuple[int, int]] = sweep_candidates(split_index, line, direction)
+
+            # make permutations (check if some split_requests already started)
+            for i, event_user in enumerate(split_index.splits):
+                pick_up_cands, drop_off_cands = candidates[i]
+
+                yield from self.limit_events(chain(
+                    [PickUpEvent(event_user, frozenset(), event_user.earl_start_time, event_user.latest_start_time)],
+                    self.get_permutations(event_user, pick_up_cands, split_index, frozenset(), True,
+                                          EventWindowState(event_user, True))))
+
+                yield from self.limit_events(chain(
+                    [DropOffEvent(event_user, frozenset(), event_user.earl_arr_time, event_user.latest_arr_time)],
+                    self.get_permutations(event_user, drop_off_cands, split_index, frozenset(), False,
+                                          EventWindowState(event_user, False))))
+
+    # at most Global.MAX_EVENTS_PER_SPLIT events (0 = all) of one split and event type
+    def limit_events(self, events: Iterator[Event]) -> Iterator[Event]:
+        if Global.MAX_EVENTS_PER_SPLIT <= 0:
+            yield from events
+            return
+        for number, event in enumerate(events):
+            if number == Global.MAX_EVENTS_PER_SPLIT:
+                self.truncated_splits += 1
+                return
+            yield event
+
     # for dynamic implementation:
     # find all active Requests(splitRequests) -> curr_waiting + new + passengers    and all poss. splitRequests
     def make_plan(self, new_requests: Set[Request], next_bus_locations: Dict[Bus, Stop],
                   bus_user_dict: Dict[Bus, Set[Request]], wait_user_locations: Dict[Request, Stop],
                   bus_delay: Dict[Bus, float]):
 
-        self.event_graph = EventGraph()
         all_active_requests: Set[Request] = set()
         all_active_requests |= new_requests | wait_user_locations.keys()
 
@@ -218,80 +333,72 @@ class EventBasedMILP(Planner):
         for req in curr_passengers:
             all_follow_splits |= self.walk_route(req, bus_user_dict, next_bus_locations)
 
-        # build candidate sets for lines and directions
-        line_dir_dict: Dict[Line, Tuple[Set[SplitRequest], Set[SplitRequest]]] = \
-            {x: (set(), set()) for x in self.network_graph.all_lines}
-        for split_req in all_follow_splits:
-            direction = Helper.check_dir(split_req)
-            line_dir_dict[split_req.line][direction].add(split_req)
-
-        sort_lines = sorted(line_dir_dict.keys(), key=lambda l: l.id)
-
-        for line in sort_lines:
-            permutations: Set[Event] = set()
-            idle_event = IdleEvent(line)
-            permutations.add(idle_event)
-
-            for direction in range(2):
-                # direction 0 is normal, 1 is reverse
-                # local_cand_map generate pick_up candidates and drop off candidates
-                users_here = line_dir_dict[line][direction]
-                # print(f"Users for this one is: {users_here}")
-                local_cand_dict: Dict[SplitRequest, Tuple[Set[SplitRequest], Set[SplitRequest]]] = \
-                    sweep_line_local(users_here, line, direction)
-
-                time_cand_dict: Dict[SplitRequest, Tuple[Set[SplitRequest], Set[SplitRequest]]] = sweep_line_time(
-                    line_dir_dict[line][direction])
-
-                agg_cand_dict: Dict[SplitRequest, Tuple[Set[SplitRequest], Set[SplitRequest]]] = {}
-                sum_candidates = 0
-                for split_req in local_cand_dict.keys():
-                    agg_cand_dict[split_req] = (local_cand_dict[split_req][0] & time_cand_dict[split_req][0],
-                                                local_cand_dict[split_req][1] & time_cand_dict[split_req][1])
-                    sum_candidates += len(agg_cand_dict[split_req][0]) + len(agg_cand_dict[split_req][0])
-
-                # make permutations (check if some split_requests already started)
-                # user_sorted: List[SplitRequest] = sorted(agg_cand_dict.keys(), key=lambda user: user.split_id)
-
-                for event_user in agg_cand_dict.keys():
-                    permutations |= {
-                        PickUpEvent(event_user, set(), event_user.earl_start_time, event_user.latest_start_time)}
-
-                    hold = self.get_permutations(event_user, list(agg_cand_dict[event_user][0]), set(), 0, True)
-                    permutations |= hold
-
-                    if event_user.id == 11 and line.id == 8134 and event_user.pick_up_location.id == 18:
-                        print(f"For {event_user.split_id} there are {hold} pick-up events")
-
-                    permutations |= {
-                        DropOffEvent(event_user, set(), event_user.earl_arr_time, event_user.latest_arr_time)}
-                    hold = self.get_permutations(event_user, list(agg_cand_dict[event_user][1]), set(), 0, False)
-                    permutations |= hold
-
-
-            self.event_graph.add_events(permutations)
-            # unnecessary all nodes should be valid by construction, could use for debugging though
-            self.event_graph.check_connectivity(idle_event)
+        # same instance as in a previous run -> same event graph
+        cached = EventGraphCache.load_event_graph(all_follow_splits, self.network_graph.all_lines)
+        if cached is None:
+            self.build_event_graph(all_follow_splits)
+            EventGraphCache.save_event_graph(self.event_graph, all_follow_splits,
+                                             (self.truncated_permutations, self.truncated_splits))
+        else:
+            self.event_graph, (self.truncated_permutations, self.truncated_splits) = cached
+            print("Loaded EventGraph from cache")
+            self.warn_truncated()
+        Global.EVENT_GRAPH_NODES_UNREDUCED = len(self.event_graph.edge_dict.keys())
+        Global.EVENT_GRAPH_EDGES_UNREDUCED = self.event_graph.get_number_of_edges()
+        self.event_graph.reduce_graph()
+        event_arrays: EventArrays = remove_unconnected(to_event_arrays(self.event_graph))
+        # the arrays replace the graph, it is not kept during building and solving the model
+        self.event_graph = None
+        print(f"Reduction removed {Global.EVENT_GRAPH_NODES_UNREDUCED - event_arrays.number_of_events()} nodes and "
+              f"{Global.EVENT_GRAPH_EDGES_UNREDUCED - event_arrays.number_of_edges()} edges")
 
         Global.COMPUTATION_TIME_BUILDING = round(time.time() - Global.COMPUTATION_START_TIME, 4)
         print(f"Created EventGraph after {Global.COMPUTATION_TIME_BUILDING} seconds")
-        print(self.event_graph.data_in_string())
-        Global.EVENT_GRAPH_NODES = len(self.event_graph.edge_dict.keys())
-        Global.EVENT_GRAPH_EDGES = self.event_graph.get_number_of_edges()
-        Global.NUMBER_OF_SPLITS = len(self.event_graph.request_dict.keys())
+        print(event_arrays.data_in_string())
+        Global.EVENT_GRAPH_NODES = event_arrays.number_of_events()
+        Global.EVENT_GRAPH_EDGES = event_arrays.number_of_edges()
+        Global.NUMBER_OF_SPLITS = len(event_arrays.splits)
+
+        # export without building the rows for solving, not part of the measured times
+        if Global.MODEL_EXPORT_PATH:
+            EventModel(event_arrays, all_active_requests, self.bus_list, build=False).write_mps(Global.MODEL_EXPORT_PATH)
+            print(f"Exported the MILP-Model to {Global.MODEL_EXPORT_PATH}")
         Global.COMPUTATION_START_TIME = time.time()
 
         #for x in self.event_graph.edge_dict.keys():
         #    print(x)
 
         # build lin. model
-        cplex_model: CplexSolver = CplexSolver(self.event_graph, all_active_requests, self.bus_list)
+        milp_model: EventModel = EventModel(event_arrays, all_active_requests, self.bus_list)
 
         Global.COMPUTATION_TIME_BUILDING_CPLEX = round(time.time() - Global.COMPUTATION_START_TIME, 4)
-        print(f"Build the Cplex-Model after {Global.COMPUTATION_TIME_BUILDING_CPLEX} seconds")
+        print(f"Build the MILP-Model after {Global.COMPUTATION_TIME_BUILDING_CPLEX} seconds")
         Global.COMPUTATION_START_TIME = time.time()
 
         # solve model
-        cplex_model.solve_model()
+        milp_model.solve_model()
         # convert to route solution
-        self.curr_routes = cplex_model.convert_to_plan()
+        self.curr_routes = milp_model.convert_to_plan()
+
+
+# planner of a worker process for building the event graph (set once per process by init_graph_worker)
+worker_planner: EventBasedMILP | None = None
+
+
+def init_graph_worker(global_values: dict, bus_list: List[Bus], network_graph: LineGraph):
+    global worker_planner
+    for name, value in global_values.items():
+        setattr(Global, name, value)
+    worker_planner = EventBasedMILP(bus_list, network_graph)
+
+
+def build_line_graph(task: Tuple[Line, Tuple[Set[SplitRequest], Set[SplitRequest]]]):
+    # events and edges of one line as records (see EventGraph.export_line_events)
+    # together with the number of truncations for this line
+    line, dir_splits = task
+    worker_planner.truncated_permutations, worker_planner.truncated_splits = 0, 0
+    line_graph = EventGraph()
+    line_graph.add_events(worker_planner.build_line_events(line, dir_splits))
+    if Global.CHECK_EVENT_GRAPH and worker_planner.truncated_splits == 0:
+        line_graph.check_connectivity(line_graph.get_idle_event(line))
+    return line_graph.export_line_events(line), (worker_planner.truncated_permutations, worker_planner.truncated_splits)
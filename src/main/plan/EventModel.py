@@ -0,0 +1,595 @@
+import gc
+import math
+import time
+from typing import Set, List, Tuple, Dict, Iterator
+
+from utils import Global
+from main.plan.MILPBackend import MILPModel, MILPSolution, MILPBackend, BINARY, find_backend
+from main.plan.MPSExport import write_mps
+from main.plan.TimeConstraints import RelativeConstraints
+from utils.demand.AbstractRequest import Request, SplitRequest
+from utils.helper import Helper
+from utils.helper.EventArrays import EventArrays, IDLE, PICK_UP, DROP_OFF
+from utils.helper.EventGraph import Event, IdleEvent, PickUpEvent
+from utils.network.Bus import Bus
+from utils.network.Line import Line
+from utils.network.Stop import Stop
+from utils.plan.Route import Route
+from utils.plan.RouteStop import RouteStop
+
+
+# event based formulation as MILPModel, solved by the MILPBackend given by Global.MILP_SOLVER
+class EventModel:
+    def __init__(self, event_arrays: EventArrays, requests: Set[Request], bus_list: List[Bus], build: bool = True):
+        self.event_arrays = event_arrays
+        self.requests = requests
+        self.buses = bus_list
+        self.time_const_maker = RelativeConstraints()
+        self.multi_objective = False
+        self.backend: MILPBackend = find_backend(Global.MILP_SOLVER)
+        self.solution: MILPSolution | None = None
+
+        # source event of every edge, position of split requests and idle event of every line
+        self.edge_sources: List[int] = event_arrays.edge_source().tolist()
+        self.split_pos: Dict[SplitRequest, int] = {x: i for i, x in enumerate(event_arrays.splits)}
+        self.event_pos: Dict[Event, int] = {x: i for i, x in enumerate(event_arrays.events)}
+        self.idle_events: Dict[Line, int] = {event_arrays.lines[y]: i for i, (x, y) in
+                                             enumerate(zip(event_arrays.kind.tolist(), event_arrays.line.tolist()))
+                                             if x == IDLE}
+
+        # column of every variable: q_r of every request, z_i of every route option, B_e+ and B_e- of every split
+        # request (in order of splits), x_a of every edge (in order of edges)
+        self.request_order: List[Request] = list(requests)
+        self.q_columns: Dict[Request, int] = {x: i for i, x in enumerate(self.request_order)}
+        self.z_columns: Dict[Tuple[Request, int], int] = {}
+        for req in self.request_order:
+            for key in req.split_requests.keys():
+                self.z_columns[(req, key)] = len(self.request_order) + len(self.z_columns)
+        self.b_offset: int = len(self.request_order) + len(self.z_columns)
+        self.x_offset: int = self.b_offset + 2 * len(event_arrays.splits)
+
+        # only the variables if not build, the rows can be streamed by generate_rows (e.g. to write_mps)
+        if not build:
+            self.model = self.build_columns()
+            return
+        # all rows are kept until they are added at once, garbage collection would scan them again and again
+        gc_enabled = gc.isenabled()
+        gc.disable()
+        try:
+            self.model = self.build_model()
+        finally:
+            if gc_enabled:
+                gc.enable()
+
+    def b_column(self, split_req: SplitRequest, start: bool) -> int:
+        return self.b_offset + 2 * self.split_pos[split_req] + (0 if start else 1)
+
+    def x_columns(self, first_edge: int, last_edge: int) -> List[int]:
+        # columns of the edges first_edge, ..., last_edge - 1
+        return list(range(self.x_offset + first_edge, self.x_offset + last_edge))
+
+    def get_edge_names(self) -> List[str]:
+        event_id = self.event_arrays.event_id.tolist()
+        return [f"x_{event_id[x]},{event_id[y]}" for x, y in
+                zip(self.edge_sources, self.event_arrays.out_indices.tolist())]
+
+    def get_split_events(self, split_req: SplitRequest, pick_up: bool) -> List[int]:
+        j = 2 * self.split_pos[split_req] + (0 if pick_up else 1)
+        offsets = self.event_arrays.split_offsets
+        return self.event_arrays.split_events[offsets[j]:offsets[j + 1]].tolist()
+
+    def edge_split(self, edge: int, target: bool) -> SplitRequest:
+        # split request of the target (or source) event of an edge
+        event = self.event_arrays.out_indices[edge] if target else self.edge_sources[edge]
+        return self.event_arrays.splits[self.event_arrays.split[event]]
+
+    def get_edge_distances(self) -> List[float]:
+        location = self.event_arrays.location.tolist()
+        return [Global.DISTANCE_MATRIX[location[x]][location[y]] for x, y in
+                zip(self.edge_sources, self.event_arrays.out_indices.tolist())]
+
+    def build_model(self) -> MILPModel:
+        model = self.build_columns()
+        # constraints as (columns, coefficients), all added at the end
+        rows: List[List[List]] = []
+        senses: List[str] = []
+        rhs: List[float] = []
+        for columns, coeffs, sense, value in self.generate_rows():
+            rows.append([columns, coeffs])
+            senses.append(sense)
+            rhs.append(value)
+        model.add_rows(rows, senses, rhs)
+        return model
+
+    def build_columns(self) -> MILPModel:
+        # model with all variables and the objective, without rows
+        model = MILPModel()
+        arrays = self.event_arrays
+        number_requests = len(self.request_order)
+        number_edges = arrays.number_of_edges()
+
+        lines = {x.line for x in self.buses}
+        # set objective function: minimize distance covered but add penalty if request not accepted
+        # (given as objective coefficients of the variables)
+        if self.multi_objective:
+            model.maximize = True
+            q_obj = [1] * number_requests
+            x_obj = None
+        else:
+            penalty = int(3 * Helper.calc_total_network_size(lines)) * len(self.requests)
+            q_obj = [-penalty] * number_requests
+            x_obj = self.get_edge_distances()
+
+        # add variables, one call per kind in order of columns (names are only for reading the model, e.g. written
+        # to a file, the model is built and read by columns)
+        names = Global.MODEL_NAMES
+        # q_r for every request
+        model.add_variables(number_requests, obj=q_obj, types=[BINARY] * number_requests,
+                            names=[f'q_{x.id}' for x in self.request_order] if names else None)
+
+        # z_i for route option
+        model.add_variables(len(self.z_columns), types=[BINARY] * len(self.z_columns),
+                            names=[f'z_{x.id},{y}' for x, y in self.z_columns] if names else None)
+
+        # B_e for every split request (shared B_e variables) -> time of departure for split_request (drop-off/pick-up)
+        variable_args = [y for x in arrays.splits for y in self.time_const_maker.create_variables(x)]
+        model.add_variables(len(variable_args), lb=[y for x in variable_args for y in x["lb"]],
+                            ub=[y for x in variable_args for y in x["ub"]],
+                            names=[y for x in variable_args for y in x["names"]] if names else None)
+
+        # x_a for every edge (edge number = position in out_indices)
+        model.add_variables(number_edges, obj=x_obj, types=[BINARY] * number_edges,
+                            names=self.get_edge_names() if names else None)
+
+        return model
+
+    def generate_rows(self) -> Iterator[Tuple[List[int], List[float], str, float]]:
+        # constraints one at a time as (columns, coefficients, sense, rhs), nothing is kept here
+        arrays = self.event_arrays
+        out_offsets, out_indices = arrays.out_offsets.tolist(), arrays.out_indices.tolist()
+        in_offsets, in_edges = arrays.in_offsets.tolist(), arrays.in_edges.tolist()
+        # columns of the incoming edges of every event (same positions as in_edges)
+        in_columns: List[int] = [self.x_offset + x for x in in_edges]
+        lines = {x.line for x in self.buses}
+
+        # for all events: sum out - sum in = 0
+        for i in range(arrays.number_of_events()):
+            columns = in_columns[in_offsets[i]:in_offsets[i + 1]]
+            number_in = len(columns)
+            columns += self.x_columns(out_offsets[i], out_offsets[i + 1])
+            yield columns, [1] * number_in + [-1] * (len(columns) - number_in), "E", 0
+
+        # for all split_options: sum of incoming edges x_a to first event >= z_i
+        for req in self.requests:
+            for option in req.split_requests:
+                for split_req in req.split_requests[option]:
+                    columns = []
+                    for event in self.get_split_events(split_req, True):
+                        columns += in_columns[in_offsets[event]:in_offsets[event + 1]]
+                    yield columns + [self.z_columns[(req, option)]], [1] * len(columns) + [-1], "G", 0
+
+        # for line: sum of outgoing from idle <= number of buses
+        for line in lines:
+            amount = sum(1 for x in self.buses if x.line == line)
+            idle_event = self.idle_events[line]
+
+            columns = self.x_columns(out_offsets[idle_event], out_offsets[idle_event + 1])
+            yield columns, [1] * len(columns), "L", amount
+
+        # think about idle_events!!!
+        # add timing constraints for every bus(idle_event)
+        for line in lines:
+            idle_event = self.idle_events[line]
+            idle_location = arrays.events[idle_event].location
+
+            # check incoming edges / previous event was drop-off
+            var_dict: Dict[SplitRequest, List[int]] = {}
+            for edge in in_edges[in_offsets[idle_event]:in_offsets[idle_event + 1]]:
+                sub_split = self.edge_split(edge, False)
+                if sub_split in var_dict:
+                    var_dict[sub_split] += [self.x_offset + edge]
+                else:
+                    var_dict[sub_split] = [self.x_offset + edge]
+
+            for found_split in var_dict.keys():
+                duration = Helper.get_travel_time(found_split.drop_off_location, idle_location)
+                yield (var_dict[found_split] + [self.b_column(found_split, False)],
+                       [duration] * len(var_dict[found_split]) + [1], "L",
+                       line.end_time - self.time_const_maker.add_value(found_split, False))
+
+            # check outgoing edges / start at idle_event
+            for edge in range(out_offsets[idle_event], out_offsets[idle_event + 1]):
+                sub_split = self.edge_split(edge, True)
+                if sub_split in var_dict:
+                    var_dict[sub_split] += [self.x_offset + edge]
+                else:
+                    var_dict[sub_split] = [self.x_offset + edge]
+
+            for found_split in var_dict.keys():
+                duration = Helper.get_travel_time(idle_location, found_split.pick_up_location)
+                yield (var_dict[found_split] + [self.b_column(found_split, True)],
+                       [-duration] * len(var_dict[found_split]) + [1], "G",
+                       line.start_time + Global.TRANSFER_SECONDS - self.time_const_maker.add_value(found_split, True))
+
+        # make timing constraints for all subsequent splits in event_graph...(for doc look into thesis)
+        kind = arrays.kind.tolist()
+        for split_req in arrays.splits:
+
+            for i in {0, 1}:
+                var_dict: Dict[
+                    Tuple[SplitRequest, bool], List[int]] = {}  # dict of form: {(request.id, type): [columns]}
+                for req_event in self.get_split_events(split_req, i == 0):
+                    for edge in range(out_offsets[req_event], out_offsets[req_event + 1]):
+                        sub_event = out_indices[edge]
+                        if kind[sub_event] != IDLE:
+                            type_bool = kind[sub_event] == PICK_UP
+                            poss_tuple = (self.edge_split(edge, True), type_bool)
+
+                            if poss_tuple in var_dict:
+                                var_dict[poss_tuple] += [self.x_offset + edge]
+                            else:
+                                var_dict[poss_tuple] = [self.x_offset + edge]
+
+                # values of split_req are the same for all constraints of this type
+                bool_first: bool = i == 0
+                if bool_first:
+                    split_first_location = split_req.pick_up_location
+                else:
+                    split_first_location = split_req.drop_off_location
+                first_column = self.b_column(split_req, bool_first)
+                first_value = self.time_const_maker.add_value(split_req, bool_first)
+
+                for found_tuple in var_dict.keys():
+                    other_split, bool_second = found_tuple
+                    if bool_second:
+                        split_sec_location = other_split.pick_up_location
+                    else:
+                        split_sec_location = other_split.drop_off_location
+                    second_value = self.time_const_maker.add_value(other_split, bool_second)
+
+                    duration = Helper.get_travel_time(split_first_location, split_sec_location)
+                    big_m = self.time_const_maker.get_big_m(split_req, bool_first, duration, second_value)
+                    coeffs = [-big_m] * len(var_dict[found_tuple]) + [-1] + [1]
+
+                    service_time = Global.TRANSFER_SECONDS * (int(bool(duration)))
+                    yield (var_dict[found_tuple] + [first_column, self.b_column(other_split, bool_second)], coeffs,
+                           "G", service_time - big_m + duration + first_value - second_value)
+
+        for req in self.requests:
+            found_tuples = set()
+            for key in req.split_requests.keys():
+                start_split = req.split_requests[key][0]
+                end_split = req.split_requests[key][-1]
+                if (start_split, end_split) not in found_tuples:
+                    found_tuples |= {(start_split, end_split)}
+                    max_ride_time = req.latest_arr_time - req.latest_start_time
+
+                    # max ride time constraint
+                    yield ([self.b_column(start_split, True), self.b_column(end_split, False)], [-1, 1], "L",
+                           max_ride_time + self.time_const_maker.add_value(start_split, True)
+                           - self.time_const_maker.add_value(end_split, False))
+
+                # add timing constraint for subsequent route stops
+                for i in range(0, len(req.split_requests[key]) - 1):
+                    prev_split = req.split_requests[key][i]
+                    sub_split = req.split_requests[key][i + 1]
+                    if prev_split.latest_arr_time > sub_split.latest_start_time:
+                        print("aua - das tut weh")
+                    sub_m = max(0, prev_split.latest_arr_time - sub_split.earl_start_time)
+                    yield ([self.b_column(prev_split, False), self.b_column(sub_split, True),
+                            self.z_columns[(req, key)]], [-1, 1, -sub_m], "G",
+                           self.time_const_maker.add_value(prev_split, False) - self.time_const_maker.add_value(
+                               sub_split, True) - sub_m)
+
+            # z variables for request sum to p_r
+            columns = [self.z_columns[(req, x)] for x in req.split_requests.keys()]
+            yield columns + [self.q_columns[req]], [1] * len(columns) + [-1], "E", 0
+
+    def greedy_start(self) -> Tuple[List[float], int]:
+        # values of all variables for a MIP start and the number of served requests: requests in order of their earliest
+        # start are appended to the route of the bus of their line(s) that picks them up first, a bus carries one split
+        # at a time (events without other passengers), times are set as early as possible
+        arrays = self.event_arrays
+        values: List[float] = [0] * self.model.number_of_variables()
+        # splits that are not served: pick-up as late and drop-off as early as possible (fits the max ride time rows)
+        for j in range(len(arrays.splits)):
+            values[self.b_offset + 2 * j] = self.model.ub[self.b_offset + 2 * j]
+            values[self.b_offset + 2 * j + 1] = self.model.lb[self.b_offset + 2 * j + 1]
+
+        # events without other passengers: (position of split, kind) -> position of event
+        alone_events: Dict[Tuple[int, int], int] = {}
+        for i, (x, y) in enumerate(zip(arrays.kind.tolist(), arrays.split.tolist())):
+            if x != IDLE and not arrays.events[i].remaining:
+                alone_events[(y, x)] = i
+        out_lists = (arrays.out_offsets.tolist(), arrays.out_indices.tolist())
+
+        # per bus of a line: (position of the last event, its location, departure time or None at the depot)
+        bus_states: Dict[Line, List[Tuple[int, Stop, int | None]]] = {}
+        for bus in self.buses:
+            bus_states.setdefault(bus.line, []).append((self.idle_events[bus.line], bus.line.depot, None))
+
+        served = 0
+        for req in sorted(self.requests, key=lambda x: (x.earl_start_time, x.id)):
+            for option in sorted(req.split_requests, key=lambda x: len(req.split_requests[x])):
+                placement = self.place_option(req, req.split_requests[option], bus_states, alone_events, out_lists)
+                if placement is None:
+                    continue
+                splits, bus_states = placement
+                values[self.q_columns[req]] = 1
+                values[self.z_columns[(req, option)]] = 1
+                for split_req, start, end, edges in splits:
+                    values[self.b_column(split_req, True)] = start - self.time_const_maker.add_value(split_req, True)
+                    values[self.b_column(split_req, False)] = end - self.time_const_maker.add_value(split_req, False)
+                    for edge in edges:
+                        values[self.x_offset + edge] = 1
+                served += 1
+                break
+
+        # buses return to the depot
+        for line, states in bus_states.items():
+            for last_event, _, depart in states:
+                if depart is not None:
+                    values[self.x_offset + find_edge(out_lists, last_event, self.idle_events[line])] = 1
+        return values, served
+
+    def place_option(self, req: Request, splits: List[SplitRequest],
+                     bus_states: Dict[Line, List[Tuple[int, Stop, int | None]]], alone_events: Dict[Tuple[int, int], int],
+                     out_lists: Tuple[List[int], List[int]]):
+        # splits of a route option one after another at the end of a bus route as (split, pick-up time, drop-off time,
+        # edges) and the new bus states, None if one of them does not fit (same timing as the rows of the model)
+        transfer = Global.TRANSFER_SECONDS
+        bus_states = {x: y.copy() for x, y in bus_states.items()}
+        placed = []
+        earliest = 0  # after a transfer not before the drop-off of the last split
+        for split_req in splits:
+            j = self.split_pos.get(split_req)
+            if (j, PICK_UP) not in alone_events or (j, DROP_OFF) not in alone_events:
+                return None
+            pick_up, drop_off = alone_events[(j, PICK_UP)], alone_events[(j, DROP_OFF)]
+            line = split_req.line
+            ride_edge = find_edge(out_lists, pick_up, drop_off)
+            if ride_edge is None or find_edge(out_lists, drop_off, self.idle_events[line]) is None:
+                return None
+
+            # bus with the earliest pick-up
+            best: Tuple[int, int, int] | None = None
+            for k, (last_event, location, depart) in enumerate(bus_states[line]):
+                edge = find_edge(out_lists, last_event, pick_up)
+                if edge is None:
+                    continue
+                duration = Helper.get_travel_time(location, split_req.pick_up_location)
+                if depart is None:
+                    start = line.start_time + transfer + duration
+                else:
+                    start = depart + duration + transfer * int(bool(duration))
+                start = max(start, earliest, split_req.earl_start_time + transfer)
+                if start <= split_req.latest_start_time + transfer and (best is None or start < best[1]):
+                    best = (k, start, edge)
+            if best is None:
+                return None
+
+            k, start, edge = best
+            duration = Helper.get_travel_time(split_req.pick_up_location, split_req.drop_off_location)
+            end = max(start + duration + transfer * int(bool(duration)), split_req.earl_arr_time + transfer)
+            if end > split_req.latest_arr_time + transfer or \
+                    end + Helper.get_travel_time(split_req.drop_off_location, line.depot) > line.end_time:
+                return None
+            bus_states[line][k] = (drop_off, split_req.drop_off_location, end)
+            placed.append((split_req, start, end, [edge, ride_edge]))
+            earliest = end
+
+        # max ride time
+        if placed[-1][2] - placed[0][1] > req.latest_arr_time - req.latest_start_time:
+            return None
+        return placed, bus_states
+
+    def write_mps(self, path: str):
+        # rows of the built model, generated again without keeping them otherwise
+        write_mps(path, self.model, None if self.model.number_of_rows() else self.generate_rows())
+
+    def solve_model(self):
+        if Global.MODEL_NAMES:
+            var_names_set = set(self.model.names)
+            if len(self.model.names) != len(var_names_set):
+                print("There are duplicate variable names")
+
+        start = None
+        if Global.WARM_START:
+            start, Global.WARM_START_REQUESTS = self.greedy_start()
+            print(f"Warm start serves {Global.WARM_START_REQUESTS} of {len(self.requests)} requests, objective "
+                  f"{sum(x * y for x, y in zip(self.model.obj, start))}, violated rows "
+                  f"{self.model.violated_rows(start)}, after {round(time.time() - Global.COMPUTATION_START_TIME, 4)} "
+                  f"seconds")
+        self.solution = self.backend.solve(self.model, 600 if self.multi_objective else 900, 0.0, start)
+
+        print("Objective Value: " + str(self.solution.get_objective_value()))
+        Global.INTEGRALITY_GAP_FIRST = gap_percent(self.solution.get_mip_relative_gap())
+        first_incumbent_time = self.solution.first_incumbent_time
+        Global.FIRST_INCUMBENT_TIME = None if first_incumbent_time is None else round(first_incumbent_time, 4)
+        print(f"First incumbent after {Global.FIRST_INCUMBENT_TIME} seconds, relative gap "
+              f"{self.solution.get_mip_relative_gap()}")
+
+        Global.COMPUTATION_TIME_SOLVING_FIRST = round(time.time() - Global.COMPUTATION_START_TIME, 4)
+        print(f"Solved model after {Global.COMPUTATION_TIME_SOLVING_FIRST} seconds")
+        Global.COMPUTATION_START_TIME = time.time()
+
+        if self.multi_objective:
+
+            req_vars = [self.q_columns[x] for x in self.requests]
+            value = sum(self.solution.get_values(req_vars))
+            self.model.add_rows([[req_vars, [1] * len(self.requests)]], ["G"], [value * 0.99999])
+
+            # reset obj function
+            self.model.maximize = False
+            for column in req_vars:
+                self.model.obj[column] = 0
+            for column, distance in zip(self.x_columns(0, self.event_arrays.number_of_edges()),
+                                        self.get_edge_distances()):
+                self.model.obj[column] = distance
+            # solution of the first model is feasible for the second one
+            self.solution = self.backend.solve(self.model, 900 - int(Global.COMPUTATION_TIME_SOLVING_FIRST), 0.0,
+                                               self.solution.values)
+
+            Global.INTEGRALITY_GAP_SECOND = gap_percent(self.solution.get_mip_relative_gap())
+
+        Global.COMPUTATION_TIME_SOLVING_SECOND = round(time.time() - Global.COMPUTATION_START_TIME, 4)
+        print(f"Solved model after {Global.COMPUTATION_TIME_SOLVING_SECOND} seconds")
+        Global.COMPUTATION_START_TIME = time.time()
+
+    def convert_to_plan(self):
+        # for every bus -> start at idle_event and walk along path
+        # -> (build RouteStop, check when finished!!, add users to pick-up and drop-off and times)
+        processed_pick_up: Set[SplitRequest] = set()
+        processed_drop_off: Set[SplitRequest] = set()
+        request_order = list(self.requests)
+        #arc_names = []
+        solution_ints = self.solution.get_values([self.q_columns[x] for x in request_order])
+        combi = []
+        for i in range(len(request_order)):
+            combi.append(f"Request: {request_order[i].id} has value {solution_ints[i]}")
+
+        line_set: Set[Line] = {x.line for x in self.buses}
+        line_bus_dict: Dict[Line, List[Bus]] = {x: [y for y in self.buses if y.line == x] for x in line_set}
+        all_plans: List[Route] = []
+
+        for line in line_bus_dict.keys():
+            prev_visited = {}   # stores events that are visited multiple times (and amount)
+            idle_pos = self.idle_events[line]
+            idle_event: IdleEvent = self.event_arrays.events[idle_pos]
+            out_offsets = self.event_arrays.out_offsets
+            edge_vals = self.solution.get_values(self.x_columns(out_offsets[idle_pos], out_offsets[idle_pos + 1]))
+            round_edge_vals = [round(x) for x in edge_vals]
+            for i in range(len(line_bus_dict[line])):
+                bus = line_bus_dict[line][i]
+                bus_plan = Route(bus)
+
+                # i is curr. bus idx(starting at 0)
+                counter = -1  # counter for amount of 1s already found
+                j = -1  # j iterates over edge values
+                while counter < i and j < len(round_edge_vals) - 1:  # if
+                    j += 1
+                    if round_edge_vals[j] == 1:
+                        counter += 1
+                # if counter is smaller then i => no 1 found so bus just stays in place
+                if counter < i:
+                    bus_plan.stop_list.append(
+                        RouteStop(idle_event.location, bus.line.start_time, bus.line.end_time, bus))
+                else:
+                    curr_route_stop = RouteStop(idle_event.location, bus.line.start_time,
+                                                bus.line.start_time, bus)
+                    bus_plan.stop_list.append(curr_route_stop)
+
+                    next_event = self.event_arrays.events[
+                        get_next_event(idle_pos, self.event_arrays, self.x_offset, self.solution, prev_visited)]
+
+                    while next_event is not idle_event:
+                        # check selected option for request -> if event fits with option:
+                        z_options = list(next_event.first.parent.split_requests.keys())
+                        z_options_vals = self.solution.get_values(
+                            [self.z_columns[(next_event.first.parent, x)] for x in z_options])
+                        z_options_vals_round = [round(x) for x in z_options_vals]
+                        if 1 in z_options_vals_round and next_event.first in next_event.first.parent.split_requests[
+                            z_options[z_options_vals_round.index(1)]]:
+
+                            if next_event.location != curr_route_stop.stop:
+
+                                duration = Helper.get_travel_time(curr_route_stop.stop, next_event.location)
+                                if isinstance(next_event, PickUpEvent):
+                                    if next_event.first not in processed_pick_up:
+                                        time_var = round(self.solution.get_values(self.b_column(next_event.first, True)))
+                                        curr_route_stop = RouteStop(next_event.location,
+                                                                    curr_route_stop.depart_time + duration,
+                                                                    time_var + self.time_const_maker.add_value(
+                                                                        next_event.first, True), bus)
+                                        bus_plan.stop_list.append(curr_route_stop)
+                                        curr_route_stop.pick_up.add(next_event.first.parent)
+                                        processed_pick_up.add(next_event.first)
+                                    else:
+                                        print(f"Double serviced request removed: {next_event}")
+                                else:
+                                    if next_event.first not in processed_drop_off:
+                                        time_var = round(self.solution.get_values(self.b_column(next_event.first, False)))
+                                        curr_route_stop = RouteStop(next_event.location,
+                                                                    curr_route_stop.depart_time + duration,
+                                                                    time_var + self.time_const_maker.add_value(
+                                                                        next_event.first, False), bus)
+                                        bus_plan.stop_list.append(curr_route_stop)
+                                        curr_route_stop.drop_off.add(next_event.first.parent)
+                                        processed_drop_off.add(next_event.first)
+                                    else:
+                                        print(f"Double serviced request removed: {next_event}")
+                            else:
+                                if isinstance(next_event, PickUpEvent):
+                                    if next_event.first not in processed_pick_up:
+                                        time_var = (round(self.solution.get_values(self.b_column(next_event.first, True)))
+                                                    + self.time_const_maker.add_value(next_event.first, True))
+                                        curr_route_stop.pick_up.add(next_event.first.parent)
+                                        processed_pick_up.add(next_event.first)
+                                    else:
+                                        print(f"Double serviced request removed: {next_event}")
+                                else:
+                                    if next_event.first not in processed_drop_off:
+                                        time_var = (self.solution.get_values(self.b_column(next_event.first, False))
+                                                    + self.time_const_maker.add_value(next_event.first, False))
+                                        curr_route_stop.drop_off.add(next_event.first.parent)
+                                        processed_drop_off.add(next_event.first)
+                                    else:
+                                        print(f"Double serviced request removed: {next_event}")
+
+                                curr_route_stop.depart_time = int(time_var)
+                        else:
+                            print(f"Unnecessary event removed: {next_event}")
+
+                        next_event = self.event_arrays.events[
+                            get_next_event(self.event_pos[next_event], self.event_arrays, self.x_offset,
+                                           self.solution, prev_visited)]
+
+                    # handle final idle_event stop
+                    if curr_route_stop.stop == bus.line.depot:
+                        curr_route_stop.depart_time = bus.line.end_time
+                    else:
+                        duration = Helper.get_travel_time(curr_route_stop.stop, next_event.location)
+                        bus_plan.stop_list.append(
+                            RouteStop(next_event.location, curr_route_stop.depart_time + duration,
+                                      bus.line.end_time, bus))
+                    if len(bus_plan.stop_list) > 1:
+                        duration = Helper.get_travel_time(bus_plan.stop_list[0].stop, bus_plan.stop_list[1].stop)
+                        bus_plan.stop_list[0].depart_time = (bus_plan.stop_list[1].arriv_time - duration)
+                all_plans.append(bus_plan)
+
+        return all_plans
+
+
+# the gap is infinite if the solver has no incumbent or no finite bound
+def gap_percent(gap: float) -> int | None:
+    return int(gap * 100) if math.isfinite(gap) else None
+
+
+def find_edge(out_lists: Tuple[List[int], List[int]], source: int, target: int) -> int | None:
+    # edge number of source -> target (out_offsets and out_indices as lists)
+    out_offsets, out_indices = out_lists
+    for edge in range(out_offsets[source], out_offsets[source + 1]):
+        if out_indices[edge] == target:
+            return edge
+    return None
+
+
+def get_next_event(prev_event: int, event_arrays: EventArrays, x_offset: int, solution, prev_visited: dict):
+    # position of the event after the event at position prev_event (x_offset = column of the first edge)
+    first_edge, last_edge = int(event_arrays.out_offsets[prev_event]), int(event_arrays.out_offsets[prev_event + 1])
+    edge_vals = solution.get_values(list(range(x_offset + first_edge, x_offset + last_edge)))
+    next_round_edge_vals = [round(x) for x in edge_vals]
+    indices = [i for i, val in enumerate(next_round_edge_vals) if val == 1]
+
+    number_visited = 0
+    if len(indices) > 1:
+        if prev_event in prev_visited:
+            number_visited = prev_visited[prev_event]
+            prev_visited[prev_event] += 1
+        else:
+            prev_visited[prev_event] = 1
+
+    next_event_idx = indices[number_visited]
+    next_event = int(event_arrays.out_indices[first_edge + next_event_idx])
+
+    return next_event
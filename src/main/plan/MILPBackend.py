@@ -0,0 +1,248 @@
+from typing import List
+
+
+# variable types of MILPModel
+BINARY: str = "B"
+CONTINUOUS: str = "C"
+INFINITY: float = float("inf")
+
+
+# mixed integer linear program independent of the solver: variables are columns 0, 1, ... with objective coefficient,
+# bounds and type, constraints are rows (columns, coefficients) with sense "L" (<=), "G" (>=) or "E" (=) and rhs
+class MILPModel:
+    __slots__ = ("maximize", "obj", "lb", "ub", "types", "names", "rows", "senses", "rhs")
+
+    def __init__(self):
+        self.maximize: bool = False
+        self.obj: List[float] = []
+        self.lb: List[float] = []
+        self.ub: List[float] = []
+        self.types: List[str] = []
+        self.names: List[str] = []  # empty if the variables have no names
+        self.rows: List[List[List]] = []
+        self.senses: List[str] = []
+        self.rhs: List[float] = []
+
+    def number_of_variables(self) -> int:
+        return len(self.types)
+
+    def number_of_rows(self) -> int:
+        return len(self.rows)
+
+    def add_variables(self, number: int, obj: List[float] = None, lb: List[float] = None, ub: List[float] = None,
+                      types: List[str] = None, names: List[str] = None) -> int:
+        # returns the column of the first new variable, binary variables have bounds 0 and 1 by default
+        first = self.number_of_variables()
+        types = types if types is not None else [CONTINUOUS] * number
+        self.obj += obj if obj is not None else [0] * number
+        self.lb += lb if lb is not None else [0] * number
+        self.ub += ub if ub is not None else [1 if x == BINARY else INFINITY for x in types]
+        self.types += types
+        if names is not None:
+            self.names += names
+        return first
+
+    def add_rows(self, rows: List[List[List]], senses: List[str], rhs: List[float]):
+        self.rows += rows
+        self.senses += senses
+        self.rhs += rhs
+
+    def violated_rows(self, values: List[float], tolerance: float = 1e-6) -> int:
+        # number of rows and variable bounds that values do not satisfy
+        violated = sum(1 for x, y, z in zip(values, self.lb, self.ub) if x < y - tolerance or x > z + tolerance)
+        for (columns, coeffs), sense, rhs in zip(self.rows, self.senses, self.rhs):
+            activity = sum(values[x] * y for x, y in zip(columns, coeffs))
+            if sense != "G" and activity > rhs + tolerance or sense != "L" and activity < rhs - tolerance:
+                violated += 1
+        return violated
+
+
+# values of all variables of a solved MILPModel (same interface as the solution of cplex)
+class MILPSolution:
+    __slots__ = ("values", "objective_value", "mip_gap", "first_incumbent_time")
+
+    def __init__(self, values: List[float], objective_value: float, mip_gap: float,
+                 first_incumbent_time: float | None = None):
+        self.values: List[float] = values
+        self.objective_value: float = objective_value
+        self.mip_gap: float = mip_gap
+        # seconds after the start of the solver until the first feasible solution, None if the solver does not tell
+        self.first_incumbent_time: float | None = first_incumbent_time
+
+    def get_values(self, columns: int | List[int]):
+        if isinstance(columns, int):
+            return self.values[columns]
+        return [self.values[x] for x in columns]
+
+    def get_objective_value(self) -> float:
+        return self.objective_value
+
+    def get_mip_relative_gap(self) -> float:
+        return self.mip_gap
+
+
+# solver for MILPModel, the solver package is only imported when solving (only the used one has to be installed)
+# start: values of all variables (MIP start), integer values are used as first incumbent, continuous ones are
+# computed again by the solver if they do not fit
+class MILPBackend:
+    def solve(self, model: MILPModel, time_limit: float, mip_gap: float, start: List[float] = None) -> MILPSolution:
+        pass
+
+
+class CplexBackend(MILPBackend):
+    def load(self, model: MILPModel):
+        import cplex
+
+        cplex_model = cplex.Cplex()
+        if model.maximize:
+            cplex_model.objective.set_sense(cplex_model.objective.sense.maximize)
+        else:
+            cplex_model.objective.set_sense(cplex_model.objective.sense.minimize)
+        cplex_model.variables.add(obj=model.obj, lb=model.lb, ub=[min(x, cplex.infinity) for x in model.ub],
+                                  types=model.types, names=model.names if model.names else None)
+        cplex_model.linear_constraints.add(lin_expr=model.rows, senses=model.senses, rhs=model.rhs)
+        return cplex_model
+
+    def solve(self, model: MILPModel, time_limit: float, mip_gap: float, start: List[float] = None) -> MILPSolution:
+        import cplex
+
+        cplex_model = self.load(model)
+        if start is not None:
+            # solve_fixed: integer values are fixed and the continuous ones are solved for
+            cplex_model.MIP_starts.add(cplex.SparsePair(ind=list(range(len(start))), val=start),
+                                       cplex_model.MIP_starts.effort_level.solve_fixed, "warm_start")
+        incumbent_callback = cplex_model.register_callback(incumbent_time_callback(cplex))
+        # cplex_model.parameters.randomseed.set(2)
+        # cplex_model.write("model.lp")
+
+        cplex_model.parameters.mip.tolerances.mipgap.set(mip_gap)
+        cplex_model.parameters.threads.set(31)  # specify number of threads
+        cplex_model.parameters.workmem.set(27000)  # Up to 27 GB of RAM
+        cplex_model.parameters.timelimit.set(time_limit)
+
+        # cplex_model.parameters.emphasis.mip.set(3)
+
+        cplex_model.parameters.mip.strategy.nodeselect.set(2)  # (check 1-3)select strategy for selecting node for branching
+        cplex_model.parameters.mip.strategy.variableselect.set(0)  # (check 0 /-1 - 4) select on which variable to branch on
+
+        cplex_model.parameters.mip.strategy.lbheur.set(0)  # check(0,1)local branching heuristic
+        cplex_model.parameters.mip.strategy.heuristicfreq.set(0)  # (check 0/-1) disable use of heuristic
+        cplex_model.parameters.mip.strategy.rinsheur.set(0)  # 50 = apply every 50 nodes
+        cplex_model.parameters.preprocessing.presolve.set(1)  # decide if presolve heuristic is used
+        cplex_model.parameters.preprocessing.numpass.set(-1)  # check(-1, 0) limits number of presolves
+        # cplex_model.parameters.mip.strategy.presolvenode.set(2) # check(0, -1, 3) decides if presolve at node
+
+        # cplex_model.parameters.mip.cuts.nodecuts.set(3)
+        # cplex_model.parameters.mip.cuts.flowcovers.set(2)
+        cplex_model.parameters.mip.cuts.gomory.set(2)
+        # cplex_model.parameters.mip.cuts.mircut.set(2)
+        # cplex_model.parameters.mip.cuts.implied.set(-1)
+        # cplex_model.parameters.mip.cuts.localimplied.set(-1)
+        # cplex_model.parameters.mip.cuts.disjunctive.set(2)  # check(0 -1 - 3) choose to use more aggressive cuts
+
+        cplex_model.parameters.mip.display.set(3)  # set extent of logging
+        cplex_model.solve()
+        return MILPSolution(cplex_model.solution.get_values(), cplex_model.solution.get_objective_value(),
+                            cplex_model.solution.MIP.get_mip_relative_gap(), incumbent_callback.first_time)
+
+
+def incumbent_time_callback(cplex):
+    # informational callback (does not switch off dynamic search) remembering when the first incumbent was found
+    class IncumbentTimeCallback(cplex.callbacks.MIPInfoCallback):
+        first_time: float | None = None
+
+        def __call__(self):
+            if self.first_time is None and self.has_incumbent():
+                self.first_time = self.get_time() - self.get_start_time()
+
+    return IncumbentTimeCallback
+
+
+class HighsBackend(MILPBackend):
+    def solve(self, model: MILPModel, time_limit: float, mip_gap: float, start: List[float] = None) -> MILPSolution:
+        import highspy
+
+        highs = highspy.Highs()
+        highs.setOptionValue("time_limit", float(time_limit))
+        highs.setOptionValue("mip_rel_gap", float(mip_gap))
+
+        lp = highspy.HighsLp()
+        lp.num_col_ = model.number_of_variables()
+        lp.num_row_ = model.number_of_rows()
+        lp.sense_ = highspy.ObjSense.kMaximize if model.maximize else highspy.ObjSense.kMinimize
+        lp.col_cost_ = model.obj
+        lp.col_lower_ = model.lb
+        lp.col_upper_ = [min(x, highspy.kHighsInf) for x in model.ub]
+        lp.integrality_ = [highspy.HighsVarType.kInteger if x == BINARY else highspy.HighsVarType.kContinuous
+                           for x in model.types]
+        if model.names:
+            lp.col_names_ = model.names
+
+        # rows as bounds: L -> (-inf, rhs), G -> (rhs, inf), E -> (rhs, rhs)
+        lp.row_lower_ = [-highspy.kHighsInf if x == "L" else y for x, y in zip(model.senses, model.rhs)]
+        lp.row_upper_ = [highspy.kHighsInf if x == "G" else y for x, y in zip(model.senses, model.rhs)]
+        lp.a_matrix_.format_ = highspy.MatrixFormat.kRowwise
+        row_starts: List[int] = [0]
+        index: List[int] = []
+        value: List[float] = []
+        for columns, coeffs in model.rows:
+            index += columns
+            value += coeffs
+            row_starts.append(len(index))
+        lp.a_matrix_.start_ = row_starts
+        lp.a_matrix_.index_ = index
+        lp.a_matrix_.value_ = value
+        lp.a_matrix_.num_col_ = lp.num_col_
+        lp.a_matrix_.num_row_ = lp.num_row_
+
+        highs.passModel(lp)
+        if start is not None:
+            solution = highspy.HighsSolution()
+            solution.col_value = start
+            solution.value_valid = True
+            highs.setSolution(solution)
+        incumbent_times: List[float] = []
+        highs.cbMipImprovingSolution.subscribe(lambda x: incumbent_times.append(x.data_out.running_time))
+        highs.run()
+        if highs.getInfo().primal_solution_status != highspy.SolutionStatus.kSolutionStatusFeasible:
+            raise ValueError(f"HiGHS found no solution: {highs.modelStatusToString(highs.getModelStatus())}")
+        info = highs.getInfo()
+        return MILPSolution(list(highs.getSolution().col_value), info.objective_function_value, info.mip_gap,
+                            incumbent_times[0] if incumbent_times else None)
+
+
+class CbcBackend(MILPBackend):
+    def solve(self, model: MILPModel, time_limit: float, mip_gap: float, start: List[float] = None) -> MILPSolution:
+        import mip
+
+        cbc_model = mip.Model(sense=mip.MAXIMIZE if model.maximize else mip.MINIMIZE, solver_name=mip.CBC)
+        cbc_model.max_mip_gap = mip_gap
+        variables = [cbc_model.add_var(lb=lb, ub=ub, obj=obj, var_type=mip.BINARY if x == BINARY else mip.CONTINUOUS)
+                     for obj, lb, ub, x in zip(model.obj, model.lb, model.ub, model.types)]
+        for (columns, coeffs), sense, rhs in zip(model.rows, model.senses, model.rhs):
+            expr = mip.xsum(y * variables[x] for x, y in zip(columns, coeffs))
+            if sense == "L":
+                cbc_model.add_constr(expr <= rhs)
+            elif sense == "G":
+                cbc_model.add_constr(expr >= rhs)
+            else:
+                cbc_model.add_constr(expr == rhs)
+
+        if start is not None:
+            # CBC completes the continuous values itself
+            cbc_model.start = [(x, y) for x, y, z in zip(variables, start, model.types) if z == BINARY]
+        status = cbc_model.optimize(max_seconds=time_limit)
+        if status not in (mip.OptimizationStatus.OPTIMAL, mip.OptimizationStatus.FEASIBLE):
+            raise ValueError(f"CBC found no solution: {status}")
+        return MILPSolution([x.x for x in variables], cbc_model.objective_value, cbc_model.gap)
+
+
+def find_backend(backend_str: str) -> MILPBackend:
+    if backend_str == 'cplex':
+        return CplexBackend()
+    elif backend_str == 'highs':
+        return HighsBackend()
+    elif backend_str == 'cbc':
+        return CbcBackend()
+    else:
+        raise ValueError("the given MILP solver string is not registered in the system")
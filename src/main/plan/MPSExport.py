@@ -0,0 +1,156 @@
+import gzip
+import os
+import tempfile
+from array import array
+from mmap import mmap
+from typing import Iterable, List, Tuple, TextIO
+
+from main.plan.MILPBackend import MILPModel, BINARY, INFINITY
+
+# nonzeros kept in memory before they are appended to the temporary files
+BLOCK_SIZE: int = 1 << 16
+
+
+def open_text(path: str) -> TextIO:
+    # gzip compressed if the path ends with .gz
+    if path.endswith(".gz"):
+        return gzip.open(path, "wt")
+    return open(path, "w")
+
+
+def number(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+# writes the MILP as free MPS (read by cplex, HiGHS, CBC, ...), rows default to the rows of model but can come from a
+# generator (EventModel.generate_rows) so they are never kept as python lists:
+# - the ROWS section is written while the rows are generated, their coefficients go to temporary binary files in blocks
+# - MPS lists the coefficients by column -> they are sorted by column with a counting sort into memory mapped files
+# in memory are only arrays with one entry per column (besides the columns of model)
+def write_mps(path: str, model: MILPModel, rows: Iterable[Tuple[List[int], List[float], str, float]] = None):
+    if rows is None:
+        rows = ((x[0], x[1], y, z) for x, y, z in zip(model.rows, model.senses, model.rhs))
+    number_columns = model.number_of_variables()
+    names = model.names if model.names else [f"C{x}" for x in range(number_columns)]
+
+    with tempfile.TemporaryDirectory(dir=os.path.dirname(os.path.abspath(path))) as temp_dir, \
+            open_text(path) as file:
+        file.write(f"NAME {os.path.basename(path).split('.')[0]}\n")
+        if model.maximize:
+            file.write("OBJSENSE\n    MAX\n")
+        file.write("ROWS\n N OBJ\n")
+
+        # coefficients in order of rows as (column, row, value) in three files, rhs of every row
+        temp_paths = [os.path.join(temp_dir, x) for x in ("columns", "rows", "values", "rhs")]
+        column_counts = array("q", bytes(8 * number_columns))
+        number_rows = 0
+        with open(temp_paths[0], "wb") as column_file, open(temp_paths[1], "wb") as row_file, \
+                open(temp_paths[2], "wb") as value_file, open(temp_paths[3], "wb") as rhs_file:
+            block = (array("i"), array("i"), array("d"), array("d"))
+            lines: List[str] = []
+            for columns, coeffs, sense, rhs in rows:
+                lines.append(f" {sense} R{number_rows}\n")
+                block[0].extend(columns)
+                block[1].extend([number_rows] * len(columns))
+                block[2].extend(coeffs)
+                block[3].append(rhs)
+                for column in columns:
+                    column_counts[column] += 1
+                number_rows += 1
+                if len(block[0]) >= BLOCK_SIZE:
+                    file.write("".join(lines))
+                    lines = []
+                    for values, temp_file in zip(block, (column_file, row_file, value_file, rhs_file)):
+                        values.tofile(temp_file)
+                        del values[:]
+            file.write("".join(lines))
+            for values, temp_file in zip(block, (column_file, row_file, value_file, rhs_file)):
+                values.tofile(temp_file)
+
+        # start of every column in the sorted coefficients
+        column_starts = array("q", [0])
+        for count in column_counts:
+            column_starts.append(column_starts[-1] + count)
+        del column_counts
+        number_nonzeros = column_starts[-1]
+
+        with open(os.path.join(temp_dir, "sorted_rows"), "w+b") as sorted_row_file, \
+                open(os.path.join(temp_dir, "sorted_values"), "w+b") as sorted_value_file:
+            # mmap needs at least one byte
+            sorted_row_file.truncate(max(4 * number_nonzeros, 1))
+            sorted_value_file.truncate(max(8 * number_nonzeros, 1))
+            with mmap(sorted_row_file.fileno(), 0) as row_map, mmap(sorted_value_file.fileno(), 0) as value_map:
+                sorted_rows = memoryview(row_map).cast("i")
+                sorted_values = memoryview(value_map).cast("d")
+                _sort_by_column(temp_paths[:3], column_starts, sorted_rows, sorted_values)
+
+                file.write("COLUMNS\n")
+                integer = False
+                lines = []
+                for j in range(number_columns):
+                    if (model.types[j] == BINARY) != integer:
+                        integer = not integer
+                        lines.append(f" MARKER 'MARKER' '{'INTORG' if integer else 'INTEND'}'\n")
+                    if model.obj[j] != 0:
+                        lines.append(f" {names[j]} OBJ {number(model.obj[j])}\n")
+                    for k in range(column_starts[j], column_starts[j + 1]):
+                        lines.append(f" {names[j]} R{sorted_rows[k]} {number(sorted_values[k])}\n")
+                    if len(lines) >= BLOCK_SIZE:
+                        file.write("".join(lines))
+                        lines = []
+                if integer:
+                    lines.append(" MARKER 'MARKER' 'INTEND'\n")
+                file.write("".join(lines))
+                # memory views have to be released before the maps are closed
+                sorted_rows.release()
+                sorted_values.release()
+
+        file.write("RHS\n")
+        with open(temp_paths[3], "rb") as rhs_file:
+            row = 0
+            while True:
+                rhs_block = array("d")
+                rhs_block.frombytes(rhs_file.read(8 * BLOCK_SIZE))
+                if len(rhs_block) == 0:
+                    break
+                file.write("".join(f" RHS R{row + i} {number(x)}\n" for i, x in enumerate(rhs_block) if x != 0))
+                row += len(rhs_block)
+
+        file.write("BOUNDS\n")
+        lines = []
+        for j in range(number_columns):
+            lb, ub = model.lb[j], model.ub[j]
+            if model.types[j] == BINARY and lb == 0 and ub == 1:
+                lines.append(f" BV BND {names[j]}\n")
+            elif lb == ub:
+                lines.append(f" FX BND {names[j]} {number(lb)}\n")
+            else:
+                if lb == -INFINITY:
+                    lines.append(f" MI BND {names[j]}\n")
+                elif lb != 0:
+                    lines.append(f" LO BND {names[j]} {number(lb)}\n")
+                if ub != INFINITY:
+                    lines.append(f" UP BND {names[j]} {number(ub)}\n")
+            if len(lines) >= BLOCK_SIZE:
+                file.write("".join(lines))
+                lines = []
+        file.write("".join(lines))
+        file.write("ENDATA\n")
+
+
+def _sort_by_column(temp_paths: List[str], column_starts: array, sorted_rows: memoryview, sorted_values: memoryview):
+    # counting sort of the coefficient files (column, row, value) into sorted_rows and sorted_values, read block-wise
+    next_free = column_starts[:-1]
+    with open(temp_paths[0], "rb") as column_file, open(temp_paths[1], "rb") as row_file, \
+            open(temp_paths[2], "rb") as value_file:
+        while True:
+            block = (array("i"), array("i"), array("d"))
+            for values, temp_file in zip(block, (column_file, row_file, value_file)):
+                values.frombytes(temp_file.read(values.itemsize * BLOCK_SIZE))
+            if len(block[0]) == 0:
+                break
+            for column, row, value in zip(*block):
+                position = next_free[column]
+                next_free[column] = position + 1
+                sorted_rows[position] = row
+                sorted_values[position] = value
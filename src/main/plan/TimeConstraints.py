@@ -19,13 +19,13 @@ class AbstractConstraintMaker():
 
 class AbsoluteValueConstraints(AbstractConstraintMaker):
     def create_variables(self, split_req: SplitRequest):
-        return [{"names": [f"B_{split_req.split_id}+"], "lb": [split_req.earl_start_time.get_in_seconds() + Global.TRANSFER_SECONDS],
-                 "ub": [split_req.latest_start_time.get_in_seconds() + Global.TRANSFER_SECONDS]},
-                {"names": [f"B_{split_req.split_id}-"], "lb": [split_req.earl_arr_time.get_in_seconds() + Global.TRANSFER_SECONDS],
-                 "ub": [split_req.latest_arr_time.get_in_seconds() + Global.TRANSFER_SECONDS]}]
+        return [{"names": [f"B_{split_req.split_id}+"], "lb": [split_req.earl_start_time + Global.TRANSFER_SECONDS],
+                 "ub": [split_req.latest_start_time + Global.TRANSFER_SECONDS]},
+                {"names": [f"B_{split_req.split_id}-"], "lb": [split_req.earl_arr_time + Global.TRANSFER_SECONDS],
+                 "ub": [split_req.latest_arr_time + Global.TRANSFER_SECONDS]}]
 
     def get_big_m(self, prec_split: SplitRequest, prec_bool: bool, duration, suc_absolute: float):
-        return int(prec_split.line.end_time.get_in_seconds())
+        return prec_split.line.end_time
 
     def add_value(self, split_req: SplitRequest, start_bool: bool):
         return 0
@@ -33,23 +33,23 @@ class AbsoluteValueConstraints(AbstractConstraintMaker):
 class RelativeConstraints(AbstractConstraintMaker):
     def create_variables(self, split_req: SplitRequest):
         return [{"names": [f"B_{split_req.split_id}+"], "lb": [Global.TRANSFER_SECONDS],
-                 "ub": [split_req.latest_start_time.get_in_seconds() - split_req.earl_start_time.get_in_seconds() + Global.TRANSFER_SECONDS]},
+                 "ub": [split_req.latest_start_time - split_req.earl_start_time + Global.TRANSFER_SECONDS]},
                 {"names": [f"B_{split_req.split_id}-"], "lb": [Global.TRANSFER_SECONDS],
-                 "ub": [split_req.latest_arr_time.get_in_seconds() - split_req.earl_arr_time.get_in_seconds() + Global.TRANSFER_SECONDS]}]
+                 "ub": [split_req.latest_arr_time - split_req.earl_arr_time + Global.TRANSFER_SECONDS]}]
 
     def add_value(self, split_req: SplitRequest, start_bool: bool):
         if start_bool:
-            return split_req.earl_start_time.get_in_seconds()
+            return split_req.earl_start_time
         else:
-            return split_req.earl_arr_time.get_in_seconds()
+            return split_req.earl_arr_time
 
     def get_big_m(self, prec_split: SplitRequest, prec_bool: bool, duration, suc_absolute: float):
 
         max_rel: float
         if prec_bool:
-            max_rel = prec_split.latest_start_time.get_in_seconds() - prec_split.earl_start_time.get_in_seconds()
+            max_rel = prec_split.latest_start_time - prec_split.earl_start_time
         else:
-            max_rel = prec_split.latest_arr_time.get_in_seconds() - prec_split.earl_arr_time.get_in_seconds()
+            max_rel = prec_split.latest_arr_time - prec_split.earl_arr_time
 
         return max_rel + duration + Global.TRANSFER_SECONDS + max(0, self.add_value(prec_split, prec_bool) - suc_absolute)
 
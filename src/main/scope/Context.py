@@ -3,14 +3,13 @@ from typing import Set, Dict
 from main.plan.Planner import Planner
 from main.scope.Executor import Executor
 from utils.demand.AbstractRequest import Request
-from utils.helper.Timer import TimeImpl
 from utils.network.Bus import Bus
 from utils.network.Stop import Stop
 
 
 class Context:
     def __init__(self, requests: Set[Request], executor: Executor, planner: Planner):
-        self.time_table: Dict[TimeImpl, Set[Request]] = self.create_time_table(requests)
+        self.time_table: Dict[int, Set[Request]] = self.create_time_table(requests)
         self.executor: Executor = executor
         self.planner: Planner = planner
 
@@ -28,7 +27,7 @@ class Context:
     # gives curr. Standing + new requests to planner
     # waits some time for planning
     # give new plan to executor -> execute()
-    def trigger_event(self, time_now: TimeImpl, time_next=None):
+    def trigger_event(self, time_now: int, time_next=None):
         curr_requests: Set[Request] = self.time_table[time_now]
         curr_bus_locations: Dict[Bus, Stop] = self.executor.bus_locations.copy()
         curr_user_locations: Dict[Request, Stop] = self.executor.user_locations.copy()
@@ -45,4 +44,4 @@ class Static(Context):
         super().__init__(requests, executor, planner)
 
     def create_time_table(self, requests: Set[Request]):
-        return {TimeImpl(0, 0): requests}
+        return {0: requests}
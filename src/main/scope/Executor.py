@@ -3,7 +3,6 @@ from typing import Set, Dict, List
 from utils import Global
 from utils.demand.AbstractRequest import Request
 from utils.helper import Helper, Timer
-from utils.helper.Timer import TimeImpl
 from utils.network.Bus import Bus
 from utils.network.Stop import Stop
 
@@ -22,9 +21,9 @@ class Executor:
 
         self.routes.sort(key=lambda x: x.bus.id)
 
-    def check_plan(self, done_r_stops: List[RouteStop], final_time: TimeImpl = None):
+    def check_plan(self, done_r_stops: List[RouteStop], final_time: int = None):
         waiting_bus_stops: List[RouteStop] = []
-        curr_time: TimeImpl
+        curr_time: int
         for r_stop in done_r_stops:
             curr_time = r_stop.arriv_time
 
@@ -42,7 +41,7 @@ class Executor:
                             raise ValueError(f"Missmatch between expected pick-up stop and actual for request {u_picked.id}")
                         self.passengers[wait_stop.bus].add(u_picked)
                         if wait_stop.stop is u_picked.pick_up_location:
-                            u_picked.act_start_time = wait_stop.depart_time.sub_seconds(Global.TRANSFER_SECONDS)
+                            u_picked.act_start_time = wait_stop.depart_time - Global.TRANSFER_SECONDS
                 else:
                     still_waiting.append(wait_stop)
 
@@ -71,7 +70,7 @@ class Executor:
                             raise ValueError("Missmatch between expected pick-up stop and actual")
                         self.passengers[wait_event.bus].add(u_picked)
                         if u_picked.pick_up_location is wait_event.stop:
-                            u_picked.act_start_time = wait_event.depart_time.sub_seconds(Global.TRANSFER_SECONDS)
+                            u_picked.act_start_time = wait_event.depart_time - Global.TRANSFER_SECONDS
                 else:
                     wait_event.depart_time = final_time
                     wait_event.pick_up.clear()
@@ -83,24 +82,24 @@ class Executor:
                         raise ValueError("Missmatch between expected pick-up stop and actual")
                     self.passengers[wait_event.bus].add(u_picked)
                     if u_picked.pick_up_location is wait_event.stop:
-                        u_picked.act_start_time = wait_event.depart_time.sub_seconds(Global.TRANSFER_SECONDS)
+                        u_picked.act_start_time = wait_event.depart_time - Global.TRANSFER_SECONDS
 
         # check accepted users are taken care of (valid start and end times) -> max ride time
         for request in self.requests:
             if request.act_start_time is not None:
                 if not (request.earl_start_time <= request.act_start_time <= request.latest_start_time):
-                    raise ValueError(f"The pick-up time window of request {request.id} not respected; Window: [{request.earl_start_time} : {request.latest_start_time}], actual time: {request.act_start_time}")
+                    raise ValueError(f"The pick-up time window of request {request.id} not respected; Window: [{Timer.conv_seconds_2_string(request.earl_start_time)} : {Timer.conv_seconds_2_string(request.latest_start_time)}], actual time: {Timer.conv_seconds_2_string(request.act_start_time)}")
                 if request.act_end_time is None:
                     raise ValueError(f"Request {request.id} was picked up but not delivered")
                 if not (request.earl_arr_time <= request.act_end_time <= request.latest_arr_time):
-                    raise ValueError(f"The drop-off time window of request {request.id} not respected; Window: [{request.earl_arr_time} : {request.latest_arr_time}], actual time: {request.act_end_time}")
-                time_travelled = (request.act_end_time - request.act_start_time).get_in_seconds()
-                max_travel_time = (request.latest_arr_time - request.latest_start_time).get_in_seconds()
+                    raise ValueError(f"The drop-off time window of request {request.id} not respected; Window: [{Timer.conv_seconds_2_string(request.earl_arr_time)} : {Timer.conv_seconds_2_string(request.latest_arr_time)}], actual time: {Timer.conv_seconds_2_string(request.act_end_time)}")
+                time_travelled = request.act_end_time - request.act_start_time
+                max_travel_time = request.latest_arr_time - request.latest_start_time
                 if time_travelled > (max_travel_time + 0.1):
                     raise ValueError(f"Maximum travel time of request {request.id} not respected; Time travelled: {time_travelled}, Maximum Time: {max_travel_time}")
 
     # could observe everything here make sure there are no inconsistencies
-    def execute_plan(self, curr_routes: List[Route], new_requests: Set[Request], time_next: TimeImpl):
+    def execute_plan(self, curr_routes: List[Route], new_requests: Set[Request], time_next: int):
         # if time_next = none : -> just copy entire plan to result
         # else: look through curr. route until just before time_next -> copy to result -> update dictionaries
         self.user_locations |= {x: x.pick_up_location for x in new_requests if x.route_int is not None}
@@ -110,11 +109,10 @@ class Executor:
         # go through plan and check travel times
         for route in curr_routes:
             for i in range(0, len(route.stop_list) - 1):
-                travel_time_min = Timer.calc_time(
-                    Helper.calc_distance(route.stop_list[i].stop, route.stop_list[i+1].stop))
+                travel_time_min = Helper.get_travel_time(route.stop_list[i].stop, route.stop_list[i+1].stop)
                 if route.stop_list[i+1].arriv_time <= route.stop_list[i].depart_time:
                     print_out_route(route.stop_list)
-                needed_time = (route.stop_list[i+1].arriv_time - route.stop_list[i].depart_time).get_in_seconds()
+                needed_time = route.stop_list[i+1].arriv_time - route.stop_list[i].depart_time
                 if (travel_time_min - 0.1) > needed_time:
                     raise ValueError(f"Travel times are not respected in solution; Minimum Time: {travel_time_min / 60}, Needed time: {needed_time / 60}")
 
@@ -132,7 +130,7 @@ class Executor:
         else:
             done_r_stops = []
             for route_count in range(len(curr_routes)):
-                time_count: TimeImpl
+                time_count: int
                 if len(curr_routes[route_count].stop_list) > 0:
                     time_count = curr_routes[route_count].stop_list[0].arriv_time
                 else:
@@ -147,11 +145,11 @@ class Executor:
 
                 # could lead to inconsistencies in dynamic case: not finished stop_events are counted as fully processed, but are cut short(pick-ups not done)
                 if counter < len(curr_routes[route_count].stop_list):
-                    self.bus_delay[curr_routes[route_count].bus] = (time_count - time_next).get_in_seconds()
+                    self.bus_delay[curr_routes[route_count].bus] = time_count - time_next
 
             done_r_stops.sort(key=lambda x: x.arriv_time)
             self.check_plan(done_r_stops)
 
 def print_out_route(route: List[RouteStop]):
     for stopr in route:
-        print(str(stopr) + " arrival time: " + str(stopr.arriv_time) + " depart time: " + str(stopr.depart_time))
+        print(str(stopr) + " arrival time: " + Timer.conv_seconds_2_string(stopr.arriv_time) + " depart time: " + Timer.conv_seconds_2_string(stopr.depart_time))
@@ -1,3 +1,5 @@
+from typing import List
+
 AVERAGE_KMH: int
 TRANSFER_SECONDS: int
 NUMBER_OF_EXTRA_TRANSFERS: int
@@ -7,8 +9,24 @@ KM_PER_UNIT: int
 COST_PER_KM: int
 CO2_PER_KM: int
 CAPACITY_PER_LINE: int
+DISTANCE_MATRIX: List[List[float]]  # km between stops, indexed by Stop.idx
+TRAVEL_TIME_MATRIX: List[List[int]]  # seconds between stops, indexed by Stop.idx
 MAX_DELAY_EQUATION: str
 CPLEX_PATH: str
+MILP_SOLVER: str = "cplex"  # see MILPBackend.find_backend
+MODEL_NAMES: bool = True  # names of variables in the MILP model, only needed to read the model
+MODEL_EXPORT_PATH: str = ""  # MILP model is written to this MPS file (.gz compressed) if not empty
+WARM_START: bool = True  # greedy solution as MIP start
+ALNS_TIME_LIMIT: float = 60  # seconds of the ALNS planner
+ALNS_ITERATIONS: int = 0  # stop the ALNS planner after this many iterations, 0 = only the time limit
+ALNS_SEED: int = 0
+READING_WORKERS: int = 1
+EVENT_GRAPH_WORKERS: int = 1
+MAX_ONBOARD_SET: int = 0  # other passengers in permutations of an event, 0 = no cap
+MAX_EVENTS_PER_SPLIT: int = 0  # pick-up (drop-off) events per split, 0 = no cap
+EVENT_GRAPH_CACHE_DIR: str = ""  # no caching if empty
+EVENT_GRAPH_CACHE_KEY: str = ""
+CHECK_EVENT_GRAPH: bool = False  # raise if an event is not connected to the idle event of its line (debugging)
 COMPUTATION_START_TIME: float
 COMPUTATION_TIME_READING: float
 COMPUTATION_TIME_BUILDING: float
@@ -17,6 +35,12 @@ COMPUTATION_TIME_SOLVING_SECOND: float
 COMPUTATION_TIME_BUILDING_CPLEX: float
 EVENT_GRAPH_NODES: int
 EVENT_GRAPH_EDGES: int
+EVENT_GRAPH_NODES_UNREDUCED: int = 0
+EVENT_GRAPH_EDGES_UNREDUCED: int = 0
 NUMBER_OF_SPLITS: int
-INTEGRALITY_GAP_FIRST: int
-INTEGRALITY_GAP_SECOND: int = 0
+ROUTE_CACHE_LOOKUPS: int = 0
+ROUTE_CACHE_HITS: int = 0
+INTEGRALITY_GAP_FIRST: int | None  # None if the planner does not solve a MILP or the gap is infinite
+INTEGRALITY_GAP_SECOND: int | None = 0
+FIRST_INCUMBENT_TIME: float | None = None  # seconds of the solver, None if not known
+WARM_START_REQUESTS: int | None = 0  # None if the planner does not solve a MILP
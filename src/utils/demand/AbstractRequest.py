@@ -1,40 +1,42 @@
 from typing import Dict, List
 
 from utils import Global
-from utils.helper import Timer
-from utils.helper.Timer import TimeImpl
 from utils.network.Line import Line
 from utils.network.Stop import Stop
 
 
 class AbstractRequest:
-    def __init__(self, request_id: int, number_of_passengers: int, pick_up_location: Stop, drop_off_location: Stop, earl_start_time: TimeImpl = None,
-                 latest_arr_time: TimeImpl = None):
+    __slots__ = ("id", "pick_up_location", "drop_off_location", "earl_start_time", "latest_arr_time",
+                 "number_of_passengers", "latest_start_time", "earl_arr_time", "act_start_time", "act_end_time")
+
+    def __init__(self, request_id: int, number_of_passengers: int, pick_up_location: Stop, drop_off_location: Stop, earl_start_time: int = None,
+                 latest_arr_time: int = None):
         self.id: int = request_id
         self.pick_up_location: Stop = pick_up_location
         self.drop_off_location: Stop = drop_off_location
-        self.earl_start_time: TimeImpl = earl_start_time
-        self.latest_arr_time: TimeImpl = latest_arr_time
+        self.earl_start_time: int = earl_start_time
+        self.latest_arr_time: int = latest_arr_time
         self.number_of_passengers: int = number_of_passengers
-        self.latest_start_time: TimeImpl | None = None
-        self.earl_arr_time: TimeImpl | None = None
-        self.act_start_time: TimeImpl | None = None
-        self.act_end_time: TimeImpl | None = None
+        self.latest_start_time: int | None = None
+        self.earl_arr_time: int | None = None
+        self.act_start_time: int | None = None
+        self.act_end_time: int | None = None
 
 
 class Request(AbstractRequest):
+    __slots__ = ("register_time", "split_requests", "numb_transfer", "fastest_time", "route_int")
 
-    def __init__(self, request_id: int, number_of_passengers: int, pick_up_location: Stop, drop_off_location: Stop, earl_start_time: TimeImpl,
-                 latest_arr_time: TimeImpl, register_time: TimeImpl, numb_transfer: int, fastest_time: int):
-        self.register_time: TimeImpl = register_time
+    def __init__(self, request_id: int, number_of_passengers: int, pick_up_location: Stop, drop_off_location: Stop, earl_start_time: int,
+                 latest_arr_time: int, register_time: int, numb_transfer: int, fastest_time: int):
+        self.register_time: int = register_time
         self.split_requests: Dict[int, List[SplitRequest]] = {}
         self.numb_transfer: int = numb_transfer      # number of transfers in shortest route
         self.fastest_time: int = fastest_time            # shortest duration for travel with busses possible
 
         self.route_int: int | None = None        # none at first, when solution selected(idx of split_request_dict) -> fill with number, as soon as picked_up -> final
         super().__init__(request_id, number_of_passengers, pick_up_location, drop_off_location, earl_start_time, latest_arr_time)
-        self.latest_start_time: TimeImpl = self.earl_start_time.add_seconds(Global.TIME_WINDOW_SECONDS)
-        self.earl_arr_time: TimeImpl = self.earl_start_time.add_seconds(fastest_time)
+        self.latest_start_time: int = self.earl_start_time + Global.TIME_WINDOW_SECONDS
+        self.earl_arr_time: int = self.earl_start_time + fastest_time
 
     def __str__(self):
         return str(self.id)
@@ -44,6 +46,7 @@ class Request(AbstractRequest):
 
 
 class SplitRequest(AbstractRequest):
+    __slots__ = ("line", "parent", "in_action", "split_id")
     id_counter = 0
 
     def __init__(self, parent_req: Request, pick_up_location: Stop, drop_off_location: Stop, used_line: Line,
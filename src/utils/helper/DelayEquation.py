@@ -0,0 +1,67 @@
+import ast
+import math
+from types import CodeType, SimpleNamespace
+from typing import Dict, List
+
+from utils import Global
+
+# the max delay equation from the config may only use x (fastest time in minutes), numbers,
+# arithmetic and the following functions/constants of math
+ALLOWED_MATH_NAMES = {"log", "log2", "log10", "sqrt", "exp", "pow", "floor", "ceil", "pi", "e"}
+ALLOWED_NODES = (ast.Expression, ast.BinOp, ast.UnaryOp, ast.Constant, ast.Name, ast.Attribute, ast.Call, ast.Load,
+                 ast.Add, ast.Sub, ast.Mult, ast.Div, ast.FloorDiv, ast.Mod, ast.Pow, ast.USub, ast.UAdd)
+
+compiled_equations: Dict[str, CodeType] = {}
+
+
+def compile_delay_equation(equation: str) -> CodeType:
+    # check equation once and compile it, raises ValueError for anything that is not a plain formula in x
+    if equation in compiled_equations:
+        return compiled_equations[equation]
+
+    try:
+        tree = ast.parse(equation, mode="eval")
+    except SyntaxError as err:
+        raise ValueError(f"maxDelayEquation is not a valid expression: {equation}") from err
+
+    for node in ast.walk(tree):
+        if not isinstance(node, ALLOWED_NODES):
+            raise ValueError(f"maxDelayEquation contains forbidden element {type(node).__name__}: {equation}")
+        if isinstance(node, ast.Constant) and not isinstance(node.value, (int, float)):
+            raise ValueError(f"maxDelayEquation may only contain numbers as constants: {equation}")
+        if isinstance(node, ast.Name) and node.id not in {"x", "math"}:
+            raise ValueError(f"maxDelayEquation may only use x and math, not {node.id}: {equation}")
+        if isinstance(node, ast.Attribute) and not (isinstance(node.value, ast.Name) and node.value.id == "math"
+                                                    and node.attr in ALLOWED_MATH_NAMES):
+            raise ValueError(f"maxDelayEquation uses forbidden attribute {node.attr}: {equation}")
+        if isinstance(node, ast.Call) and (not isinstance(node.func, ast.Attribute) or len(node.keywords) > 0):
+            raise ValueError(f"maxDelayEquation may only call functions of math: {equation}")
+
+    compiled_equations[equation] = compile(tree, "<maxDelayEquation>", "eval")
+    return compiled_equations[equation]
+
+
+# gives delay in seconds (rounded to whole minutes, at least 0) for fastest time in seconds
+def calc_delay(fastest_time: int) -> int:
+    code = compile_delay_equation(Global.MAX_DELAY_EQUATION)
+    return 60 * max(0, round(eval(code, {"__builtins__": {}, "math": math, "x": fastest_time / 60})))
+
+
+def calc_delays(fastest_times: List[int]) -> List[int]:
+    # whole list in one evaluation with numpy arrays, same rounding (half to even) as calc_delay
+    code = compile_delay_equation(Global.MAX_DELAY_EQUATION)
+    try:
+        import numpy
+    except ImportError:
+        return [calc_delay(x) for x in fastest_times]
+
+    def numpy_log(value, base=None):
+        if base is None:
+            return numpy.log(value)
+        return numpy.log(value) / numpy.log(base)
+
+    numpy_math = SimpleNamespace(log=numpy_log, log2=numpy.log2, log10=numpy.log10, sqrt=numpy.sqrt, exp=numpy.exp,
+                                 pow=numpy.power, floor=numpy.floor, ceil=numpy.ceil, pi=math.pi, e=math.e)
+    x = numpy.asarray(fastest_times, dtype=float) / 60
+    delays = numpy.broadcast_to(eval(code, {"__builtins__": {}, "math": numpy_math, "x": x}), x.shape)
+    return [60 * int(y) for y in numpy.maximum(0, numpy.round(delays))]
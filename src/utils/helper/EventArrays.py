@@ -0,0 +1,268 @@
+from array import array
+from itertools import accumulate, compress
+from typing import Dict, List
+
+from utils.demand.AbstractRequest import SplitRequest
+from utils.helper.EventGraph import EventGraph, Event, IdleEvent, PickUpEvent
+from utils.network.Line import Line
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+# values of EventArrays.kind
+IDLE: int = 0
+PICK_UP: int = 1
+DROP_OFF: int = 2
+
+
+# compact form of an EventGraph: event i has its attributes at position i of the attribute arrays, edges are stored in
+# compressed sparse rows (edges out of i: out_indices[out_offsets[i]:out_offsets[i + 1]], edge number = position in
+# out_indices, in_edges gives the edge numbers of the incoming edges in the same way)
+# arrays are numpy arrays if numpy is installed, array.array otherwise (both support indexing, slicing and tolist)
+class EventArrays:
+    __slots__ = ("events", "splits", "lines", "event_id", "kind", "location", "split", "line", "earl_depart",
+                 "lat_depart", "out_offsets", "out_indices", "in_offsets", "in_indices", "in_edges", "split_offsets",
+                 "split_events")
+
+    def __init__(self, events: List[Event], splits: List[SplitRequest], lines: List[Line]):
+        # objects behind the indices, only needed to translate results back
+        self.events: List[Event] = events
+        self.splits: List[SplitRequest] = splits
+        self.lines: List[Line] = lines
+
+        self.event_id = array("q")
+        self.kind = array("b")
+        self.location = array("i")  # Stop.idx
+        self.split = array("i")  # position in splits, -1 for idle events
+        self.line = array("i")  # position in lines
+        self.earl_depart = array("i")
+        self.lat_depart = array("i")
+
+        self.out_offsets = array("q", [0])
+        self.out_indices = array("i")
+        self.in_offsets = array("q", [0])
+        self.in_indices = array("i")
+        self.in_edges = array("q")
+
+        # events of split j: pick-ups split_events[split_offsets[2 * j]:split_offsets[2 * j + 1]], then drop-offs
+        self.split_offsets = array("q", [0])
+        self.split_events = array("i")
+
+    def number_of_events(self) -> int:
+        return len(self.kind)
+
+    def number_of_edges(self) -> int:
+        return len(self.out_indices)
+
+    def data_in_string(self):
+        return f"Number of split_requests: {len(self.splits)}; Number of nodes: {self.number_of_events()}; " \
+               f"Number of edges: {self.number_of_edges()}."
+
+    def edge_source(self):
+        # source event of every edge (same order as out_indices)
+        if numpy is not None:
+            return numpy.repeat(numpy.arange(self.number_of_events(), dtype="i"), numpy.diff(self.out_offsets))
+        sources = array("i")
+        out_offsets = self.out_offsets.tolist()
+        for i in range(len(out_offsets) - 1):
+            sources.extend([i] * (out_offsets[i + 1] - out_offsets[i]))
+        return as_numpy(sources)
+
+
+def as_numpy(values: array):
+    # shares the memory of values (read-only)
+    if numpy is None:
+        return values
+    return numpy.frombuffer(values, dtype=values.typecode)
+
+
+def to_event_arrays(event_graph: EventGraph) -> EventArrays:
+    # events in order of creation, splits in order of split_id, lines in order of id
+    events: List[Event] = sorted(event_graph.edge_dict, key=lambda x: x.id)
+    splits: List[SplitRequest] = sorted(event_graph.request_dict, key=lambda x: x.split_id)
+    lines: List[Line] = sorted({x.line if isinstance(x, IdleEvent) else x.first.line for x in events},
+                               key=lambda x: x.id)
+    arrays = EventArrays(events, splits, lines)
+
+    event_pos: Dict[Event, int] = {x: i for i, x in enumerate(events)}
+    split_pos: Dict[SplitRequest, int] = {x: i for i, x in enumerate(splits)}
+    line_pos: Dict[Line, int] = {x: i for i, x in enumerate(lines)}
+
+    for event in events:
+        arrays.event_id.append(event.id)
+        arrays.location.append(event.location.idx)
+        arrays.earl_depart.append(event.earl_depart)
+        arrays.lat_depart.append(event.lat_depart)
+        if isinstance(event, IdleEvent):
+            arrays.kind.append(IDLE)
+            arrays.split.append(-1)
+            arrays.line.append(line_pos[event.line])
+        else:
+            arrays.kind.append(PICK_UP if isinstance(event, PickUpEvent) else DROP_OFF)
+            arrays.split.append(split_pos[event.first])
+            arrays.line.append(line_pos[event.first.line])
+
+        # keeps order of the out lists (used to follow the solution)
+        arrays.out_indices.extend([event_pos[x] for x in event_graph.edge_dict[event][1]])
+        arrays.out_offsets.append(len(arrays.out_indices))
+
+    # incoming edges by counting sort of the outgoing ones over their target
+    out_offsets, out_indices = arrays.out_offsets.tolist(), arrays.out_indices.tolist()
+    in_counts: List[int] = [0] * len(events)
+    for target in out_indices:
+        in_counts[target] += 1
+    next_free: List[int] = [0] * len(events)
+    for i in range(len(events)):
+        arrays.in_offsets.append(arrays.in_offsets[i] + in_counts[i])
+        next_free[i] = arrays.in_offsets[i]
+    in_indices: List[int] = [0] * len(out_indices)
+    in_edges: List[int] = [0] * len(out_indices)
+    for source in range(len(events)):
+        for edge in range(out_offsets[source], out_offsets[source + 1]):
+            target = out_indices[edge]
+            in_indices[next_free[target]] = source
+            in_edges[next_free[target]] = edge
+            next_free[target] += 1
+    arrays.in_indices.extend(in_indices)
+    arrays.in_edges.extend(in_edges)
+
+    for split_req in splits:
+        for split_events in event_graph.request_dict[split_req]:
+            arrays.split_events.extend(sorted(event_pos[x] for x in split_events))
+            arrays.split_offsets.append(len(arrays.split_events))
+
+    for name in ("event_id", "kind", "location", "split", "line", "earl_depart", "lat_depart", "out_offsets",
+                 "out_indices", "in_offsets", "in_indices", "in_edges", "split_offsets", "split_events"):
+        setattr(arrays, name, as_numpy(getattr(arrays, name)))
+    return arrays
+
+
+def to_event_graph(arrays: EventArrays) -> EventGraph:
+    # EventGraph with the original event objects (incoming edges ordered by their source)
+    event_graph = EventGraph()
+    events = arrays.events
+    out_offsets, out_indices = arrays.out_offsets.tolist(), arrays.out_indices.tolist()
+    in_offsets, in_indices = arrays.in_offsets.tolist(), arrays.in_indices.tolist()
+    for i, event in enumerate(events):
+        event_graph.edge_dict[event] = ([events[x] for x in in_indices[in_offsets[i]:in_offsets[i + 1]]],
+                                        [events[x] for x in out_indices[out_offsets[i]:out_offsets[i + 1]]])
+
+    split_offsets, split_events = arrays.split_offsets.tolist(), arrays.split_events.tolist()
+    for j, split_req in enumerate(arrays.splits):
+        event_graph.request_dict[split_req] = (
+            {events[x] for x in split_events[split_offsets[2 * j]:split_offsets[2 * j + 1]]},
+            {events[x] for x in split_events[split_offsets[2 * j + 1]:split_offsets[2 * j + 2]]})
+    return event_graph
+
+
+# one bool per event: event is on a path from and to the idle event of its line, all others are zero in every solution
+# (flow conservation), with numpy all edges are checked at once per search level instead of one by one
+def connected_events(arrays: EventArrays):
+    if numpy is None:
+        kind = arrays.kind.tolist()
+        found: List[List[bool]] = []
+        for offsets, indices in ((arrays.out_offsets, arrays.out_indices), (arrays.in_offsets, arrays.in_indices)):
+            offsets, indices = offsets.tolist(), indices.tolist()
+            reached: List[bool] = [x == IDLE for x in kind]
+            stack: List[int] = [i for i, x in enumerate(kind) if x == IDLE]
+            while stack:
+                i = stack.pop()
+                for j in indices[offsets[i]:offsets[i + 1]]:
+                    if not reached[j]:
+                        reached[j] = True
+                        stack.append(j)
+            found.append(reached)
+        return [x and y for x, y in zip(*found)]
+
+    sources, targets = arrays.edge_source(), arrays.out_indices
+    found = []
+    for edge_from, edge_to in ((sources, targets), (targets, sources)):
+        reached = arrays.kind == IDLE
+        last_found = reached
+        while last_found.any():
+            new_found = numpy.zeros_like(reached)
+            new_found[edge_to[last_found[edge_from]]] = True
+            last_found = new_found & ~reached
+            reached |= last_found
+        found.append(reached)
+    return found[0] & found[1]
+
+
+# EventArrays without the events of connected_events that are False and their edges, same arrays if there are none
+def remove_unconnected(arrays: EventArrays) -> EventArrays:
+    keep = connected_events(arrays)
+    # new position of every kept event = kept events before it
+    event_before = _counts_before(keep)
+    if event_before[-1] == len(keep):
+        return arrays
+
+    out_indices, in_edges = _values(arrays.out_indices), _values(arrays.in_edges)
+    edge_keep = _both(_take(keep, _values(arrays.edge_source())), _take(keep, out_indices))
+    edge_before = _counts_before(edge_keep)
+    in_keep = _take(edge_keep, in_edges)
+    split_events = _values(arrays.split_events)
+    split_keep = _take(keep, split_events)
+
+    pruned = EventArrays(list(compress(arrays.events, keep)), arrays.splits, arrays.lines)
+    for name in ("event_id", "kind", "location", "split", "line", "earl_depart", "lat_depart"):
+        setattr(pruned, name, _as_field(_compress(_values(getattr(arrays, name)), keep), getattr(arrays, name)))
+    # edges of removed events are removed too -> offsets of the kept events are enough
+    pruned.out_offsets = _as_field(_kept_offsets(_values(arrays.out_offsets), edge_before, keep), arrays.out_offsets)
+    pruned.out_indices = _as_field(_take(event_before, _compress(out_indices, edge_keep)), arrays.out_indices)
+    pruned.in_offsets = _as_field(_kept_offsets(_values(arrays.in_offsets), _counts_before(in_keep), keep),
+                                  arrays.in_offsets)
+    pruned.in_indices = _as_field(_take(event_before, _compress(_values(arrays.in_indices), in_keep)),
+                                  arrays.in_indices)
+    pruned.in_edges = _as_field(_take(edge_before, _compress(in_edges, in_keep)), arrays.in_edges)
+    # splits stay (possibly without events), so all offsets are kept
+    pruned.split_offsets = _as_field(_take(_counts_before(split_keep), _values(arrays.split_offsets)),
+                                     arrays.split_offsets)
+    pruned.split_events = _as_field(_take(event_before, _compress(split_events, split_keep)), arrays.split_events)
+    return pruned
+
+
+# element-wise operations on numpy arrays if numpy is installed, on lists otherwise
+def _values(field):
+    return field if numpy is not None else field.tolist()
+
+
+def _as_field(values, field):
+    # values with the type of field
+    if numpy is not None:
+        return values.astype(field.dtype)
+    return array(field.typecode, values)
+
+
+def _take(values, positions):
+    if numpy is not None:
+        return values[positions]
+    return [values[x] for x in positions]
+
+
+def _compress(values, mask):
+    if numpy is not None:
+        return values[mask]
+    return list(compress(values, mask))
+
+
+def _both(mask, other_mask):
+    if numpy is not None:
+        return mask & other_mask
+    return [x and y for x, y in zip(mask, other_mask)]
+
+
+def _counts_before(mask):
+    # number of True values before every position, last value = total
+    if numpy is not None:
+        return numpy.concatenate(([0], numpy.cumsum(mask)))
+    return list(accumulate(mask, initial=0))
+
+
+def _kept_offsets(offsets, counts_before, keep):
+    # offsets of the kept rows of a compressed sparse row structure
+    starts = _compress(_take(counts_before, offsets[:-1]), keep)
+    if numpy is not None:
+        return numpy.append(starts, counts_before[-1])
+    return starts + [counts_before[-1]]
@@ -1,28 +1,35 @@
-from typing import List, Set, Tuple, Dict
+from bisect import bisect_left
+from typing import List, Set, Tuple, Dict, FrozenSet, Iterable
 
 from utils import Global
 from utils.demand.AbstractRequest import SplitRequest
-from utils.helper import Timer, Helper
-from utils.helper.Timer import TimeImpl
+from utils.helper import Helper
 from utils.network.Line import Line
 from utils.network.Stop import Stop
 
 
 class Event:
+    __slots__ = ("remaining", "first", "earl_depart", "lat_depart", "location", "id")
     id_counter: int = 0
 
-    def __init__(self, first: SplitRequest = None, remaining: Set[SplitRequest] = None):
-        if remaining is None:
-            remaining = set()
-        self.remaining_id: Set[int] = {x.id for x in remaining}
-        self.remaining_split_id: Set[int] = {x.split_id for x in remaining}
+    def __init__(self, first: SplitRequest = None, remaining: FrozenSet[SplitRequest] = frozenset()):
+        # permutations hand in frozensets -> events with the same passengers share one set (frozenset() does not copy)
+        self.remaining: FrozenSet[SplitRequest] = frozenset(remaining)
         self.first: SplitRequest = first
-        self.earl_depart: TimeImpl | None = None
-        self.lat_depart: TimeImpl  | None = None
+        self.earl_depart: int | None = None
+        self.lat_depart: int | None = None
         self.location: Stop | None = None
         self.id: int = Event.id_counter
         Event.id_counter += 1
 
+    @property
+    def remaining_id(self) -> Set[int]:
+        return {x.id for x in self.remaining}
+
+    @property
+    def remaining_split_id(self) -> Set[int]:
+        return {x.split_id for x in self.remaining}
+
     def set_before_event(self):
         pass
 
@@ -31,12 +38,14 @@ class Event:
 
 
 class IdleEvent(Event):
+    __slots__ = ("line",)
+
     def __init__(self, line: Line):
         super().__init__()
         self.location: Stop = line.depot
         self.line: Line = line
-        self.earl_depart: TimeImpl = TimeImpl(0, 0)
-        self.lat_depart: TimeImpl = TimeImpl(23, 59)
+        self.earl_depart: int = 0
+        self.lat_depart: int = 23 * 3600 + 59 * 60
 
     def set_before_event(self):
         return frozenset()
@@ -52,17 +61,19 @@ class IdleEvent(Event):
 
 
 class PickUpEvent(Event):
-    def __init__(self, first: SplitRequest, remaining: Set[SplitRequest], earl_time: TimeImpl, lat_time: TimeImpl):
+    __slots__ = ()
+
+    def __init__(self, first: SplitRequest, remaining: FrozenSet[SplitRequest], earl_time: int, lat_time: int):
         super().__init__(first, remaining)
         self.location: Stop = first.pick_up_location
-        self.earl_depart: TimeImpl = earl_time
-        self.lat_depart: TimeImpl = lat_time
+        self.earl_depart: int = earl_time
+        self.lat_depart: int = lat_time
 
     def set_before_event(self):
-        return frozenset(self.remaining_split_id)
+        return self.remaining
 
     def set_after_event(self):
-        return frozenset(self.remaining_split_id | {self.first.split_id})
+        return self.remaining | {self.first}
 
     def __repr__(self):
         return f"PickUpEvent(user:{self.first.id}; others:{self.remaining_id}; location:{self.location.id}; line:{self.first.line.id})"
@@ -71,17 +82,19 @@ class PickUpEvent(Event):
         return f"({self.first.id},{self.remaining_id},{self.location.id},{self.first.line.id})+"
 
 class DropOffEvent(Event):
-    def __init__(self, first: SplitRequest, remaining: Set[SplitRequest], earl_time: TimeImpl, lat_time: TimeImpl):
+    __slots__ = ()
+
+    def __init__(self, first: SplitRequest, remaining: FrozenSet[SplitRequest], earl_time: int, lat_time: int):
         super().__init__(first, remaining)
         self.location: Stop = first.drop_off_location
-        self.earl_depart: TimeImpl = earl_time
-        self.lat_depart: TimeImpl = lat_time
+        self.earl_depart: int = earl_time
+        self.lat_depart: int = lat_time
 
     def set_before_event(self):
-        return frozenset(self.remaining_split_id | {self.first.split_id})
+        return self.remaining | {self.first}
 
     def set_after_event(self):
-        return frozenset(self.remaining_split_id)
+        return self.remaining
 
     def __repr__(self):
         return f"DropOffEvent(user:{self.first.id}; others:{self.remaining_id}; location:{self.location.id}; line:{self.first.line.id})"
@@ -94,6 +107,23 @@ class EventGraph:
     def __init__(self):
         self.request_dict: Dict[SplitRequest, Tuple[Set[Event], Set[Event]]] = {}
         self.edge_dict: Dict[Event, Tuple[List[Event], List[Event]]] = {}
+        # onboard states (passengers in the bus) interned to integer ids
+        self.state_ids: Dict[FrozenSet[SplitRequest], int] = {}
+        # (state id, split) -> id of state with split added, avoids building and comparing the union again
+        self.state_extensions: Dict[Tuple[int, SplitRequest], int] = {}
+        self.idle_events: Dict[Line, IdleEvent] = {}
+
+    def get_state_id(self, state: FrozenSet[SplitRequest]) -> int:
+        if state not in self.state_ids:
+            self.state_ids[state] = len(self.state_ids)
+        return self.state_ids[state]
+
+    def get_extended_state_id(self, state: FrozenSet[SplitRequest], split_req: SplitRequest) -> Tuple[int, int]:
+        # ids of state and state | {split_req}
+        state_id = self.get_state_id(state)
+        if (state_id, split_req) not in self.state_extensions:
+            self.state_extensions[(state_id, split_req)] = self.get_state_id(state | {split_req})
+        return state_id, self.state_extensions[(state_id, split_req)]
 
     def data_in_string(self):
         nodes = len(self.edge_dict.keys())
@@ -101,13 +131,17 @@ class EventGraph:
 
         return f"Number of split_requests: {split_requests}; Number of nodes: {nodes}; Number of edges: {self.get_number_of_edges()}."
 
+    def get_idle_event(self, line: Line) -> IdleEvent:
+        return self.idle_events[line]
+
     def get_edges_in(self, event: Event):
         return self.edge_dict[event][0]
 
     def get_edges_out(self, event: Event):
         return self.edge_dict[event][1]
 
-    # delete all nodes, that do not have path to and from idle
+    # raises if an event of the line has no path to and from the idle event (only for debugging, see
+    # Global.CHECK_EVENT_GRAPH)
     def check_connectivity(self, idle_event: IdleEvent):
         look_up_dict: Dict[Event, List[bool]] = {x: [False, False] for x in self.edge_dict.keys()
                                                  if not isinstance(x, IdleEvent) and x.first.line == idle_event.line}
@@ -135,48 +169,124 @@ class EventGraph:
         if len(unconnected_events) > 0:
             raise ValueError("There are events in EventGraph not connected to idle event")
 
-    # add all events of a single line together, generates edges
-    def add_events(self, event_set_line: Set[Event]):
-        self.edge_dict |= {x: ([], []) for x in event_set_line}
-        split_requests = {x.first for x in event_set_line if not isinstance(x, IdleEvent)}
-        self.request_dict |= {x: (set(), set()) for x in split_requests}
+    # removes edges that are zero in every solution of the model, returns number of removed edges:
+    # - idle -> pick-up, if the split cannot be picked up in time when starting at the depot at line start
+    # - drop-off -> idle, if the bus cannot be back at the depot by line end after the earliest drop-off
+    # events without a path from and to the idle event afterwards are removed by EventArrays.remove_unconnected
+    def reduce_graph(self):
+        edges_before = self.get_number_of_edges()
+
+        for idle_event in self.idle_events.values():
+            line = idle_event.line
+            for event_after in [x for x in self.edge_dict[idle_event][1] if x.first.latest_start_time <
+                                line.start_time + Helper.get_travel_time(idle_event.location, x.location)]:
+                self.remove_edge(idle_event, event_after)
+            for event_before in [x for x in self.edge_dict[idle_event][0] if x.first.earl_arr_time +
+                                 Global.TRANSFER_SECONDS + Helper.get_travel_time(x.location, idle_event.location) >
+                                 line.end_time]:
+                self.remove_edge(event_before, idle_event)
+
+        return edges_before - self.get_number_of_edges()
+
+    def remove_edge(self, event_before: Event, event_after: Event):
+        self.edge_dict[event_before][1].remove(event_after)
+        self.edge_dict[event_after][0].remove(event_before)
 
-        hash_dict: Dict[int, Set[Tuple[bool, Event]]] = {}
+    # add all events of a single line together, generates edges
+    # events can come from a generator, they are only kept in the graph itself
+    def add_events(self, event_set_line: Iterable[Event]):
+        # per onboard state id: events starting in that state (successors) and ending in it (predecessors)
+        state_dict: Dict[int, Tuple[List[Event], List[Event]]] = {}
 
         for event in event_set_line:
+            self.edge_dict[event] = ([], [])
+            if isinstance(event, IdleEvent):
+                self.idle_events[event.line] = event
+            elif event.first not in self.request_dict:
+                self.request_dict[event.first] = (set(), set())
             if isinstance(event, PickUpEvent):
                 self.request_dict[event.first][0].add(event)
             elif isinstance(event, DropOffEvent):
                 self.request_dict[event.first][1].add(event)
 
-            key_before: int = hash(event.set_before_event())
-            key_after: int = hash(event.set_after_event())
-
-            # hopefully hash function does not have collisions
-            if key_before in hash_dict:
-                hash_dict[key_before].add((True, event))
-            else:
-                hash_dict[key_before] = {(True, event)}
-
-            if key_after in hash_dict:
-                hash_dict[key_after].add((False, event))
+            # same ids as for set_before_event and set_after_event
+            if isinstance(event, PickUpEvent):
+                key_before, key_after = self.get_extended_state_id(event.remaining, event.first)
+            elif isinstance(event, DropOffEvent):
+                key_after, key_before = self.get_extended_state_id(event.remaining, event.first)
             else:
-                hash_dict[key_after] = {(False, event)}
-
-        for key in hash_dict:
-            same_pass_events_succ: Set[Event] = {x[1] for x in hash_dict[key] if x[0]}
-            same_pass_events_pred: Set[Event] = {x[1] for x in hash_dict[key] if not x[0]}
+                key_before = key_after = self.get_state_id(event.remaining)
+
+            if key_before not in state_dict:
+                state_dict[key_before] = ([], [])
+            state_dict[key_before][0].append(event)
+            if key_after not in state_dict:
+                state_dict[key_after] = ([], [])
+            state_dict[key_after][1].append(event)
+
+        for same_pass_events_succ, same_pass_events_pred in state_dict.values():
+            if len(same_pass_events_succ) == 0 or len(same_pass_events_pred) == 0:
+                continue
+
+            # successors per location sorted by latest departure -> all reachable ones are a suffix
+            succ_dict: Dict[Stop, Tuple[List[int], List[Event]]] = {}
+            for event_after in sorted(same_pass_events_succ, key=lambda x: x.lat_depart):
+                if event_after.location not in succ_dict:
+                    succ_dict[event_after.location] = ([], [])
+                succ_dict[event_after.location][0].append(event_after.lat_depart)
+                succ_dict[event_after.location][1].append(event_after)
 
             for event_before in same_pass_events_pred:
-                for event_after in same_pass_events_succ:
-                    duration = Timer.calc_time(Helper.calc_distance(event_before.location, event_after.location))
+                for location, (lat_departs, events_after) in succ_dict.items():
+                    duration = Helper.get_travel_time(event_before.location, location)
                     service_time = Global.TRANSFER_SECONDS * int(bool(duration))
-                    #if event_before.first is not None and event_before.first.id == 2 and event_after.first is not None and event_after.first.id == 2:
-                    #    print("hi")
-                    if (event_before is not event_after) and event_before.earl_depart.add_seconds(
-                            duration + service_time) <= event_after.lat_depart:
-                        self.edge_dict[event_after][0].append(event_before)
-                        self.edge_dict[event_before][1].append(event_after)
+                    first = bisect_left(lat_departs, event_before.earl_depart + duration + service_time)
+                    for event_after in events_after[first:]:
+                        if event_before is not event_after:
+                            self.edge_dict[event_after][0].append(event_before)
+                            self.edge_dict[event_before][1].append(event_after)
+
+    # events of one line as plain records (kind, first split_id, remaining split_ids, earl_depart, lat_depart) in order of
+    # creation and outgoing edges as positions in that list, so they can be sent back from worker processes
+    def export_line_events(self, line: Line):
+        events: List[Event] = sorted((x for x in self.edge_dict if (x.line if isinstance(x, IdleEvent)
+                                                                   else x.first.line) == line), key=lambda x: x.id)
+        position: Dict[Event, int] = {x: i for i, x in enumerate(events)}
+        records: List[Tuple[int, int | None, Tuple[int, ...], int, int]] = []
+        for event in events:
+            if isinstance(event, IdleEvent):
+                records.append((0, None, (), event.earl_depart, event.lat_depart))
+            else:
+                kind = 1 if isinstance(event, PickUpEvent) else 2
+                records.append((kind, event.first.split_id, tuple(sorted(event.remaining_split_id)), event.earl_depart,
+                                event.lat_depart))
+        edges: List[List[int]] = [[position[x] for x in self.edge_dict[y][1]] for y in events]
+        return records, edges
+
+    # creates the events of export_line_events again (with new ids) for the split requests of this process
+    def import_line_events(self, line: Line, records, edges: List[List[int]], splits: Dict[int, SplitRequest]):
+        remaining_dict: Dict[Tuple[int, ...], FrozenSet[SplitRequest]] = {}
+        events: List[Event] = []
+        for kind, first_id, remaining_ids, earl_depart, lat_depart in records:
+            if kind == 0:
+                events.append(IdleEvent(line))
+                self.idle_events[line] = events[-1]
+                continue
+            if remaining_ids not in remaining_dict:
+                remaining_dict[remaining_ids] = frozenset(splits[x] for x in remaining_ids)
+            if kind == 1:
+                event = PickUpEvent(splits[first_id], remaining_dict[remaining_ids], earl_depart, lat_depart)
+                self.request_dict.setdefault(event.first, (set(), set()))[0].add(event)
+            else:
+                event = DropOffEvent(splits[first_id], remaining_dict[remaining_ids], earl_depart, lat_depart)
+                self.request_dict.setdefault(event.first, (set(), set()))[1].add(event)
+            events.append(event)
+
+        self.edge_dict |= {x: ([], []) for x in events}
+        for event_before, succ in zip(events, edges):
+            for i in succ:
+                self.edge_dict[events[i]][0].append(event_before)
+                self.edge_dict[event_before][1].append(events[i])
 
     def get_number_of_edges(self):
         return sum(len(self.edge_dict[x][1]) for x in self.edge_dict.keys())
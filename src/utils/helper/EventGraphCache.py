@@ -0,0 +1,89 @@
+import hashlib
+import os
+import pickle
+from typing import Dict, List, Set, Tuple
+
+from utils import Global
+from utils.demand.AbstractRequest import SplitRequest
+from utils.helper.EventGraph import EventGraph
+from utils.network.Line import Line
+
+# files of reading the instance and of the event graph construction, a change in one of them makes all cached graphs
+# invalid
+SOURCE_FILES: List[str] = ["IOHandler.py", "main/plan/EventBasedMILP.py", "utils/helper/EventGraph.py",
+                           "utils/helper/EventWindow.py", "utils/helper/Helper.py", "utils/helper/LineGraph.py",
+                           "utils/helper/DelayEquation.py", "utils/helper/Timer.py", "utils/helper/EventGraphCache.py"]
+# Global values that change the event graph
+CONFIG_NAMES: List[str] = ["AVERAGE_KMH", "KM_PER_UNIT", "CAPACITY_PER_LINE", "NUMBER_OF_EXTRA_TRANSFERS",
+                           "MAX_DELAY_EQUATION", "TRANSFER_SECONDS", "TIME_WINDOW_SECONDS", "MAX_ONBOARD_SET",
+                           "MAX_EVENTS_PER_SPLIT"]
+
+
+def instance_key(network_path: str, request_path: str) -> str:
+    # content hash of network file, request file, relevant config values and the code building the graph
+    digest = hashlib.sha256()
+    source_dir = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    for path in [network_path, request_path] + [os.path.join(source_dir, x) for x in SOURCE_FILES]:
+        with open(path, 'rb') as file:
+            digest.update(hashlib.sha256(file.read()).digest())
+    digest.update(repr([(x, getattr(Global, x)) for x in CONFIG_NAMES]).encode())
+    return digest.hexdigest()
+
+
+# split ids depend on the order of reading, a split is the same for (request, line, pick-up, drop-off)
+def split_key(split_req: SplitRequest) -> Tuple[int, int, int, int]:
+    return split_req.parent.id, split_req.line.id, split_req.pick_up_location.id, split_req.drop_off_location.id
+
+
+def cache_file(splits: Set[SplitRequest]) -> str | None:
+    # key of the instance and the planned splits (differs between calls of a dynamic context)
+    if not Global.EVENT_GRAPH_CACHE_DIR or not Global.EVENT_GRAPH_CACHE_KEY:
+        return None
+    digest = hashlib.sha256(Global.EVENT_GRAPH_CACHE_KEY.encode())
+    digest.update(repr(sorted(split_key(x) for x in splits)).encode())
+    return os.path.join(Global.EVENT_GRAPH_CACHE_DIR, digest.hexdigest() + ".pickle")
+
+
+def save_event_graph(event_graph: EventGraph, splits: Set[SplitRequest], truncated: Tuple[int, int]):
+    path = cache_file(splits)
+    if path is None:
+        return
+    split_keys: Dict[int, Tuple[int, int, int, int]] = {x.split_id: split_key(x) for x in splits}
+    line_data = []
+    for line in sorted(event_graph.idle_events, key=lambda x: x.id):
+        records, edges = event_graph.export_line_events(line)
+        records = [(kind, None if first is None else split_keys[first], tuple(split_keys[x] for x in remaining), earl,
+                    lat) for kind, first, remaining, earl, lat in records]
+        line_data.append((line.id, records, edges))
+
+    # write to a temporary file first, so that an interrupted run does not leave a broken cache file
+    os.makedirs(Global.EVENT_GRAPH_CACHE_DIR, exist_ok=True)
+    with open(path + ".tmp", 'wb') as file:
+        # truncated permutations and splits of the build, so a loaded graph warns about it as well
+        pickle.dump({"truncated": truncated, "lines": line_data}, file, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(path + ".tmp", path)
+
+
+def load_event_graph(splits: Set[SplitRequest], lines: Set[Line]) -> Tuple[EventGraph, Tuple[int, int]] | None:
+    # event graph for the splits from a previous run and its truncations, None if there is none
+    path = cache_file(splits)
+    if path is None or not os.path.exists(path):
+        return None
+    split_dict: Dict[Tuple[int, int, int, int], SplitRequest] = {split_key(x): x for x in splits}
+    split_ids: Dict[int, SplitRequest] = {x.split_id: x for x in splits}
+    line_dict: Dict[int, Line] = {x.id: x for x in lines}
+    # a file of another structure (e.g. written by an older version) is treated like a broken one
+    try:
+        with open(path, 'rb') as file:
+            data = pickle.load(file)
+        truncated_permutations, truncated_splits = data["truncated"]
+        event_graph = EventGraph()
+        for line_id, records, edges in data["lines"]:
+            records = [(kind, None if first is None else split_dict[first].split_id,
+                        tuple(split_dict[x].split_id for x in remaining), earl, lat)
+                       for kind, first, remaining, earl, lat in records]
+            event_graph.import_line_events(line_dict[line_id], records, edges, split_ids)
+    except (OSError, EOFError, pickle.UnpicklingError, ValueError, TypeError, KeyError, IndexError):
+        print(f"Could not read cached event graph {path}, building it again")
+        return None
+    return event_graph, (truncated_permutations, truncated_splits)
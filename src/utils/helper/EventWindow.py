@@ -0,0 +1,118 @@
+from bisect import bisect_left
+from typing import Dict, List, Tuple
+
+from utils import Global
+from utils.demand.AbstractRequest import SplitRequest
+from utils.helper import Helper
+from utils.network.Stop import Stop
+
+DAY_END: int = 23 * 3600 + 59 * 60 + 59
+
+
+# incremental version of Helper.get_event_window for the permutations of one event user:
+# a state keeps the stops visited by its users (as positions on the line in driving direction) together with the
+# tightest times of all users at that stop, adding a user updates two positions and only walks the visited stops
+class EventWindowState:
+    __slots__ = ("event_user", "event_type", "stop_pos", "matrix_idx", "split_pos", "load", "positions", "stop_values",
+                 "window")
+
+    def __init__(self, event_user: SplitRequest, event_type: bool):
+        stops: List[Stop] = event_user.line.stops.copy()
+        if Helper.check_dir(event_user) == 1:
+            stops.reverse()
+        self.event_user: SplitRequest = event_user
+        self.event_type: bool = event_type
+        self.stop_pos: Dict[Stop, int] = {x: i for i, x in enumerate(stops)}
+        self.matrix_idx: List[int] = [x.idx for x in stops]
+        # first position after the pick-ups (same as first_drop_off_idx in get_event_window)
+        if event_type:
+            self.split_pos: int = self.stop_pos[event_user.pick_up_location] + 1
+        else:
+            self.split_pos: int = self.stop_pos[event_user.drop_off_location]
+
+        # passengers of all users
+        self.load: int = event_user.number_of_passengers
+        # sorted positions and (latest earliest start, earliest latest start, earliest latest arrival) of all users there
+        self.positions: List[int] = []
+        self.stop_values: List[Tuple[int, int, int]] = []
+        self.window: Tuple[int, int] | Tuple[None, None] = (None, None)
+        self._add_user(event_user)
+        self._walk()
+
+    def extend(self, user: SplitRequest) -> "EventWindowState":
+        # state for the users of this state and one more, this state stays unchanged
+        state = EventWindowState.__new__(EventWindowState)
+        state.event_user = self.event_user
+        state.event_type = self.event_type
+        state.stop_pos = self.stop_pos
+        state.matrix_idx = self.matrix_idx
+        state.split_pos = self.split_pos
+        state.load = self.load + user.number_of_passengers
+        state.positions = self.positions.copy()
+        state.stop_values = self.stop_values.copy()
+        state._add_user(user)
+        state._walk()
+        return state
+
+    def _add_user(self, user: SplitRequest):
+        for stop in (user.pick_up_location, user.drop_off_location):
+            pos = self.stop_pos[stop]
+            i = bisect_left(self.positions, pos)
+            if i < len(self.positions) and self.positions[i] == pos:
+                earl_start, lat_start, lat_arr = self.stop_values[i]
+                self.stop_values[i] = (max(earl_start, user.earl_start_time), min(lat_start, user.latest_start_time),
+                                       min(lat_arr, user.latest_arr_time))
+            else:
+                self.positions.insert(i, pos)
+                self.stop_values.insert(i, (user.earl_start_time, user.latest_start_time, user.latest_arr_time))
+
+    def _walk(self):
+        # same walk as in get_event_window, but only over the visited positions
+        travel_times = Global.TRAVEL_TIME_MATRIX
+        matrix_idx = self.matrix_idx
+        split_pos = self.split_pos
+        transfer = Global.TRANSFER_SECONDS
+        self.window = (None, None)
+
+        curr_time = 0
+        curr_idx = matrix_idx[self.positions[0]]
+        rem_travel_time = 0
+        earl_time = None
+        latest_time = DAY_END
+        pick_lat_start = DAY_END
+        for pos, (earl_start, lat_start, lat_arr) in zip(self.positions, self.stop_values):
+            if pos < split_pos:
+                curr_time += travel_times[curr_idx][matrix_idx[pos]]
+                if curr_time < earl_start:
+                    curr_time = earl_start
+                if curr_time > lat_start:
+                    return
+                curr_idx = matrix_idx[pos]
+                curr_time += transfer
+                pick_lat_start = lat_start
+                continue
+
+            if earl_time is None:
+                # all pick-ups done, set window of the event itself
+                if self.event_type:
+                    earl_time = curr_time - transfer
+                    # last pick-up position is the one of the event user
+                    latest_time = min(latest_time, pick_lat_start)
+                else:
+                    duration = travel_times[curr_idx][matrix_idx[split_pos]]
+                    rem_travel_time = -duration - transfer
+                    earl_time = curr_time + duration
+
+            duration = travel_times[curr_idx][matrix_idx[pos]]
+            rem_travel_time += duration
+            curr_time += duration
+            if lat_arr - rem_travel_time - transfer < latest_time:
+                latest_time = lat_arr - rem_travel_time - transfer
+            if curr_time > lat_arr:
+                return
+            curr_idx = matrix_idx[pos]
+            curr_time += transfer
+            rem_travel_time += transfer
+
+        if earl_time <= latest_time:
+            self.window = (earl_time, latest_time)
@@ -1,12 +1,11 @@
 import math
-from typing import Dict, Set, List, Tuple
+from typing import Dict, Set, List, Tuple, Type, Iterator
 
 from utils import Global
 from utils.demand.AbstractRequest import SplitRequest, Request
-from utils.helper import Timer
-from utils.helper.LineGraph import LineGraph, LineEdge
-from utils.helper.PriorityQueue import PriorityQueue
-from utils.helper.Timer import TimeImpl
+from utils.helper import Timer, DelayEquation
+from utils.helper.LineGraph import LineGraph, LineEdge, RequestOverlay
+from utils.helper.PriorityQueue import PriorityQueue, IndexedPriorityQueue
 from utils.network.Stop import Stop
 from utils.network.Line import Line
 from utils.plan.RouteStop import RouteStop
@@ -19,6 +18,25 @@ def calc_distance(stop1: Stop, stop2: Stop) -> float:
     return unit_dist * Global.KM_PER_UNIT
 
 
+def build_distance_matrix(stops: Set[Stop]):
+    # give every stop a compact index, fill dense matrices of km and travel seconds for all pairs
+    ordered_stops: List[Stop] = sorted(stops, key=lambda x: x.id)
+    for idx, stop in enumerate(ordered_stops):
+        stop.idx = idx
+
+    Global.DISTANCE_MATRIX = [[calc_distance(stop1, stop2) for stop2 in ordered_stops] for stop1 in ordered_stops]
+    Global.TRAVEL_TIME_MATRIX = [[Timer.calc_time(dist) for dist in row] for row in Global.DISTANCE_MATRIX]
+
+
+def get_distance(stop1: Stop, stop2: Stop) -> float:
+    return Global.DISTANCE_MATRIX[stop1.idx][stop2.idx]
+
+
+# gives duration in seconds
+def get_travel_time(stop1: Stop, stop2: Stop) -> int:
+    return Global.TRAVEL_TIME_MATRIX[stop1.idx][stop2.idx]
+
+
 def check_dir(split_req: SplitRequest):
     line: Line = split_req.line
     start_idx = line.stops.index(split_req.pick_up_location)
@@ -30,8 +48,11 @@ def check_dir(split_req: SplitRequest):
 
 
 # need to calculate number of transfers as well
-def calc_fastest(pick_up_location: Stop, drop_off_location: Stop, network_graph: LineGraph, number_of_passengers: int) -> Tuple[int, int]:
-    # dijkstra alg.
+# runs until drop-off location is final (or all nodes if no drop-off location given),
+# returns final times and the (lines, transfers) found for every node
+def dijkstra(pick_up_location: Stop, network_graph: LineGraph | RequestOverlay, number_of_passengers: int,
+             drop_off_location: Stop = None, queue_class: Type[PriorityQueue | IndexedPriorityQueue] = IndexedPriorityQueue
+             ) -> Tuple[Dict[Stop, int], Dict[Stop, Tuple[Set[Line], int]]]:
     pred_dict: Dict[Stop, (
         Set[Line], int)] = {}  # contains poss. lines request is in at stop v and number of transfers at this point
     for stop in network_graph.get_nodes():
@@ -42,10 +63,10 @@ def calc_fastest(pick_up_location: Stop, drop_off_location: Stop, network_graph:
          edge.line.capacity >= number_of_passengers])
     pred_dict[pick_up_location] = (pick_lines, 1)
 
-    queue: PriorityQueue = PriorityQueue(network_graph.get_nodes())
+    queue: PriorityQueue | IndexedPriorityQueue = queue_class(network_graph.get_nodes())
     queue.replace(pick_up_location, Global.TRANSFER_SECONDS)
 
-    while (not queue.is_empty()) and (queue.get_priority(drop_off_location) is not None):
+    while (not queue.is_empty()) and (drop_off_location is None or queue.get_priority(drop_off_location) is not None):
         v, dist_v = queue.pop()
         for adj_edge in network_graph.get_edges_out(v):
             if adj_edge.line.capacity >= number_of_passengers:
@@ -67,43 +88,70 @@ def calc_fastest(pick_up_location: Stop, drop_off_location: Stop, network_graph:
                         queue.replace(u, alter)
                         pred_dict[u] = ({adj_edge.line}, numb_transfer)
 
-    fast_time, transfers = queue.final_vals[drop_off_location], pred_dict[drop_off_location][1]
+    return queue.final_vals, pred_dict
+
+
+def calc_fastest(pick_up_location: Stop, drop_off_location: Stop, network_graph: LineGraph, number_of_passengers: int) -> Tuple[int, int]:
+    request_graph: RequestOverlay = network_graph.attach_request(pick_up_location, drop_off_location)
+    final_vals, pred_dict = dijkstra(pick_up_location, request_graph, number_of_passengers, drop_off_location)
+    fast_time, transfers = final_vals[drop_off_location], pred_dict[drop_off_location][1]
     return fast_time, transfers
 
 def complete_request(pick_up: Stop, drop_off: Stop, network_graph: LineGraph, number_of_passengers: int):
-    # calculate fastest time -> account for transfers -> plug into max_delay_equation, return corresp. km
-    fastest_time, numb_transfers = calc_fastest(pick_up, drop_off, network_graph, number_of_passengers)
+    # look up fastest time -> account for transfers -> plug into max_delay_equation, return corresp. km
+    fastest_time, numb_transfers = network_graph.get_fastest(pick_up, drop_off, number_of_passengers)
     assert fastest_time is not Global.INFINITE_INT
-    long_delay: int = 60 * max(0, round(eval(Global.MAX_DELAY_EQUATION, {"math": math, "x": (fastest_time/60)})))
+    long_delay: int = DelayEquation.calc_delay(fastest_time)
 
     return long_delay + fastest_time, numb_transfers, fastest_time
 
 
-# check if hop-count exceeded -> add current stop to all open lists -> if not source: recursive call to neighbours
-def rec_dfs(last_line: LineEdge, curr_seconds: int, curr_transfers: int, prev_visited: Set[Stop],
-            curr_open: List[List[SplitRequest]], look_up_dict: Dict[LineEdge, SplitRequest], max_time: int,
-            max_hop_count: int, target: Stop, network_graph: LineGraph, number_of_passengers: int):
-    if curr_transfers > max_hop_count or curr_seconds > max_time:
-        return []
-    else:
-        for combi in curr_open:
-            combi.append(look_up_dict[last_line])
-        if last_line.v2 == target:
-            return curr_open
+# lower bound for the remaining travel seconds from every node to the target
+# (reverse dijkstra, every edge costs transfer + duration, line changes and capacities are ignored)
+def calc_remaining_times(target: Stop, network_graph: LineGraph | RequestOverlay) -> Dict[Stop, int]:
+    queue: IndexedPriorityQueue = IndexedPriorityQueue(network_graph.get_nodes())
+    queue.replace(target, 0)
+
+    while not queue.is_empty():
+        v, dist_v = queue.pop()
+        for adj_edge in network_graph.get_edges_in(v):
+            dist_u = queue.get_priority(adj_edge.v1)
+            alter: int = dist_v + Global.TRANSFER_SECONDS + adj_edge.duration
+            if dist_u is not None and alter < dist_u:
+                queue.replace(adj_edge.v1, alter)
+
+    return queue.final_vals
+
+
+# depth-first search with explicit stack, yields route options as (travel seconds, list of line edges)
+# every edge switches line, stops of the route are not visited twice,
+# branches are cut as soon as hop-count or time (including lower bound for the remaining way) is exceeded
+def iter_route_options(pick_up: Stop, drop_off: Stop, number_of_passengers: int, max_time: int, max_hop_count: int,
+                       network_graph: LineGraph | RequestOverlay) -> Iterator[Tuple[int, List[LineEdge]]]:
+    remaining_times: Dict[Stop, int] = calc_remaining_times(drop_off, network_graph)
+
+    # stack entries: (edge, seconds after edge, edges before, stops already left)
+    stack: List[Tuple[LineEdge, int, Tuple[LineEdge, ...], Tuple[Stop, ...]]] = []
+    start_edges = [x for x in network_graph.get_edges_out(pick_up) if x.line.capacity >= number_of_passengers]
+    for start_edge in reversed(start_edges):
+        stack.append((start_edge, Global.TRANSFER_SECONDS + start_edge.duration, (), (pick_up,)))
+
+    while len(stack) > 0:
+        last_line, curr_seconds, prev_edges, prev_visited = stack.pop()
+        if len(prev_edges) + 1 > max_hop_count or curr_seconds + remaining_times[last_line.v2] > max_time:
+            continue
+
+        route: Tuple[LineEdge, ...] = prev_edges + (last_line,)
+        if last_line.v2 == drop_off:
+            yield curr_seconds, list(route)
         else:
-            prev_visited.add(last_line.v1)
+            visited: Tuple[Stop, ...] = prev_visited + (last_line.v1,)
             # find all successors of v2, that are not yet explored and operate on new line
             successors: List[LineEdge] = [x for x in network_graph.get_edges_out(last_line.v2)
-                                          if (x.v2 not in prev_visited) and (x.line != last_line.line) and (
+                                          if (x.v2 not in visited) and (x.line != last_line.line) and (
                                                   x.line.capacity >= number_of_passengers)]
-
-            combined_poss: List[List[SplitRequest]] = []
-            for suc in successors:
-                combined_poss += rec_dfs(suc, curr_seconds + Global.TRANSFER_SECONDS + suc.duration, curr_transfers + 1,
-                                         prev_visited.copy(), [x.copy() for x in curr_open], look_up_dict, max_time,
-                                         max_hop_count, target, network_graph, number_of_passengers)
-
-            return combined_poss
+            for suc in reversed(successors):
+                stack.append((suc, curr_seconds + Global.TRANSFER_SECONDS + suc.duration, route, visited))
 
 
 def calc_time_multi(v1: Stop, v2: Stop, line: Line):
@@ -118,71 +166,45 @@ def calc_time_multi(v1: Stop, v2: Stop, line: Line):
 
     duration: float = 0
     for i in range(index_v1, index_v2):
-        duration += Timer.calc_time(calc_distance(line.stops[i], line.stops[i + 1]))
+        duration += get_travel_time(line.stops[i], line.stops[i + 1])
 
     return duration
 
 
-# Algo to retrieve all possible Subroutes in network from transfer point to transfer point(call only once store in LineGraph?)
-# + Per request: make SplitRequest for all pick-up/drop-off to transfer points subroutes(for every request) and for all subroutes in network -> store in dict
-
-# only call dfs once with split-req dict, starting at all subroutes of start -> check time and transfer constraints
-def find_split_requests(request: Request, network_graph: LineGraph) -> List[List[SplitRequest]]:
-    pick_up_edges: List[LineEdge] = network_graph.get_edges_out(request.pick_up_location)
-    drop_off_edges: List[LineEdge] = network_graph.get_edges_in(request.drop_off_location)
-
-    pick_up_lines: Set[Line] = {x.line for x in pick_up_edges}
-    drop_off_lines: Set[Line] = {x.line for x in drop_off_edges}
+# Algo to retrieve all possible Subroutes in network from transfer point to transfer point
+# route options only depend on pick-up, drop-off and capacity class (and the time/transfer budget)
+# -> enumerated once per key and stored in LineGraph, later requests filter the stored options by their budget
+def find_route_options(pick_up: Stop, drop_off: Stop, number_of_passengers: int, max_time: int, max_hop_count: int,
+                       network_graph: LineGraph) -> List[Tuple[int, List[LineEdge]]]:
+    key = (pick_up, drop_off, network_graph.get_capacity_class(number_of_passengers))
+    Global.ROUTE_CACHE_LOOKUPS += 1
 
-    pick_up_trans: Set[Stop] = set()
-    # only need to look into further sub-lines if node is not a transfer point
-    if len(pick_up_lines) == 1:
-        # find all transfer points and store with in set
-        line: Line = next(iter(pick_up_lines))
-        for other in (network_graph.all_lines - {line}):
-            pick_up_trans |= (set(line.stops) & set(other.stops))
-
-    drop_off_trans: Set[Stop] = set()
-    if len(drop_off_lines) == 1:
-        # same for drop-off point
-        line: Line = next(iter(drop_off_lines))
-        # just check line against all other lines -> look for stops appearing mult. times
-        for other in (network_graph.all_lines - {line}):
-            drop_off_trans |= (set(line.stops) & set(other.stops))
-
-    # fill dict of LineEdge to SplitRequest for all aggregated routes in network
-    agg_edges_dict: Dict[LineEdge, SplitRequest] = {}
-    net_graph_edges = sorted(list(network_graph.get_edges()), key=lambda x: hash(x))
-    for agg_edge in net_graph_edges:
-        agg_edges_dict[agg_edge] = SplitRequest(request, agg_edge.v1, agg_edge.v2, agg_edge.line,
-                                                request.number_of_passengers)
-
-    # now do dfs with dictionary of split-requests, account for max. number of transfers and time constraints
-    max_time: int = (request.latest_arr_time - request.latest_start_time).get_in_seconds()
-
-    # depth-first search to retrieve all combinations, starting at start-position
-    result: List[List[SplitRequest]] = []
-    start_tupels: List[LineEdge] = network_graph.get_edges_out(request.pick_up_location)
-
-    for start_sub_line in start_tupels:
-        if start_sub_line.line.capacity >= request.number_of_passengers:
-            result += rec_dfs(start_sub_line, Global.TRANSFER_SECONDS + start_sub_line.duration, 1,
-                              {request.pick_up_location},
-                              [[]], agg_edges_dict, max_time, request.numb_transfer + Global.NUMBER_OF_EXTRA_TRANSFERS,
-                              request.drop_off_location, network_graph, request.number_of_passengers)
+    cached = network_graph.route_option_cache.get(key)
+    if cached is not None and cached[0] >= max_time and cached[1] >= max_hop_count:
+        Global.ROUTE_CACHE_HITS += 1
+        route_options = cached[2]
+    else:
+        # depth-first search to retrieve all combinations, starting at start-position
+        request_graph: RequestOverlay = network_graph.attach_request(pick_up, drop_off)
+        route_options: List[Tuple[int, List[LineEdge]]] = list(
+            iter_route_options(pick_up, drop_off, number_of_passengers, max_time, max_hop_count, request_graph))
+        # a narrower budget must not replace a wider one, if neither is wider the stored one is kept
+        if cached is None or (max_time >= cached[0] and max_hop_count >= cached[1]):
+            network_graph.route_option_cache[key] = (max_time, max_hop_count, route_options)
 
-    return result
+    # travel time and number of transfers only grow along a route -> checking the whole route is enough
+    return [x for x in route_options if x[0] <= max_time and len(x[1]) <= max_hop_count]
 
 
 # check if there are feasible routes regarding time windows,
 # if event_user is pick-up/drop-off and others are already in car
 # use best case time ->
 def get_event_window(event_user: SplitRequest, other_users: Set[SplitRequest], event_type: bool) -> (
-        TimeImpl, TimeImpl):
-    curr_time: TimeImpl
+        int, int):
+    curr_time: int
     curr_stop: Stop
-    earl_time: TimeImpl
-    latest_time: TimeImpl
+    earl_time: int
+    latest_time: int
 
     checker = False
     if event_user.id == 11 and event_user.line.id == 8134 and event_user.drop_off_location.id == 4:
@@ -190,7 +212,7 @@ def get_event_window(event_user: SplitRequest, other_users: Set[SplitRequest], e
         if len(other_users) == 1 and other.id == 3 and other.drop_off_location.id == 4:
             checker = True
             print("Found himmmmmmmmm")
-            print(f"The split has lat arr time: {other.latest_arr_time}")
+            print(f"The split has lat arr time: {Timer.conv_seconds_2_string(other.latest_arr_time)}")
 
     all_users = other_users | {event_user}
     stops: Set[Stop] = {x.drop_off_location for x in all_users}
@@ -218,13 +240,13 @@ def get_event_window(event_user: SplitRequest, other_users: Set[SplitRequest], e
 
     # walk through pick-up points -> check current_time (earliest possibilities)
     curr_stop: Stop = next((x for x in key_list_pick if x in cand_dict))
-    curr_time = TimeImpl(0, 0)
-    latest_time = TimeImpl(23, 59, 59)
+    curr_time = 0
+    latest_time = 23 * 3600 + 59 * 60 + 59
     for key in key_list_pick:
         if key in cand_dict:
             pick_up_users: Set[SplitRequest] = cand_dict[key]
-            duration: int = Timer.calc_time(calc_distance(curr_stop, key))
-            curr_time = curr_time.add_seconds(duration)
+            duration: int = get_travel_time(curr_stop, key)
+            curr_time += duration
             for user in pick_up_users:
                 if curr_time < user.earl_start_time:
                     curr_time = user.earl_start_time
@@ -234,20 +256,20 @@ def get_event_window(event_user: SplitRequest, other_users: Set[SplitRequest], e
                         print("earliest start times were the problem")
                     return None, None
             curr_stop = key
-            curr_time = curr_time.add_seconds(Global.TRANSFER_SECONDS)
+            curr_time += Global.TRANSFER_SECONDS
 
     if event_type:
         rem_travel_time: int = 0
-        earl_time = curr_time.sub_seconds(Global.TRANSFER_SECONDS)
+        earl_time = curr_time - Global.TRANSFER_SECONDS
 
         for user in cand_dict[event_user.pick_up_location]:
             poss_time = user.latest_start_time
             if latest_time > poss_time:
                 latest_time = poss_time
     else:
-        duration = Timer.calc_time(calc_distance(curr_stop, event_user.drop_off_location))
+        duration = get_travel_time(curr_stop, event_user.drop_off_location)
         rem_travel_time = -duration - Global.TRANSFER_SECONDS
-        earl_time = curr_time.add_seconds(duration)
+        earl_time = curr_time + duration
 
     # need to check for all remaining if latest_arr time is satisfied,
     # -> also check latest possible departure: sum travel times from here, check latest_arr time - travel time, choose leftmost
@@ -255,22 +277,22 @@ def get_event_window(event_user: SplitRequest, other_users: Set[SplitRequest], e
     for key in key_list_drop:
         if key in cand_dict:
             drop_off_users: Set[SplitRequest] = cand_dict[key]
-            duration: int = Timer.calc_time(calc_distance(curr_stop, key))
+            duration: int = get_travel_time(curr_stop, key)
 
             rem_travel_time += duration
-            curr_time = curr_time.add_seconds(duration)
+            curr_time += duration
             for user in drop_off_users:
-                poss_time = user.latest_arr_time.sub_seconds(rem_travel_time + Global.TRANSFER_SECONDS)
+                poss_time = user.latest_arr_time - rem_travel_time - Global.TRANSFER_SECONDS
                 if poss_time < latest_time:
                     latest_time = poss_time
 
                 if curr_time > user.latest_arr_time:
                     if checker:
-                        print(f"current time was: {curr_time} while latest arrival time of {user.id} was {user.latest_arr_time}")
+                        print(f"current time was: {Timer.conv_seconds_2_string(curr_time)} while latest arrival time of {user.id} was {Timer.conv_seconds_2_string(user.latest_arr_time)}")
                         print("latest arrival times fucked it")
                     return None, None
             curr_stop = key
-            curr_time = curr_time.add_seconds(Global.TRANSFER_SECONDS)
+            curr_time += Global.TRANSFER_SECONDS
             rem_travel_time += Global.TRANSFER_SECONDS
 
     if earl_time > latest_time:
@@ -283,8 +305,8 @@ def get_event_window(event_user: SplitRequest, other_users: Set[SplitRequest], e
         return earl_time, latest_time
 
 
-def check_overlap(interval_1_start: TimeImpl, interval_1_end: TimeImpl, interval_2_start: TimeImpl,
-                  interval_2_end: TimeImpl):
+def check_overlap(interval_1_start: int, interval_1_end: int, interval_2_start: int,
+                  interval_2_end: int):
     if interval_1_start > interval_2_end:
         return False
     elif interval_1_end < interval_2_start:
@@ -297,7 +319,7 @@ def calc_total_network_size(line_set: Set[Line]):
     total_sum = 0
     for line in line_set:
         for i in range(len(line.stops) - 1):
-            total_sum += calc_distance(line.stops[i], line.stops[i + 1])
+            total_sum += get_distance(line.stops[i], line.stops[i + 1])
 
     return total_sum
 
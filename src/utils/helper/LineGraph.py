@@ -1,19 +1,21 @@
-from typing import List, Set, Dict, Tuple
+from typing import List, Set, Dict, Tuple, FrozenSet
 
-from utils.helper import Timer
+from utils import Global
 from utils.network import Stop
 from utils.network.Bus import Bus
 from utils.network.Line import Line
 
 
 class LineEdge:
+    __slots__ = ("v1", "v2", "line", "duration")
+
     def __init__(self, v1: Stop, v2: Stop, line: Line, duration: int = -1):
         from utils.helper import Helper
         self.v1: Stop = v1
         self.v2: Stop = v2
         self.line: Line = line
         if duration == -1:
-            self.duration: int = Timer.calc_time(Helper.calc_distance(v1, v2))
+            self.duration: int = Helper.get_travel_time(v1, v2)
         else:
             self.duration: int = duration
 
@@ -24,19 +26,29 @@ class LineEdge:
             return False
 
 
-# only aggregated edges of graph, specific for each request(add s -> transfer, transfer -> end, s -> t separately)
+# only aggregated edges between transfer points, frozen after construction
+# request specific edges (s -> transfer, transfer -> end, s -> t) are added in a RequestOverlay
 # edges are directed, unique for every line and linked to in both directions
 # incoming edges are at 0, outgoing at 1
 class LineGraph:
     def __init__(self, network: List[Bus]):
         self.all_lines: Set[Line] = {bus.line for bus in network}
-        self._graph_dict: Dict[Stop, Tuple[Set[LineEdge], Set[LineEdge]]] = {}
+        graph_dict: Dict[Stop, Tuple[Set[LineEdge], Set[LineEdge]]] = {}
         self.transfer_nodes: Set[Stop] = set()
-        self._make_graph()
+        self._make_graph(graph_dict)
+        self._graph_dict: Dict[Stop, Tuple[FrozenSet[LineEdge], FrozenSet[LineEdge]]] = \
+            {x: (frozenset(y[0]), frozenset(y[1])) for x, y in graph_dict.items()}
 
-        self.temp_edges: Set[LineEdge] | None = None
         self.all_stops: Set[Stop] = set().union(*[set(x.stops) for x in self.all_lines])
 
+        # fastest time and number of transfers for all stop pairs, one table per capacity class
+        self.capacity_classes: List[int] = sorted({x.capacity for x in self.all_lines})
+        self._fastest_table: Dict[int, Dict[Tuple[Stop, Stop], Tuple[int, int]]] = {}
+        self._make_fastest_table()
+
+        # route options of already processed requests: (pick-up, drop-off, capacity class) -> (max time, max hops, options)
+        self.route_option_cache: Dict[Tuple[Stop, Stop, int | None], Tuple[int, int, List[Tuple[int, List[LineEdge]]]]] = {}
+
     def get_nodes(self):
         return self._graph_dict.keys()
 
@@ -49,7 +61,14 @@ class LineGraph:
     def get_edges_out(self, node: Stop):
         return self._graph_dict[node][1]
 
-    def _make_graph(self):
+    def get_line(self, stop: Stop) -> Line:
+        # line of a stop that is not a transfer point
+        return next((x for x in self.all_lines if stop in x.stops))
+
+    def attach_request(self, pick_up: Stop, drop_off: Stop):
+        return RequestOverlay(self, pick_up, [drop_off])
+
+    def _make_graph(self, graph_dict: Dict[Stop, Tuple[Set[LineEdge], Set[LineEdge]]]):
         from utils.helper import Helper
         # creates basic aggregated edges to be reused
         for line_a in self.all_lines:
@@ -59,60 +78,98 @@ class LineGraph:
 
             # make lineEdge for all pairs of a line
             for transfer_a in transfer_stops_a:
-                if transfer_a not in self._graph_dict:
-                    self._graph_dict[transfer_a] = (set(), set())
+                if transfer_a not in graph_dict:
+                    graph_dict[transfer_a] = (set(), set())
 
                 for other_stop in (transfer_stops_a - {transfer_a}):
-                    duration: int = Timer.calc_time(Helper.calc_distance(transfer_a, other_stop))
+                    duration: int = Helper.get_travel_time(transfer_a, other_stop)
                     edge_to = LineEdge(transfer_a, other_stop, line_a, duration)
-                    self._graph_dict[transfer_a][1].add(edge_to)
+                    graph_dict[transfer_a][1].add(edge_to)
 
-                    if other_stop in self._graph_dict:
-                        self._graph_dict[other_stop][0].add(edge_to)
+                    if other_stop in graph_dict:
+                        graph_dict[other_stop][0].add(edge_to)
                     else:
-                        self._graph_dict[other_stop] = ({edge_to}, set())
+                        graph_dict[other_stop] = ({edge_to}, set())
 
             self.transfer_nodes |= transfer_stops_a
 
-    def add_request(self, search_pick_up: Stop, search_drop_off: Stop):
+    def _make_fastest_table(self):
+        from utils.helper import Helper
+        # one dijkstra per pick-up stop and capacity class, every other stop attached as drop-off at the same time
+        # (non-transfer drop-offs only have incoming edges, so they do not influence each other)
+        for capacity in self.capacity_classes:
+            self._fastest_table[capacity] = {}
+
+        for pick_up in sorted(self.all_stops, key=lambda x: x.id):
+            overlay = RequestOverlay(self, pick_up, sorted(self.all_stops - {pick_up}, key=lambda x: x.id))
+
+            for capacity in self.capacity_classes:
+                final_vals, pred_dict = Helper.dijkstra(pick_up, overlay, capacity)
+                for drop_off in self.all_stops:
+                    self._fastest_table[capacity][(pick_up, drop_off)] = (final_vals[drop_off], pred_dict[drop_off][1])
+
+    def get_capacity_class(self, number_of_passengers: int) -> int | None:
+        # smallest capacity fitting the passengers, lines with at least this capacity can be used
+        return next((x for x in self.capacity_classes if x >= number_of_passengers), None)
+
+    def get_fastest(self, pick_up: Stop, drop_off: Stop, number_of_passengers: int) -> Tuple[int, int]:
+        # look up fastest time and number of transfers
+        capacity = self.get_capacity_class(number_of_passengers)
+        if capacity is None:
+            return Global.INFINITE_INT, 0
+        return self._fastest_table[capacity][(pick_up, drop_off)]
+
+
+# view of the LineGraph with the pick-up and drop-off(s) of a single query attached,
+# the LineGraph itself is not changed -> queries can run at the same time
+class RequestOverlay:
+    def __init__(self, line_graph: LineGraph, pick_up: Stop, drop_offs: List[Stop]):
         from utils.helper import Helper
-        self.temp_edges = []
-        # add request stops to graph
-
-        if search_pick_up not in self._graph_dict:
-            # look for the single line of pick-up spot
-            pick_up_line = next((x for x in self.all_lines if search_pick_up in x.stops))
-            # get all intersection of this line
-            transfer_stops: Set[Stop] = self.get_nodes() & set(pick_up_line.stops)
-
-            self._graph_dict[search_pick_up] = (set(), set())
-            for stop in transfer_stops:
-                duration: int = Timer.calc_time(Helper.calc_distance(search_pick_up, stop))
-                edge_to = LineEdge(search_pick_up, stop, pick_up_line, duration)
-                self._graph_dict[search_pick_up][1].add(edge_to)
-                self._graph_dict[stop][0].add(edge_to)
-                self.temp_edges += [edge_to]
-
-        if search_drop_off not in self._graph_dict:
-            drop_off_line = next((x for x in self.all_lines if search_drop_off in x.stops))
-            transfer_stops: Set[Stop] = self.get_nodes() & set(drop_off_line.stops)
-
-            self._graph_dict[search_drop_off] = (set(), set())
-            for stop in transfer_stops:
-                duration: int = Timer.calc_time(Helper.calc_distance(stop, search_drop_off))
-                edge_from = LineEdge(stop, search_drop_off, drop_off_line, duration)
-                self._graph_dict[search_drop_off][0].add(edge_from)
-                self._graph_dict[stop][1].add(edge_from)
-                self.temp_edges += [edge_from]
-
-    def delete_request(self, pick_up: Stop, drop_off: Stop):
-        # delete edges and nodes of old request when finished
-        for edge in self.temp_edges:
-            self._graph_dict[edge.v1][1].remove(edge)
-            self._graph_dict[edge.v2][0].remove(edge)
-
-        for node in {pick_up, drop_off}:
-            if not (node in self.transfer_nodes) and len(self._graph_dict[node][0]) == 0 and len(self._graph_dict[node][1]) == 0:
-                del self._graph_dict[node]
-
-        self.temp_edges = None
+        self.line_graph: LineGraph = line_graph
+        self.all_lines: Set[Line] = line_graph.all_lines
+        self._extra_dict: Dict[Stop, Tuple[Set[LineEdge], Set[LineEdge]]] = {}
+
+        if pick_up not in line_graph.get_nodes():
+            # pick-up spot is connected to all transfer points of its line
+            pick_up_line = line_graph.get_line(pick_up)
+            self._extra_dict[pick_up] = (set(), set())
+            for stop in line_graph.get_nodes() & set(pick_up_line.stops):
+                edge_to = LineEdge(pick_up, stop, pick_up_line, Helper.get_travel_time(pick_up, stop))
+                self._extra_dict[pick_up][1].add(edge_to)
+                self._get_extra(stop)[0].add(edge_to)
+
+        connected_nodes: Set[Stop] = set(line_graph.get_nodes()) | {pick_up}
+        for drop_off in drop_offs:
+            if drop_off not in connected_nodes:
+                # drop-off spot is reached from all transfer points of its line (and pick-up if on same line)
+                drop_off_line = line_graph.get_line(drop_off)
+                self._extra_dict[drop_off] = (set(), set())
+                for stop in connected_nodes & set(drop_off_line.stops):
+                    edge_from = LineEdge(stop, drop_off, drop_off_line, Helper.get_travel_time(stop, drop_off))
+                    self._extra_dict[drop_off][0].add(edge_from)
+                    self._get_extra(stop)[1].add(edge_from)
+
+    def _get_extra(self, node: Stop):
+        if node not in self._extra_dict:
+            self._extra_dict[node] = (set(), set())
+        return self._extra_dict[node]
+
+    def get_nodes(self):
+        return self.line_graph.get_nodes() | self._extra_dict.keys()
+
+    def get_edges(self):
+        return self.line_graph.get_edges().union(*[x[0] | x[1] for x in self._extra_dict.values()])
+
+    def get_edges_in(self, node: Stop):
+        return self._get_edges(node, 0)
+
+    def get_edges_out(self, node: Stop):
+        return self._get_edges(node, 1)
+
+    def _get_edges(self, node: Stop, direction: int):
+        if node not in self._extra_dict:
+            return self.line_graph._graph_dict[node][direction]
+        elif node not in self.line_graph.get_nodes():
+            return self._extra_dict[node][direction]
+        else:
+            return self.line_graph._graph_dict[node][direction] | self._extra_dict[node][direction]
@@ -1,4 +1,4 @@
-from typing import List, Dict, TypeVar, Generic
+from typing import List, Dict, TypeVar, Generic, Tuple
 
 from utils import Global
 
@@ -68,3 +68,103 @@ class PriorityQueue(Generic[T]):
             return False
         else:
             return True
+
+
+# binary heap with position index -> decrease-key in O(log n) instead of list removal
+# nodes with the same priority leave in the order they received it (same as PriorityQueue)
+class IndexedPriorityQueue(Generic[T]):
+    def __init__(self, nodes: List[T]):
+        self.heap: List[T] = []
+        self.keys: List[Tuple[int, int]] = []  # (priority, insertion counter), aligned with heap
+        self.position: Dict[T, int] = {}
+        self.node_dict: Dict[T, int] = {}
+        self.final_vals: Dict[T, int] = {}
+        self.counter: int = 0
+
+        # all nodes start with infinity, increasing counter keeps the heap property
+        for node in nodes:
+            self.node_dict[node] = Global.INFINITE_INT
+            self.position[node] = self.counter
+            self.heap.append(node)
+            self.keys.append((Global.INFINITE_INT, self.counter))
+            self.counter += 1
+
+    def _sift_up(self, idx: int, node: T, key: Tuple[int, int]):
+        heap, keys, position = self.heap, self.keys, self.position
+        while idx > 0:
+            parent_idx = (idx - 1) >> 1
+            parent_key = keys[parent_idx]
+            if parent_key <= key:
+                break
+            parent = heap[parent_idx]
+            heap[idx] = parent
+            keys[idx] = parent_key
+            position[parent] = idx
+            idx = parent_idx
+        heap[idx] = node
+        keys[idx] = key
+        position[node] = idx
+
+    def _sift_down(self, idx: int, node: T, key: Tuple[int, int]):
+        heap, keys, position = self.heap, self.keys, self.position
+        size = len(heap)
+        child_idx = 2 * idx + 1
+        while child_idx < size:
+            if child_idx + 1 < size and keys[child_idx + 1] < keys[child_idx]:
+                child_idx += 1
+            child_key = keys[child_idx]
+            if key <= child_key:
+                break
+            child = heap[child_idx]
+            heap[idx] = child
+            keys[idx] = child_key
+            position[child] = idx
+            idx = child_idx
+            child_idx = 2 * idx + 1
+        heap[idx] = node
+        keys[idx] = key
+        position[node] = idx
+
+    def pop(self):
+        node: T = self.heap[0]
+        last: T = self.heap.pop()
+        last_key = self.keys.pop()
+        if len(self.heap) > 0:
+            self._sift_down(0, last, last_key)
+
+        del self.position[node]
+        min_value: int = self.node_dict.pop(node)
+        self.final_vals[node] = min_value
+
+        return node, min_value
+
+    def add_node(self, node: T, priority: int):
+        self.node_dict[node] = priority
+        self.heap.append(node)
+        self.keys.append((priority, self.counter))
+        self._sift_up(len(self.heap) - 1, node, (priority, self.counter))
+        self.counter += 1
+
+    def replace(self, node: T, new_priority: int):
+        idx = self.position[node]
+        old_key = self.keys[idx]
+        new_key = (new_priority, self.counter)
+        self.counter += 1
+        self.node_dict[node] = new_priority
+
+        if new_key < old_key:
+            self._sift_up(idx, node, new_key)
+        else:
+            self._sift_down(idx, node, new_key)
+
+    def get_priority(self, node: T):
+        if node in self.final_vals:  # if node was already finished -> return none
+            return None
+        elif node in self.node_dict:  # if node still there return value
+            return self.node_dict[node]
+        else:
+            self.add_node(node, Global.INFINITE_INT)  # if node new -> add to queue and return infinity
+            return Global.INFINITE_INT
+
+    def is_empty(self):
+        return len(self.heap) == 0
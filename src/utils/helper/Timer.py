@@ -25,8 +25,13 @@ def conv_string_2_time(time_string: str):
     return TimeImpl(int(attr[0]), int(attr[1]), int(attr[2]))
 
 
-def create_time_object(seconds: int):
-    return TimeImpl(0, 0).add_seconds(seconds)
+# times are handled as seconds since midnight internally, TimeImpl is only used for reading and writing files
+def conv_string_2_seconds(time_string: str) -> int:
+    return conv_string_2_time(time_string).get_in_seconds()
+
+
+def conv_seconds_2_string(seconds: int) -> str:
+    return str(convert_2_time_from_sec(seconds))
 
 
 @dataclass(frozen=True)
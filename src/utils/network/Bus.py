@@ -5,6 +5,8 @@ from utils.network.Stop import Stop
 
 
 class Bus:
+    __slots__ = ("id", "line")
+
     def __init__(self, bus_id: int, line: Line):
         self.id: int = bus_id
         self.line: Line = line
@@ -2,9 +2,12 @@ from typing import Tuple
 
 
 class Stop:
+    __slots__ = ("id", "coordinates", "idx")
+
     def __init__(self, stop_id: int, coordinates: Tuple[int, int]):
         self.id: int = stop_id
         self.coordinates: Tuple[int, int] = coordinates
+        self.idx: int = -1  # compact index into distance and travel time matrix
 
     def __repr__(self):
         return f"Stop(id: {self.id}, coordinateX: {self.coordinates[0]}, coordinateY: {self.coordinates[1]})"
\ No newline at end of file
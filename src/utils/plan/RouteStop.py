@@ -1,22 +1,24 @@
 from typing import Set
 
 from utils.demand.AbstractRequest import Request
-from utils.helper.Timer import TimeImpl
+from utils.helper import Timer
 from utils.network.Bus import Bus
 from utils.network.Stop import Stop
 
 
 class RouteStop:
-    def __init__(self, stop: Stop, arriv_time: TimeImpl, depart_time: TimeImpl, bus: Bus):
+    __slots__ = ("stop", "arriv_time", "depart_time", "pick_up", "drop_off", "bus")
+
+    def __init__(self, stop: Stop, arriv_time: int, depart_time: int, bus: Bus):
         self.stop: Stop = stop
-        self.arriv_time: TimeImpl = arriv_time
-        self.depart_time: TimeImpl = depart_time
+        self.arriv_time: int = arriv_time
+        self.depart_time: int = depart_time
         self.pick_up: Set[Request] = set()
         self.drop_off: Set[Request] = set()
         self.bus: Bus = bus
 
     def to_output(self):
-        return [self.stop.id, str(self.arriv_time), str(self.depart_time), [str(obj) for obj in self.pick_up], [str(obj) for obj in self.drop_off]]
+        return [self.stop.id, Timer.conv_seconds_2_string(self.arriv_time), Timer.conv_seconds_2_string(self.depart_time), [str(obj) for obj in self.pick_up], [str(obj) for obj in self.drop_off]]
 
     def __repr__(self):
         return f"RouteStop(Bus: {self.bus.id}, Location: {self.stop.id}, PickUp: {[str(obj) for obj in self.pick_up]}, DropOff: {[str(obj) for obj in self.drop_off]})"